@@ -1,13 +1,177 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import metrics
+from .records import as_plain
+from .wire_codec import decode_response
+
+BACKEND_URL = os.getenv('BACKEND_URL', 'https://api.example.com').rstrip('/')
+BACKEND_CONNECT_TIMEOUT = float(os.getenv('BACKEND_CONNECT_TIMEOUT', '5'))
+BACKEND_READ_TIMEOUT = float(os.getenv('BACKEND_READ_TIMEOUT', '60'))
+BACKEND_POOL_MAXSIZE = int(os.getenv('BACKEND_POOL_MAXSIZE', '32'))
+BACKEND_MAX_RETRIES = int(os.getenv('BACKEND_MAX_RETRIES', '3'))
+# Bulk mode (backend_batch): queued POSTs per path before an automatic flush, and how many of
+# them are in flight at once over the pooled session
+BACKEND_BULK_MAX_ITEMS = int(os.getenv('BACKEND_BULK_MAX_ITEMS', '200'))
+BACKEND_BULK_CONCURRENCY = int(os.getenv('BACKEND_BULK_CONCURRENCY', '8'))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_local = threading.local()
+_in_flight = threading.BoundedSemaphore(BACKEND_POOL_MAXSIZE)
+
+
+def _build_session() -> requests.Session:
+    # Connection failures are retried for every method; status-based retries (429/5xx) only for
+    # idempotent methods so a POST the backend may already have applied is never replayed.
+    retry = Retry(
+        total=BACKEND_MAX_RETRIES,
+        connect=BACKEND_MAX_RETRIES,
+        read=BACKEND_MAX_RETRIES,
+        status=BACKEND_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # Not pool_block: urllib3 drains pools from an exit hook, and a blocking pool would then hang
+    # any request made later during shutdown (e.g. the final spend flush). _in_flight caps
+    # concurrency per process instead.
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=BACKEND_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
-def get_from_backend(path: str) -> dict:
-    response = requests.get(f"https://api.example.com/{path}")
-    return response.json()
+def get_session() -> requests.Session:
+    """Shared keep-alive session used for every backend call."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _timeout():
+    return (BACKEND_CONNECT_TIMEOUT, BACKEND_READ_TIMEOUT)
+
+
+def _request(method: str, path: str, data: Any = None, decode_as: Any = None) -> dict:
+    # At most BACKEND_POOL_MAXSIZE requests in flight, so every one can reuse a pooled connection
+    with _in_flight, metrics.timer('backend_request_seconds', method=method):
+        response = get_session().request(method, f"{BACKEND_URL}/{path}", json=as_plain(data), timeout=_timeout())
+    # Raise on 4xx/5xx (after the adapter's own retries) so callers such as the spend reporter
+    # keep and retry their data instead of treating an error body as success
+    response.raise_for_status()
+    return decode_response(response, decode_as)
+
+
+def get_from_backend(path: str, decode_as: Any = None) -> dict:
+    """GET path; with decode_as (e.g. a TypedDict of record lists) the reply is decoded into it."""
+    return _request('GET', path, decode_as=decode_as)
 
 def update_in_backend(path: str, data: dict) -> dict:
-    response = requests.put(f"https://api.example.com/{path}", json=data)
-    return response.json()
+    return _request('PUT', path, data)
 
 def send_to_backend(path: str, data: dict) -> dict:
-    response = requests.post(f"https://api.example.com/{path}", json=data)
-    return response.json()
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.add(path, data)
+        return {'status': 'queued'}
+    return _request('POST', path, data)
+
+
+class BackendBatchError(Exception):
+    """Some POSTs of a flush failed; failed holds their (path, data) in queue order."""
+
+    def __init__(self, failed: List[Tuple[str, Any]], error: Exception):
+        super().__init__(f"{len(failed)} backend POST(s) failed, first error: {error}")
+        self.failed = failed
+
+
+class BackendBatch:
+    """Queues POSTs per path and sends each path's POSTs together over the pooled session.
+
+    Every body is posted unchanged, one POST per queued record, in the shape the endpoint
+    already takes (the backend has no array endpoints). What the batch saves is the wait: the
+    POSTs of a flush go out concurrently over the keep-alive connections instead of one round
+    trip after another.
+    """
+
+    def __init__(self, max_items: int = BACKEND_BULK_MAX_ITEMS, concurrency: int = BACKEND_BULK_CONCURRENCY):
+        self.max_items = max_items
+        self.concurrency = concurrency
+        self._pending: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, path: str, data: Any) -> None:
+        with self._lock:
+            records = self._pending.setdefault(path, [])
+            records.append(data)
+            flush_now = len(records) >= self.max_items
+        if flush_now:
+            self.flush(path)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(records) for records in self._pending.values())
+
+    def flush(self, path: Optional[str] = None) -> Dict[str, List[dict]]:
+        """Send the queued POSTs (of one path, or all paths) and return the replies in queue order.
+
+        Every POST is attempted; if any failed, BackendBatchError lists them once the rest are sent.
+        """
+        with self._lock:
+            paths = [path] if path is not None else list(self._pending)
+            posts = [(p, data) for p in paths for data in self._pending.pop(p, ())]
+        if not posts:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(posts))) as pool:
+            futures = [pool.submit(_request, 'POST', p, data) for p, data in posts]
+        replies: Dict[str, List[dict]] = {}
+        failed, first_error = [], None
+        for (post_path, data), future in zip(posts, futures):
+            error = future.exception()
+            if error is not None:
+                failed.append((post_path, data))
+                first_error = first_error or error
+            else:
+                replies.setdefault(post_path, []).append(future.result())
+        if failed:
+            raise BackendBatchError(failed, first_error)
+        return replies
+
+
+@contextmanager
+def backend_batch(max_items: int = BACKEND_BULK_MAX_ITEMS, concurrency: int = BACKEND_BULK_CONCURRENCY):
+    """Queue send_to_backend calls made on this thread and send them together when the block exits.
+
+    Usage:
+        with backend_batch():
+            for tags in tags_per_expert:
+                send_to_backend(path=f"meta-expert-tags/{expert_id}", data=tags)
+    """
+    previous = getattr(_local, 'batch', None)
+    batch = BackendBatch(max_items=max_items, concurrency=concurrency)
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = previous
+        # Also on error: without the batch these POSTs would already have been sent
+        batch.flush()
+
@@ -0,0 +1,631 @@
+"""Micro-benchmarks for the hot paths of the tagging pipeline.
+
+Run with `python -m <package>.benchmarks` from the directory that contains this package. With
+--suite it instead runs the regression suite (SUITE_CASES) on synthetic_data rosters and compares
+each case's median against benchmark_baselines.json; --update-baseline rewrites that file.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .name_matching import match_names
+from .job_intervals import OPEN_END, OPEN_START, job_bounds, job_matches_timing, to_epoch
+from .query_engine import JOB_FIELD_BY_CATEGORY, MetaExpertQueryIndex
+from .records import Job, MetaExpert, as_plain
+from . import synthetic_data
+from .wire_codec import CODEC_NAME, decode_records, loads
+from .vector_index import EMBEDDING_DIM, VectorIndex
+
+
+FIRST_NAMES = [
+    "James", "Emma", "Michael", "Olivia", "William", "Sophia", "Alexander", "Isabella",
+    "Daniel", "Ava", "David", "Mia", "Joseph", "Charlotte", "Matthew", "Amelia",
+    "Andrew", "Harper", "Benjamin", "Evelyn", "Samuel", "Abigail", "Christopher", "Emily",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+]
+
+
+def _legacy_levenshtein(s1: str, s2: str) -> int:
+    """The unbounded DP closure identify_repeat_experts used before name_matching existed."""
+    if len(s1) < len(s2):
+        return _legacy_levenshtein(s2, s1)
+    if not s2:
+        return len(s1)
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def _legacy_match_names(new_name: str, candidates: List[str]) -> List[int]:
+    matches = []
+    for i, expert_name in enumerate(candidates):
+        distance = _legacy_levenshtein(new_name.lower(), expert_name.lower())
+        divisor = max(len(new_name), len(expert_name))
+        fractional_distance = distance / divisor if divisor else 1.0
+        if fractional_distance < 0.05:
+            matches.append(i)
+    return matches
+
+
+def _random_names(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)[0]}. {rng.choice(LAST_NAMES)}-{rng.choice(LAST_NAMES)}"
+        for _ in range(count)
+    ]
+
+
+def _time(func: Callable[[], object], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_name_matching(sizes=(1_000, 10_000, 100_000), queries: int = 5) -> List[Dict[str, float]]:
+    """Compare the legacy Levenshtein closure with the bounded bit-parallel batch kernel."""
+    results = []
+    for size in sizes:
+        candidates = _random_names(size, seed=size)
+        probes = candidates[:queries]
+        repeat = 1 if size >= 100_000 else 3
+
+        def run_legacy():
+            return [_legacy_match_names(probe, candidates) for probe in probes]
+
+        def run_bounded():
+            return [match_names(probe, candidates) for probe in probes]
+
+        if run_legacy() != run_bounded():
+            raise AssertionError(f"Bounded kernel disagrees with legacy matcher at {size} candidates")
+
+        legacy_seconds = _time(run_legacy, repeat) / len(probes)
+        bounded_seconds = _time(run_bounded, repeat) / len(probes)
+        result = {
+            'candidates': size,
+            'legacy_ms': legacy_seconds * 1000,
+            'bounded_ms': bounded_seconds * 1000,
+            'speedup': legacy_seconds / bounded_seconds if bounded_seconds else float('inf'),
+        }
+        print(
+            f"name matching, {size:>7} candidates: legacy {result['legacy_ms']:9.1f} ms/query, "
+            f"bounded {result['bounded_ms']:8.1f} ms/query ({result['speedup']:.1f}x)"
+        )
+        results.append(result)
+    return results
+
+
+def benchmark_vector_search(
+    sizes=(10_000, 100_000, 1_000_000), dim: int = EMBEDDING_DIM, queries: int = 32, k: int = 10
+) -> List[Dict[str, float]]:
+    """Build time and exact cosine top-k latency of VectorIndex on random unit vectors."""
+    rng = np.random.default_rng(0)
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+    results = []
+    for size in sizes:
+        index = VectorIndex(dim=dim, capacity=size)
+        start = time.perf_counter()
+        for offset in range(0, size, 50_000):
+            count = min(50_000, size - offset)
+            index.upsert_many(
+                [f"r{offset + i}" for i in range(count)],
+                rng.standard_normal((count, dim), dtype=np.float32),
+                [{'kind': 'tag', 'metaExpertId': (offset + i) // 5} for i in range(count)],
+            )
+        build_seconds = time.perf_counter() - start
+
+        if size <= 100_000:
+            normalised = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+            expected = np.argsort(-(index._matrix[:size] @ normalised[0]))[:k]
+            found = [index._row_of[record_id] for record_id, _, _ in index.search(query_vectors[0], k)[0]]
+            if list(expected) != found:
+                raise AssertionError(f"Vector search is not exact at {size} rows")
+
+        single_seconds = _time(lambda: index.search(query_vectors[0], k), 5)
+        batch_seconds = _time(lambda: index.search(query_vectors, k), 3) / queries
+        result = {
+            'rows': size,
+            'matrix_mb': index._matrix.nbytes / 2**20,
+            'build_s': build_seconds,
+            'single_query_ms': single_seconds * 1000,
+            'batched_query_ms': batch_seconds * 1000,
+        }
+        print(
+            f"vector search, {size:>7} rows x {dim}: build {result['build_s']:6.2f} s, "
+            f"{result['matrix_mb']:7.1f} MB, single {result['single_query_ms']:7.2f} ms/query, "
+            f"batched {result['batched_query_ms']:7.2f} ms/query"
+        )
+        results.append(result)
+        del index
+    return results
+
+
+COMPANIES = ["Google", "Amazon", "Meta", "Apple", "Microsoft", "Stripe", "Walmart", "Pfizer", "Deloitte", "McKinsey"]
+ROLES = ["Software Engineer", "Product Manager", "Data Scientist", "Sales Director", "Analyst", "Consultant"]
+SENIORITIES = ["Entry", "Senior", "Manager", "Director", "Vice-President", "C-Suite"]
+LOCATIONS = ["New York", "San Francisco", "London", "Berlin", "Toronto", "Singapore"]
+INDUSTRIES = ["Technology", "Retail", "Healthcare", "Consulting", "Finance"]
+
+
+def _random_roster(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    experts = []
+    for i in range(count):
+        jobs = []
+        for j in range(rng.randint(1, 6)):
+            start_year = rng.randint(2005, 2024)
+            end_year = None if rng.random() < 0.2 else min(2025, start_year + rng.randint(0, 5))
+            jobs.append({
+                'id': f"job-{i}-{j}",
+                'company': rng.choice(COMPANIES),
+                'role': rng.choice(ROLES),
+                'seniorityLevel': rng.choice(SENIORITIES),
+                'location': rng.choice(LOCATIONS),
+                'industry': rng.choice(INDUSTRIES),
+                'startDate': f"{start_year}-{rng.randint(1, 12):02d}-01T00:00:00Z",
+                'endDate': f"{end_year}-{rng.randint(1, 12):02d}-01T00:00:00Z" if end_year else None,
+                'metaExpertId': f"me-{i}",
+            })
+        experts.append({'id': f"me-{i}", 'name': f"Expert {i}", 'jobs': jobs})
+    return experts
+
+
+def _scan_filter(experts: List[dict], filters: List[dict]) -> List[dict]:
+    """Per-expert scan with the frontend's matchesJobBasedCategory semantics (the reference)."""
+    def in_window(job, f):
+        if not f.get('activeFrom') and not f.get('activeTo'):
+            return True
+        start, end = job_bounds(job)
+        return end >= (to_epoch(f.get('activeFrom')) or OPEN_START) and start <= (to_epoch(f.get('activeTo')) or OPEN_END)
+
+    def job_hits(expert, f):
+        field = JOB_FIELD_BY_CATEGORY[f['category']]
+        return any(job.get(field) == f['value'] and job_matches_timing(job, f.get('timing')) and in_window(job, f)
+                   for job in expert.get('jobs') or [])
+
+    def passes(expert, category_filters):
+        must = [f for f in category_filters if f['logic'] == 'must_have']
+        cant = [f for f in category_filters if f['logic'] == 'cant_have']
+        may = [f for f in category_filters if f['logic'] == 'may_have']
+        if not all(job_hits(expert, f) for f in must) or any(job_hits(expert, f) for f in cant):
+            return False
+        if may and not must and not cant:
+            return any(job_hits(expert, f) for f in may)
+        return True
+
+    return [
+        expert for expert in experts
+        if all(passes(expert, [f for f in filters if f['category'] == category]) for category in JOB_FIELD_BY_CATEGORY)
+    ]
+
+
+FILTER_BENCHMARK_QUERIES = [
+    [{'category': 'company', 'value': 'Google', 'logic': 'must_have'}],
+    [{'category': 'company', 'value': 'Google', 'logic': 'must_have'},
+     {'category': 'seniority', 'value': 'Director', 'logic': 'must_have', 'timing': 'current'},
+     {'category': 'industry', 'value': 'Retail', 'logic': 'cant_have'}],
+    [{'category': 'location', 'value': 'London', 'logic': 'may_have'},
+     {'category': 'location', 'value': 'Berlin', 'logic': 'may_have'},
+     {'category': 'role', 'value': 'Analyst', 'logic': 'must_have', 'timing': '2_3_years'}],
+    [{'category': 'company', 'value': 'Stripe', 'logic': 'must_have',
+      'activeFrom': '2015-01-01T00:00:00Z', 'activeTo': '2016-12-31T00:00:00Z'},
+     {'category': 'role', 'value': 'Product Manager', 'logic': 'may_have', 'timing': '4_plus_years'}],
+]
+
+
+def benchmark_filter_queries(sizes=(10_000, 100_000)) -> List[Dict[str, float]]:
+    """Frontend-style per-expert scan vs the bitmap inverted index for a few filter sets."""
+    results = []
+    for size in sizes:
+        roster = _random_roster(size)
+        start = time.perf_counter()
+        index = MetaExpertQueryIndex()
+        index.add_many(roster)
+        build_seconds = time.perf_counter() - start
+        for query in FILTER_BENCHMARK_QUERIES:
+            expected = {expert['id'] for expert in _scan_filter(roster, query)}
+            found = {result['metaExpert']['id'] for result in index.query(query)}
+            if expected != found:
+                raise AssertionError(f"Query index disagrees with the scan at {size} experts: {query}")
+        scan_seconds = _time(lambda: [_scan_filter(roster, q) for q in FILTER_BENCHMARK_QUERIES], 1)
+        index_seconds = _time(lambda: [index.query(q) for q in FILTER_BENCHMARK_QUERIES], 3)
+        queries = len(FILTER_BENCHMARK_QUERIES)
+        result = {
+            'experts': size,
+            'build_s': build_seconds,
+            'scan_ms': scan_seconds / queries * 1000,
+            'index_ms': index_seconds / queries * 1000,
+        }
+        print(
+            f"filter queries, {size:>7} experts: build {result['build_s']:5.2f} s, scan {result['scan_ms']:8.1f} ms/query, "
+            f"index {result['index_ms']:7.2f} ms/query ({result['scan_ms'] / result['index_ms']:.0f}x)"
+        )
+        results.append(result)
+    return results
+
+
+def benchmark_first_page(sizes=(10_000, 100_000, 300_000), page_size: int = 50) -> List[Dict[str, float]]:
+    """Time to the first page of ranked results vs ranking every survivor, for a broad query."""
+    query = [{'category': 'seniority', 'value': 'Director', 'logic': 'may_have'},
+             {'category': 'industry', 'value': 'Retail', 'logic': 'may_have'},
+             {'category': 'company', 'value': 'Google', 'logic': 'cant_have'}]
+    results = []
+    for size in sizes:
+        index = MetaExpertQueryIndex()
+        index.add_many(_random_roster(size))
+        first_page, _ = next(index.iter_pages(query, page_size=page_size))
+        if [r['metaExpert']['id'] for r in first_page] != [r['metaExpert']['id'] for r in index.query(query, limit=page_size)]:
+            raise AssertionError(f"First page disagrees with the full ranking at {size} experts")
+        full_seconds = _time(lambda: index.query(query), 3)
+        page_seconds = _time(lambda: next(index.iter_pages(query, page_size=page_size)), 3)
+        result = {'experts': size, 'full_ms': full_seconds * 1000, 'first_page_ms': page_seconds * 1000}
+        print(
+            f"ranked results, {size:>7} experts: full ranking {result['full_ms']:7.1f} ms, "
+            f"first page of {page_size} {result['first_page_ms']:7.1f} ms"
+        )
+        results.append(result)
+    return results
+
+
+def _random_jobs_payload(count: int, seed: int = 0) -> bytes:
+    """count jobs shaped like make_expert_from_linkedin's, JSON-encoded as the backend sends them."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        start_year = rng.randint(2005, 2024)
+        location = rng.choice(LOCATIONS)
+        jobs.append({
+            'id': f"{i:08d}-4d1c-4b8e-9f0a-{rng.getrandbits(48):012x}",
+            'role': rng.choice(ROLES),
+            'company': rng.choice(COMPANIES),
+            'projectId': 'project-1',
+            'industry': rng.choice(INDUSTRIES),
+            'description': None,
+            'location': location,
+            'locationId': f"loc-{LOCATIONS.index(location)}",
+            'isEducation': False,
+            'startDate': f"{start_year}-{rng.randint(1, 12):02d}-01T00:00:00Z",
+            'endDate': None if rng.random() < 0.2 else f"{min(2025, start_year + rng.randint(0, 5))}-06-01T00:00:00Z",
+            'expertId': None,
+            'metaExpertId': f"me-{i // 4}",
+            'seniorityLevel': rng.choice(SENIORITIES),
+        })
+    return json.dumps(jobs).encode()
+
+
+def _traced_bytes(build: Callable[[], object]) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        gc.collect()
+        return value, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_record_memory(jobs: int = 1_000_000) -> Dict[str, float]:
+    """Memory of decoded job dicts vs compact Job records holding the same data.
+
+    Both start from the same JSON payload; the record figure includes the strings the records
+    keep (ids, dates) since the dicts are gone by the time it is measured.
+    """
+    payload = _random_jobs_payload(jobs)
+    dicts, dict_bytes = _traced_bytes(lambda: json.loads(payload))
+    del dicts
+
+    def build_records():
+        return [Job.from_dict(job) for job in json.loads(payload)]
+
+    records, record_bytes = _traced_bytes(build_records)
+    assert as_plain(records) == json.loads(payload), "records must round-trip to the original dicts"
+    del records
+    result = {
+        'jobs': jobs,
+        'dict_bytes_per_job': dict_bytes / jobs,
+        'record_bytes_per_job': record_bytes / jobs,
+        'dict_mb': dict_bytes / 2**20,
+        'record_mb': record_bytes / 2**20,
+    }
+    print(
+        f"job storage, {jobs:>9} jobs: dicts {result['dict_mb']:8.1f} MB "
+        f"({result['dict_bytes_per_job']:5.0f} B/job), records {result['record_mb']:8.1f} MB "
+        f"({result['record_bytes_per_job']:5.0f} B/job)"
+    )
+    return result
+
+
+def _peak_bytes(func: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_roster_decode(experts: int = 50_000) -> List[Dict[str, float]]:
+    """Decode time and peak memory of a meta-experts roster response, per decoding path.
+
+    'json' is what response.json() did (text decode + json.loads); the codec path reads the
+    bytes directly; 'records' also builds the compact records roster_cache keeps.
+    """
+    roster = [
+        dict(expert, organizationID='org-1', email=f"expert{i}@example.com", linkedInLink=f"https://www.linkedin.com/in/expert-{i}")
+        for i, expert in enumerate(_random_roster(experts))
+    ]
+    payload = json.dumps({'metaExperts': roster}).encode()
+    del roster
+    paths = {
+        'json': lambda: json.loads(payload.decode('utf-8')),
+        CODEC_NAME: lambda: loads(payload),
+        f"{CODEC_NAME}+records": lambda: decode_records(payload, MetaExpert, key='metaExperts'),
+    }
+    results = []
+    for name, decode in paths.items():
+        seconds = _time(decode, 3)
+        peak = _peak_bytes(decode)
+        result = {'path': name, 'experts': experts, 'ms': seconds * 1000, 'peak_mb': peak / 2**20}
+        print(
+            f"roster decode, {experts:>6} experts ({len(payload) / 2**20:.0f} MB JSON), {name:>14}: "
+            f"{result['ms']:8.1f} ms, peak {result['peak_mb']:7.1f} MB"
+        )
+        results.append(result)
+    return results
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+# A case regresses when its median exceeds the stored median by this factor. Baselines are
+# per machine: regenerate them with --update-baseline when moving to different hardware.
+BENCHMARK_TOLERANCE = float(os.getenv('BENCHMARK_TOLERANCE', '1.5'))
+BENCHMARK_ROUNDS = int(os.getenv('BENCHMARK_ROUNDS', '7'))
+
+# name -> generator function: everything before its yield is setup, the yielded callable is what
+# gets timed, and anything after the yield is teardown (like a pytest fixture)
+SUITE_CASES: Dict[str, Callable[[], Iterator[Callable[[], object]]]] = {}
+
+
+def suite_case(name: str) -> Callable:
+    def register(func: Callable[[], Iterator[Callable[[], object]]]) -> Callable:
+        SUITE_CASES[name] = func
+        return func
+    return register
+
+
+def _measure(func: Callable[[], object], rounds: int = BENCHMARK_ROUNDS) -> Dict[str, float]:
+    func()  # warm-up: lazily built indexes, tokenizer loads, caches
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'rounds': rounds,
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'stddev_ms': statistics.stdev(samples) if rounds > 1 else 0.0,
+    }
+
+
+SUITE_ORG = 'benchmark-org'
+SUITE_FILTER_QUERIES = [
+    [{'category': 'company', 'value': 'McKinsey', 'logic': 'must_have'}],
+    [{'category': 'company', 'value': 'Bain', 'logic': 'must_have'},
+     {'category': 'seniority', 'value': 'Director', 'logic': 'must_have', 'timing': 'current'},
+     {'category': 'industry', 'value': 'Retail', 'logic': 'cant_have'}],
+    [{'category': 'location', 'value': 'London', 'logic': 'may_have'},
+     {'category': 'location', 'value': 'Tokyo', 'logic': 'may_have'},
+     {'category': 'role', 'value': 'Partner Strategy', 'logic': 'must_have', 'timing': '2_3_years'}],
+]
+
+
+@suite_case('dedup.identify_repeat_experts[10k]')
+def _case_identify_repeat_experts():
+    # Imported here: tag_expert pulls in the LLM client stack, which the other cases do not need
+    from . import roster_cache
+    from .dedup_index import clear_org_indexes
+    from .tag_expert import identify_repeat_experts
+
+    sample = synthetic_data.generate_roster(10_000, seed=1, organization_id=SUITE_ORG)
+    names = [expert['name'] for expert in sample.experts]
+    rng = random.Random(2)
+    incoming = []
+    for match in ('linkedin', 'email', 'name', 'none'):
+        while sum(1 for expert in incoming if expert['match'] == match) < 10:
+            original = rng.choice(sample.experts)
+            if match == 'linkedin' and not original.get('linkedInLink'):
+                continue
+            expert = dict(synthetic_data.incoming_expert(original, rng, SUITE_ORG, match), match=match)
+            # Skip names with several close matches: those go to LLM disambiguation
+            if len(match_names(expert['name'], names)) <= 1:
+                incoming.append(expert)
+    original_cache = roster_cache.roster_cache
+    roster_cache.roster_cache = roster_cache.RosterCache(delta_sync=False, fetch=lambda path: {'metaExperts': sample.experts})
+    try:
+        yield lambda: [identify_repeat_experts('benchmark@example.com', expert) for expert in incoming]
+    finally:
+        roster_cache.roster_cache = original_cache
+        clear_org_indexes()
+
+
+@suite_case('prompts.tagging_prompt_construction')
+def _case_tagging_prompts():
+    from .prompts_for_rag_tool import get_batch_seniority_template, get_expert_tags_template, get_father_prompt_template
+    from .tag_expert import _pack_seniority_batches, _seniority_fields
+
+    rng = random.Random(3)
+    experts = synthetic_data.generate_roster(50, seed=3).experts
+    for expert in experts:
+        expert['jobs'] += synthetic_data.generate_jobs(expert['id'], rng, 2025, num_jobs=12)
+
+    def build():
+        # What further_processing and generate_expert_tags build before their LLM calls
+        for expert in experts:
+            jobs = expert['jobs']
+            for batch in _pack_seniority_batches(jobs, list(range(len(jobs)))):
+                get_batch_seniority_template({str(idx): _seniority_fields(jobs[idx]) for idx in batch})
+            get_expert_tags_template(expert)
+        get_father_prompt_template(experts[:5], experts[5])
+
+    yield build
+
+
+@suite_case('linkedin.normalize_linkedin_profile[200]')
+def _case_normalize_profiles():
+    from .linkedin_requests import normalize_linkedin_profile
+
+    rng = random.Random(4)
+    profiles = [synthetic_data.proxycurl_profile(rng) for _ in range(200)]
+    yield lambda: [
+        normalize_linkedin_profile(profile, f"https://www.linkedin.com/in/synthetic-{i}") for i, profile in enumerate(profiles)
+    ]
+
+
+@suite_case('dedup.match_names[100k]')
+def _case_match_names():
+    names = [expert['name'] for expert in synthetic_data.generate_roster(100_000, seed=5, duplicate_rate=0).experts]
+    queries = names[:5]
+    yield lambda: [match_names(name, names) for name in queries]
+
+
+@suite_case('query.build_index[20k]')
+def _case_build_query_index():
+    experts = synthetic_data.generate_roster(20_000, seed=6).experts
+    yield lambda: MetaExpertQueryIndex().add_many(experts)
+
+
+@suite_case('query.build_index[100k]')
+def _case_build_query_index_large():
+    # Against the 20k case this shows whether the build still scales linearly
+    experts = synthetic_data.generate_roster(100_000, seed=6).experts
+    yield lambda: MetaExpertQueryIndex().add_many(experts)
+
+
+@suite_case('query.filter_queries[50k]')
+def _case_filter_queries():
+    index = MetaExpertQueryIndex()
+    index.add_many(synthetic_data.generate_roster(50_000, seed=7).experts)
+    yield lambda: [index.query(query) for query in SUITE_FILTER_QUERIES]
+
+
+@suite_case('query.first_page[50k]')
+def _case_first_page():
+    index = MetaExpertQueryIndex()
+    index.add_many(synthetic_data.generate_roster(50_000, seed=7).experts)
+    yield lambda: [next(index.iter_pages(query, page_size=50)) for query in SUITE_FILTER_QUERIES]
+
+
+@suite_case('records.decode_roster[10k]')
+def _case_decode_roster():
+    payload = json.dumps({'metaExperts': synthetic_data.generate_roster(10_000, seed=8).experts}).encode()
+    yield lambda: decode_records(payload, MetaExpert, key='metaExperts')
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'cases': {}}
+
+
+def run_suite(
+    pattern: Optional[str] = None,
+    baseline_path: str = BASELINE_PATH,
+    update_baseline: bool = False,
+    tolerance: float = BENCHMARK_TOLERANCE,
+    rounds: int = BENCHMARK_ROUNDS,
+) -> Dict[str, Any]:
+    """Run the suite cases whose name contains pattern and compare them with the baseline.
+
+    Returns {'results': {name: stats}, 'regressions': [names], 'errors': {name: message}}. A case
+    that raises is reported and the remaining cases still run; the command line exits non-zero
+    on errors as on regressions.
+    """
+    baseline = load_baseline(baseline_path)
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: List[str] = []
+    errors: Dict[str, str] = {}
+    for name, case in SUITE_CASES.items():
+        if pattern and pattern not in name:
+            continue
+        fixture = case()
+        try:
+            stats = _measure(next(fixture), rounds)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            print(f"{name:<45} ERROR {errors[name]}")
+            continue
+        finally:
+            fixture.close()
+        results[name] = stats
+        reference = baseline['cases'].get(name)
+        line = f"{name:<45} median {stats['median_ms']:9.2f} ms  min {stats['min_ms']:9.2f} ms  ±{stats['stddev_ms']:7.2f}"
+        if reference:
+            ratio = stats['median_ms'] / reference['median_ms']
+            line += f"  baseline {reference['median_ms']:9.2f} ms ({ratio:4.2f}x)"
+            if ratio > tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if update_baseline and results:
+        baseline['cases'].update(
+            {name: {'median_ms': round(stats['median_ms'], 3), 'min_ms': round(stats['min_ms'], 3)} for name, stats in results.items()}
+        )
+        baseline['machine'] = {'python': platform.python_version(), 'processor': platform.machine(), 'cpus': os.cpu_count()}
+        with open(baseline_path, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {baseline_path}")
+    elif regressions:
+        print(f"{len(regressions)} case(s) slower than {tolerance}x their baseline: {', '.join(regressions)}")
+    if errors:
+        print(f"{len(errors)} case(s) failed: {', '.join(errors)}")
+    return {'results': results, 'regressions': regressions, 'errors': errors}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--suite', action='store_true', help="run the regression suite against the stored baselines")
+    parser.add_argument('-k', dest='pattern', help="only suite cases whose name contains this")
+    parser.add_argument('--update-baseline', action='store_true', help="store this run's medians as the new baselines")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_TOLERANCE)
+    parser.add_argument('--rounds', type=int, default=BENCHMARK_ROUNDS)
+    args = parser.parse_args()
+    if args.suite:
+        outcome = run_suite(args.pattern, args.baseline, args.update_baseline, args.tolerance, args.rounds)
+        failed = outcome['errors'] or (outcome['regressions'] and not args.update_baseline)
+        sys.exit(1 if failed else 0)
+    benchmark_name_matching()
+    benchmark_vector_search()
+    benchmark_filter_queries()
+    benchmark_first_page()
+    benchmark_record_memory()
+    benchmark_roster_decode()
@@ -0,0 +1,380 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .dedup_index import normalize_linkedin_url, remove_from_org_index, upsert_in_org_index
+from .linkedin_requests import (
+    fetch_linkedin_profile,
+    get_profile_type_ids,
+    normalize_linkedin_profile,
+    normalize_profile_url,
+    resolve_profile_picture,
+    save_expert,
+)
+from .tag_expert import enrich_meta_expert, plan_for_match, plan_meta_expert, write_meta_expert
+
+BULK_CHECKPOINT_PATH = os.getenv('BULK_CHECKPOINT_PATH', 'bulk_ingest_checkpoint.jsonl')
+BULK_QUEUE_SIZE = int(os.getenv('BULK_QUEUE_SIZE', '64'))
+# Worker threads per stage. Dedup always runs on one worker: it must see every meta expert
+# created earlier in the run to catch duplicates within the input file.
+BULK_STAGE_WORKERS = {
+    'fetch': int(os.getenv('BULK_FETCH_WORKERS', '8')),
+    'normalize': int(os.getenv('BULK_NORMALIZE_WORKERS', '4')),
+    'dedup': 1,
+    'enrich': int(os.getenv('BULK_ENRICH_WORKERS', '8')),
+    'write': int(os.getenv('BULK_WRITE_WORKERS', '4')),
+}
+# Columns / keys a profile URL is read from, in order of preference
+URL_FIELDS = ('linkedin_profile_url', 'profile_url', 'linkedInLink', 'linkedin', 'url')
+# Checkpoint statuses that are final; failed URLs are retried on the next run
+FINAL_STATUSES = ('done', 'invalid')
+_STOP = object()
+
+
+def _url_from_record(record: Any) -> Optional[str]:
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        for field in URL_FIELDS:
+            if record.get(field):
+                return record[field]
+    return None
+
+
+def read_profile_urls(path: str) -> List[str]:
+    """Profile URLs from a JSONL (strings or objects) or CSV file, in order and without duplicates.
+
+    CSV files may have a header naming one of URL_FIELDS; otherwise the first cell that looks
+    like a LinkedIn URL is used.
+    """
+    urls = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson', '.json')):
+            urls = [_url_from_record(json.loads(line)) for line in f if line.strip()]
+        else:
+            rows = list(csv.reader(f))
+            header = [cell.strip() for cell in rows[0]] if rows else []
+            column = next((header.index(field) for field in URL_FIELDS if field in header), None)
+            if column is not None:
+                urls = [row[column] for row in rows[1:] if len(row) > column]
+            else:
+                urls = [next((cell for cell in row if 'linkedin' in cell), None) for row in rows]
+    seen = set()
+    unique = []
+    for url in urls:
+        key = normalize_linkedin_url(url) if url else None
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        unique.append(url.strip())
+    return unique
+
+
+class IngestCheckpoint:
+    """Append-only JSONL log of processed profile URLs, so a rerun skips what already finished.
+
+    Each line is {"url", "status", ...}; the last line for a URL wins. Lines are flushed as
+    they are written, so a crash loses at most the profiles that were still in flight.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._status: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        torn = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    torn = not line.endswith('\n')
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a torn last line from a crash
+                    self._status[normalize_linkedin_url(record.get('url'))] = record.get('status')
+        self._file = open(path, 'a', encoding='utf-8')
+        if torn:
+            self._file.write('\n')  # so the next record does not run on from the torn line
+
+    def is_done(self, url: str) -> bool:
+        return self._status.get(normalize_linkedin_url(url)) in FINAL_STATUSES
+
+    def record(self, url: str, status: str, **fields: Any) -> None:
+        key = normalize_linkedin_url(url)
+        line = json.dumps(dict(fields, url=url, status=status, at=time.time()), default=str)
+        with self._lock:
+            if status not in FINAL_STATUSES and self._status.get(key) in FINAL_STATUSES:
+                # Another spelling of an already finished URL failed: keep it finished
+                return
+            self._status[key] = status
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class StageStats:
+    __slots__ = ('name', 'workers', 'processed', 'failed', 'busy_seconds', 'first_start', 'last_end')
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, float]:
+        wall = (self.last_end - self.first_start) if self.first_start is not None and self.last_end is not None else 0.0
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'per_second': self.processed / wall if wall > 0 else 0.0,
+            'avg_ms': self.busy_seconds / max(1, self.processed + self.failed) * 1000,
+            'utilization': self.busy_seconds / (wall * self.workers) if wall > 0 else 0.0,
+        }
+
+
+class _Item:
+    __slots__ = ('url', 'profile', 'expert', 'jobs', 'new_expert', 'meta_expert', 'action', 'meta_jobs', 'tags', 'reservation')
+
+    def __init__(self, url: str):
+        self.url = url
+        self.profile = self.expert = self.new_expert = self.meta_expert = self.action = None
+        self.jobs: List[dict] = []
+        self.meta_jobs: List[dict] = []
+        self.tags: List[dict] = []
+        # Key of the meta expert this item created and holds in BulkIngest._reservations
+        self.reservation: Optional[str] = None
+
+
+class BulkIngest:
+    """Pipelined make_expert_from_linkedin + tag_expert for many profile URLs.
+
+    Profiles flow through fetch (ProxyCurl) -> normalize -> dedup -> enrich (LLM seniority
+    and tags) -> write (backend) stages. Each stage has its own worker threads and a bounded
+    input queue, so a slow stage applies back-pressure instead of buffering the whole file.
+    Every profile ends up in the checkpoint as done, invalid or failed (with the stage and
+    error), and completed URLs are skipped when the same checkpoint is used again.
+
+    fetch_profile defaults to the ProxyCurl call; pass a stub (url -> profile dict or None) to
+    run without ProxyCurl. Backend writes go to BACKEND_URL, which can point at a stub server.
+    """
+
+    def __init__(
+        self,
+        user_email: str,
+        organization_id: Any = None,
+        checkpoint_path: str = BULK_CHECKPOINT_PATH,
+        fetch_profile: Optional[Callable[[str], Optional[dict]]] = None,
+        workers: Optional[Dict[str, int]] = None,
+        queue_size: int = BULK_QUEUE_SIZE,
+        resolve_pictures: bool = True,
+    ):
+        self.user_email = user_email
+        self.organization_id = organization_id
+        self.checkpoint_path = checkpoint_path
+        self.fetch_profile = fetch_profile or fetch_linkedin_profile
+        self.workers = dict(BULK_STAGE_WORKERS)
+        self.workers.update(workers or {})
+        self.workers['dedup'] = 1
+        self.queue_size = queue_size
+        self.resolve_pictures = resolve_pictures
+        self.profile_ids: Dict[str, str] = {}
+        self.checkpoint: Optional[IngestCheckpoint] = None
+        # Normalized LinkedIn URL -> meta expert created in this run and not written yet. The org
+        # dedup index also gets them, but loses them when a roster refresh rebuilds it.
+        self._reservations: Dict[str, dict] = {}
+        self._reservations_lock = threading.Lock()
+        self.stages = [
+            ('fetch', self._fetch),
+            ('normalize', self._normalize),
+            ('dedup', self._dedup),
+            ('enrich', self._enrich),
+            ('write', self._write),
+        ]
+        self.stats = {name: StageStats(name, self.workers[name]) for name, _ in self.stages}
+
+    def _fetch(self, item: _Item) -> Optional[_Item]:
+        item.profile = self.fetch_profile(item.url)
+        if item.profile is None:
+            raise RuntimeError('profile could not be loaded')
+        return item
+
+    def _normalize(self, item: _Item) -> Optional[_Item]:
+        item.expert, item.jobs = normalize_linkedin_profile(item.profile, item.url, self.profile_ids)
+        item.profile = None
+        if self.resolve_pictures:
+            resolve_profile_picture(item.expert, item.url)
+        item.new_expert = dict(item.expert, jobs=item.jobs)
+        if self.organization_id is not None:
+            item.new_expert['organization_id'] = self.organization_id
+        return item
+
+    def _dedup(self, item: _Item) -> Optional[_Item]:
+        key = normalize_linkedin_url(item.new_expert.get('linkedInLink') or item.url)
+        with self._reservations_lock:
+            reserved = self._reservations.get(key)
+        if reserved is not None:
+            item.meta_expert, item.action = plan_for_match(reserved, item.new_expert)
+            return item
+        item.meta_expert, item.action = plan_meta_expert(self.user_email, item.new_expert)
+        if item.action == 'create':
+            # Claim the new record now so later profiles of the same person match it. The claim
+            # is a copy: enrich fills in item.meta_expert while other items may read the claim.
+            reserved = item.meta_expert.copy()
+            with self._reservations_lock:
+                self._reservations[key] = reserved
+            item.reservation = key
+            upsert_in_org_index(item.new_expert.get('organization_id'), reserved)
+        return item
+
+    def _release(self, item: _Item) -> None:
+        with self._reservations_lock:
+            self._reservations.pop(item.reservation, None)
+        item.reservation = None
+
+    def _enrich(self, item: _Item) -> Optional[_Item]:
+        item.meta_expert, item.meta_jobs, item.tags = enrich_meta_expert(item.meta_expert, item.new_expert, item.action)
+        return item
+
+    def _write(self, item: _Item) -> Optional[_Item]:
+        write_meta_expert(self.user_email, item.meta_expert, item.new_expert, item.action, item.meta_jobs, item.tags)
+        # Written: the roster cache and the org indexes hold the record from here on
+        self._release(item)
+        save_expert(self.user_email, item.expert, item.meta_expert, item.jobs)
+        self.checkpoint.record(
+            item.url, 'done', expertId=item.expert['id'], metaExpertId=item.meta_expert.get('id'), action=item.action
+        )
+        return item
+
+    def _fail(self, item: _Item, stage: str, error: Exception) -> None:
+        if item.reservation is not None:
+            self._release(item)
+            remove_from_org_index(item.new_expert.get('organization_id'), item.meta_expert.get('id'))
+        print(f"Bulk ingest: {item.url} failed in {stage}: {error}")
+        self.checkpoint.record(item.url, 'failed', stage=stage, error=str(error))
+
+    def _worker(self, index: int, inbox: queue.Queue, outbox: Optional[queue.Queue], remaining: List[int], lock: threading.Lock) -> None:
+        name, func = self.stages[index]
+        stats = self.stats[name]
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                with lock:
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+                if last and outbox is not None:
+                    for _ in range(self.workers[self.stages[index + 1][0]]):
+                        outbox.put(_STOP)
+                return
+            start = time.perf_counter()
+            try:
+                result = func(item)
+                ok = True
+            except Exception as e:
+                self._fail(item, name, e)
+                result, ok = None, False
+            end = time.perf_counter()
+            with lock:
+                stats.busy_seconds += end - start
+                stats.first_start = start if stats.first_start is None else min(stats.first_start, start)
+                stats.last_end = end if stats.last_end is None else max(stats.last_end, end)
+                if ok:
+                    stats.processed += 1
+                else:
+                    stats.failed += 1
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+    def run(self, urls: Iterable[str]) -> Dict[str, Any]:
+        """Ingest the profile URLs not already completed in the checkpoint and return a summary."""
+        self.checkpoint = IngestCheckpoint(self.checkpoint_path)
+        pending, skipped, invalid = [], 0, 0
+        for url in urls:
+            if self.checkpoint.is_done(url):
+                skipped += 1
+                continue
+            profile_url = normalize_profile_url(url)
+            if profile_url is None:
+                self.checkpoint.record(url, 'invalid')
+                invalid += 1
+                continue
+            pending.append(profile_url)
+        print(f"Bulk ingest: {len(pending)} profiles to process, {skipped} already done, {invalid} invalid")
+
+        started = time.perf_counter()
+        try:
+            self.profile_ids = get_profile_type_ids()
+            queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+            remaining = [self.workers[name] for name, _ in self.stages]
+            lock = threading.Lock()
+            threads = []
+            for index, (name, _) in enumerate(self.stages):
+                outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+                for n in range(self.workers[name]):
+                    thread = threading.Thread(
+                        target=self._worker, args=(index, queues[index], outbox, remaining, lock),
+                        name=f'bulk-{name}-{n}', daemon=True,
+                    )
+                    thread.start()
+                    threads.append(thread)
+            for url in pending:
+                queues[0].put(_Item(url))
+            for _ in range(self.workers[self.stages[0][0]]):
+                queues[0].put(_STOP)
+            for thread in threads:
+                thread.join()
+        finally:
+            self.checkpoint.close()
+
+        elapsed = time.perf_counter() - started
+        stages = {name: stats.as_dict() for name, stats in self.stats.items()}
+        done = stages['write']['processed']
+        summary = {
+            'total': len(pending) + skipped + invalid,
+            'done': done,
+            'failed': sum(stage['failed'] for stage in stages.values()),
+            'skipped': skipped,
+            'invalid': invalid,
+            'elapsed_s': elapsed,
+            'per_second': done / elapsed if elapsed > 0 else 0.0,
+            'stages': stages,
+        }
+        self.report(summary)
+        return summary
+
+    @staticmethod
+    def report(summary: Dict[str, Any]) -> None:
+        print(
+            f"Bulk ingest: {summary['done']} done, {summary['failed']} failed, {summary['skipped']} skipped, "
+            f"{summary['invalid']} invalid in {summary['elapsed_s']:.1f} s ({summary['per_second']:.2f} profiles/s)"
+        )
+        for name, stage in summary['stages'].items():
+            print(
+                f"  {name:<9} x{stage['workers']:<2} {stage['processed']:>6} ok {stage['failed']:>4} failed  "
+                f"{stage['per_second']:8.2f}/s  {stage['avg_ms']:8.1f} ms/item  {stage['utilization']:4.0%} busy"
+            )
+
+
+def ingest_profiles_file(path: str, user_email: str, organization_id: Any = None, **kwargs: Any) -> Dict[str, Any]:
+    """Bulk-ingest every profile URL in a JSONL or CSV file (see BulkIngest for the options)."""
+    return BulkIngest(user_email, organization_id=organization_id, **kwargs).run(read_profile_urls(path))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest LinkedIn profile URLs from a JSONL or CSV file.')
+    parser.add_argument('path')
+    parser.add_argument('user_email')
+    parser.add_argument('--organization-id')
+    parser.add_argument('--checkpoint', default=BULK_CHECKPOINT_PATH)
+    args = parser.parse_args()
+    ingest_profiles_file(args.path, args.user_email, organization_id=args.organization_id, checkpoint_path=args.checkpoint)
@@ -4,4 +4,23 @@ constants = {
     "GET_FILTER_TAGS_MODEL": "gpt-4o",
     "DESCRIPTION_MODEL": "gpt-4o",
     "EXPERT_TAGS_MODEL": "gpt-4o"
-}
\ No newline at end of file
+}
+
+# The fixed seniority taxonomy jobs are classified into, most to least senior
+SENIORITY_LEVELS = [
+    "Owner",
+    "Partner",
+    "C-Suite",
+    "Vice-President",
+    "Director",
+    "Manager",
+    "Senior",
+    "Entry",
+    "Trainee",
+]
+
+# Provider rate limits per model (requests and tokens per minute) used by the LLM scheduler
+MODEL_RATE_LIMITS = {
+    "gpt-4o": {"rpm": 5000, "tpm": 800000},
+}
+DEFAULT_MODEL_RATE_LIMIT = {"rpm": 500, "tpm": 200000}
@@ -0,0 +1,272 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .name_matching import NAME_MATCH_THRESHOLD
+
+NGRAM_SIZE = 3
+_PAD_START = '\x02'
+_PAD_END = '\x03'
+
+
+def normalize_linkedin_url(url: Optional[str]) -> Optional[str]:
+    """Reduce a LinkedIn profile URL to a stable key (no scheme, www, query string or trailing slash)."""
+    if not url:
+        return None
+    key = url.strip().lower()
+    for prefix in ('https://', 'http://'):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    for prefix in ('www.', 'm.'):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    key = key.split('?', 1)[0].split('#', 1)[0].rstrip('/')
+    return key or None
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    key = email.strip().lower()
+    return key or None
+
+
+def max_name_distance(name_length: int, threshold: float = NAME_MATCH_THRESHOLD) -> int:
+    """Largest edit distance a candidate can have and still pass the fractional name threshold.
+
+    The divisor is the longer of the two names, which is at most name_length + distance.
+    """
+    distance = 0
+    while distance + 1 < threshold * (name_length + distance + 1):
+        distance += 1
+    return distance
+
+
+def name_ngrams(name: str, n: int = NGRAM_SIZE) -> set:
+    padded = _PAD_START * (n - 1) + name + _PAD_END * (n - 1)
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class MetaExpertIndex:
+    """Hash and n-gram lookups over one organization's meta experts.
+
+    LinkedIn URL and email lookups are O(1). Name lookups only look at experts that share
+    enough n-grams with the new name to possibly be within the allowed edit distance
+    (q-gram lemma), so the expensive distance check runs on a handful of candidates.
+    Lookups return experts in insertion order, matching the order of the backend roster.
+    """
+
+    def __init__(self, source_version: Any = None):
+        self.source_version = source_version
+        self._lock = threading.RLock()
+        self._experts: Dict[Any, dict] = {}
+        self._keys: Dict[Any, Tuple[Optional[str], Optional[str], str]] = {}
+        self._seq: Dict[Any, int] = {}
+        self._next_seq = 0
+        # Values are dicts used as insertion-ordered sets of expert ids
+        self._by_linkedin: Dict[str, Dict[Any, None]] = defaultdict(dict)
+        self._by_email: Dict[str, Dict[Any, None]] = defaultdict(dict)
+        self._by_name: Dict[str, Dict[Any, None]] = defaultdict(dict)
+        self._by_ngram: Dict[str, Dict[Any, None]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self._experts)
+
+    @staticmethod
+    def _expert_key(expert: dict) -> Any:
+        return expert.get('id') or id(expert)
+
+    def add_many(self, experts: Iterable[dict]) -> None:
+        for expert in experts:
+            self.upsert(expert)
+
+    def upsert(self, expert: dict) -> None:
+        """Insert a meta expert, or re-key it if its LinkedIn URL, email or name changed."""
+        key = self._expert_key(expert)
+        linkedin_key = normalize_linkedin_url(expert.get('linkedInLink') or expert.get('linkedinlink'))
+        email_key = normalize_email(expert.get('email'))
+        name_key = (expert.get('name') or '').lower()
+        with self._lock:
+            if key in self._keys:
+                self._unlink(key)
+            else:
+                self._seq[key] = self._next_seq
+                self._next_seq += 1
+            self._experts[key] = expert
+            self._keys[key] = (linkedin_key, email_key, name_key)
+            if linkedin_key:
+                self._by_linkedin[linkedin_key][key] = None
+            if email_key:
+                self._by_email[email_key][key] = None
+            if name_key:
+                self._by_name[name_key][key] = None
+                for gram in name_ngrams(name_key):
+                    self._by_ngram[gram][key] = None
+
+    def remove(self, expert_id: Any) -> None:
+        with self._lock:
+            if expert_id not in self._keys:
+                return
+            self._unlink(expert_id)
+            del self._keys[expert_id]
+            del self._experts[expert_id]
+            del self._seq[expert_id]
+
+    def _unlink(self, key: Any) -> None:
+        linkedin_key, email_key, name_key = self._keys[key]
+        if linkedin_key:
+            self._discard(self._by_linkedin, linkedin_key, key)
+        if email_key:
+            self._discard(self._by_email, email_key, key)
+        if name_key:
+            self._discard(self._by_name, name_key, key)
+            for gram in name_ngrams(name_key):
+                self._discard(self._by_ngram, gram, key)
+
+    @staticmethod
+    def _discard(table: Dict[str, Dict[Any, None]], bucket: str, key: Any) -> None:
+        ids = table.get(bucket)
+        if ids is None:
+            return
+        ids.pop(key, None)
+        if not ids:
+            del table[bucket]
+
+    def _first(self, table: Dict[str, Dict[Any, None]], bucket: Optional[str]) -> Optional[dict]:
+        if not bucket:
+            return None
+        with self._lock:
+            ids = table.get(bucket)
+            if not ids:
+                return None
+            return self._experts[min(ids, key=self._seq.__getitem__)]
+
+    def find_by_linkedin(self, linkedin_url: Optional[str]) -> Optional[dict]:
+        return self._first(self._by_linkedin, normalize_linkedin_url(linkedin_url))
+
+    def find_by_email(self, email: Optional[str]) -> Optional[dict]:
+        return self._first(self._by_email, normalize_email(email))
+
+    def name_candidates(self, name: str, threshold: float = NAME_MATCH_THRESHOLD) -> List[dict]:
+        """Experts whose names could be within the fractional edit-distance threshold of name.
+
+        This is a superset filter: callers still need to verify the actual distance.
+        """
+        name_key = (name or '').lower()
+        if not name_key:
+            return []
+        max_distance = max_name_distance(len(name_key), threshold)
+        with self._lock:
+            if max_distance == 0:
+                ids = list(self._by_name.get(name_key, ()))
+            else:
+                grams = name_ngrams(name_key)
+                min_shared = len(grams) - NGRAM_SIZE * max_distance
+                if min_shared <= 0:
+                    # Too few n-grams to prune safely; fall back to the length filter alone
+                    ids = list(self._experts)
+                else:
+                    shared: Dict[Any, int] = defaultdict(int)
+                    for gram in grams:
+                        for key in self._by_ngram.get(gram, ()):
+                            shared[key] += 1
+                    ids = [key for key, count in shared.items() if count >= min_shared]
+                ids = [
+                    key for key in ids
+                    if abs(len(self._keys[key][2]) - len(name_key)) <= max_distance
+                ]
+            ids.sort(key=self._seq.__getitem__)
+            return [self._experts[key] for key in ids]
+
+
+_org_indexes: Dict[Any, MetaExpertIndex] = {}
+_org_indexes_lock = threading.Lock()
+# One build lock per organization, so a rebuild never blocks lookups or builds of other
+# organizations, and concurrent callers of one organization share a single build.
+_org_build_locks: Dict[Any, threading.Lock] = {}
+# Writes made while an organization's index is being rebuilt, replayed onto the new index.
+_org_pending_writes: Dict[Any, List[Tuple[str, Any]]] = {}
+
+
+def _is_current(index: Optional[MetaExpertIndex], source_version: int) -> bool:
+    # Versions only grow, so an index built from newer content than the caller saw is kept
+    return index is not None and index.source_version >= source_version
+
+
+def get_org_index(organization_id: Any, roster: List[dict], source_version: int) -> MetaExpertIndex:
+    """Return the dedup index for an organization, (re)building it from roster when it is stale.
+
+    source_version is the organization's roster content version the index was built from (see
+    roster_cache.RosterSnapshot.version_of). Writes made through upsert_in_org_index keep the index in
+    step with the backend without a rebuild.
+    """
+    with _org_indexes_lock:
+        index = _org_indexes.get(organization_id)
+        if _is_current(index, source_version):
+            return index
+        build_lock = _org_build_locks.setdefault(organization_id, threading.Lock())
+
+    with build_lock:
+        with _org_indexes_lock:
+            index = _org_indexes.get(organization_id)
+            if _is_current(index, source_version):
+                return index
+            _org_pending_writes[organization_id] = []
+        index = MetaExpertIndex(source_version=source_version)
+        try:
+            index.add_many(
+                expert for expert in roster
+                if expert.get('organization_id') == organization_id
+            )
+        except Exception:
+            with _org_indexes_lock:
+                del _org_pending_writes[organization_id]
+            raise
+        with _org_indexes_lock:
+            # Replayed and published under one lock hold so no write falls in between
+            for action, value in _org_pending_writes.pop(organization_id):
+                _replay(index, action, value)
+            _org_indexes[organization_id] = index
+        return index
+
+
+def _apply_write(organization_id: Any, action: str, value: Any) -> None:
+    with _org_indexes_lock:
+        pending = _org_pending_writes.get(organization_id)
+        if pending is not None:
+            pending.append((action, value))
+        index = _org_indexes.get(organization_id)
+    if index is not None:
+        _replay(index, action, value)
+
+
+def _replay(index: MetaExpertIndex, action: str, value: Any) -> None:
+    if action == 'upsert':
+        index.upsert(value)
+    else:
+        index.remove(value)
+
+
+def set_organization_key(expert: dict, organization_id: Any) -> dict:
+    """Key a locally written meta expert by organization_id, which index rebuilds filter on.
+
+    Records created here carry the backend's organizationID casing instead; without the key
+    they would drop out of the org indexes at the next rebuild from the cached roster.
+    """
+    if 'organization_id' not in expert:
+        expert['organization_id'] = organization_id
+    return expert
+
+
+def upsert_in_org_index(organization_id: Any, expert: dict) -> None:
+    """Reflect a meta expert write in the organization's index, if one has been built."""
+    set_organization_key(expert, organization_id)
+    _apply_write(organization_id, 'upsert', expert)
+
+
+def remove_from_org_index(organization_id: Any, expert_id: Any) -> None:
+    _apply_write(organization_id, 'remove', expert_id)
+
+
+def clear_org_indexes() -> None:
+    with _org_indexes_lock:
+        _org_indexes.clear()
@@ -0,0 +1,188 @@
+import functools
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+FILTER_TIMINGS = ('current', '1_2_years', '2_3_years', '3_4_years', '4_plus_years')
+# Open-ended (current) jobs sort after every real end date
+OPEN_END = np.iinfo(np.int64).max
+OPEN_START = np.iinfo(np.int64).min
+_SECONDS_PER_YEAR = 86400 * 365
+# timing -> (min, max] years since the job ended, as in the frontend's jobMatchesTiming
+_TIMING_YEARS = {
+    '1_2_years': (1, 2),
+    '2_3_years': (2, 3),
+    '3_4_years': (3, 4),
+    '4_plus_years': (4, None),
+}
+
+
+def parse_job_date(value: Any) -> Optional[datetime]:
+    """Parse a job startDate/endDate (ISO string or datetime) to an aware UTC datetime."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    if isinstance(value, str):
+        return _string_epoch(value)
+    parsed = parse_job_date(value)
+    return int(parsed.timestamp()) if parsed is not None else None
+
+
+@functools.lru_cache(maxsize=65536)
+def _string_epoch(value: str) -> Optional[int]:
+    # Rosters repeat a small set of dates, so index builds mostly hit this cache
+    parsed = parse_job_date(value)
+    return int(parsed.timestamp()) if parsed is not None else None
+
+
+def job_bounds(job: dict) -> Tuple[int, int]:
+    """(start, end) epoch seconds of a job; missing dates become open bounds."""
+    start = to_epoch(job.get('startDate'))
+    end = to_epoch(job.get('endDate'))
+    return (OPEN_START if start is None else start), (OPEN_END if end is None else end)
+
+
+def timing_end_range(timing: str, now: Optional[datetime] = None) -> Tuple[Optional[float], Optional[float]]:
+    """Half-open [low, high) range of end epochs (None = unbounded) for a timing bucket.
+
+    Equivalent to jobMatchesTiming: "current" is no end date or one not yet passed, the others
+    are (min, max] years (of 365 days) between the end date and now, so open-ended jobs never
+    fall in them.
+    """
+    now_epoch = (now or datetime.now(timezone.utc)).timestamp()
+    if timing == 'current':
+        return now_epoch, None
+    if timing not in _TIMING_YEARS:
+        raise ValueError(f"Unknown filter timing: {timing}")
+    min_years, max_years = _TIMING_YEARS[timing]
+    # years > min_years  <=>  end < now - min_years; years <= max_years  <=>  end >= now - max_years
+    low = None if max_years is None else now_epoch - max_years * _SECONDS_PER_YEAR
+    return low, now_epoch - min_years * _SECONDS_PER_YEAR
+
+
+def job_matches_timing(job: dict, timing: Optional[str], now: Optional[datetime] = None) -> bool:
+    """Python port of the frontend's jobMatchesTiming (buckets are years since endDate)."""
+    if not timing:
+        return True
+    _, end = job_bounds(job)
+    low, high = timing_end_range(timing, now)
+    return (low is None or end >= low) and (high is None or end < high)
+
+
+class _IntervalPosting:
+    """Jobs of one posting as parallel arrays sorted by end date."""
+
+    __slots__ = ('entries', 'ends', 'starts', 'owners', 'dirty')
+
+    def __init__(self):
+        self.entries: Dict[int, List[Tuple[int, int]]] = {}
+        self.ends = self.starts = self.owners = None
+        self.dirty = True
+
+    def build(self) -> None:
+        rows = [(end, start, owner) for owner, bounds in self.entries.items() for start, end in bounds]
+        rows.sort(key=lambda row: row[0])
+        self.ends = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self.starts = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        self.owners = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        self.dirty = False
+
+
+class JobIntervalIndex:
+    """Per-posting sorted-endpoint index over job [start, end] intervals, owned by int ordinals.
+
+    Each posting (e.g. ('company', 'Google')) keeps its jobs' integer epoch bounds sorted by end
+    date, so a timing bucket is two binary searches over the posting and "held during a window"
+    is a binary search plus one vectorised start-date comparison, instead of parsing the ISO
+    dates of every job on every query. Changes mark the posting dirty; it is re-sorted on the
+    next query that touches it.
+    """
+
+    def __init__(self):
+        self._postings: Dict[Hashable, _IntervalPosting] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, owner: int, bounds: Tuple[int, int]) -> None:
+        """Record one job of owner in a posting; bounds is job_bounds(job)."""
+        with self._lock:
+            posting = self._postings.get(key)
+            if posting is None:
+                posting = self._postings[key] = _IntervalPosting()
+            posting.entries.setdefault(owner, []).append(bounds)
+            posting.dirty = True
+
+    def add_many(self, jobs: Iterable[Tuple[Hashable, int, Tuple[int, int]]]) -> None:
+        """add() for many (key, owner, bounds) entries under one lock acquisition."""
+        with self._lock:
+            postings = self._postings
+            for key, owner, bounds in jobs:
+                posting = postings.get(key)
+                if posting is None:
+                    posting = postings[key] = _IntervalPosting()
+                posting.entries.setdefault(owner, []).append(bounds)
+                posting.dirty = True
+
+    def discard(self, key: Hashable, owner: int) -> None:
+        with self._lock:
+            posting = self._postings.get(key)
+            if posting is None or posting.entries.pop(owner, None) is None:
+                return
+            if posting.entries:
+                posting.dirty = True
+            else:
+                del self._postings[key]
+
+    def _posting(self, key: Hashable) -> Optional[_IntervalPosting]:
+        posting = self._postings.get(key)
+        if posting is not None and posting.dirty:
+            posting.build()
+        return posting
+
+    def ending_between(self, key: Hashable, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Owners with a job in the posting whose end lies in [low, high) (None = unbounded)."""
+        return self.matching(key, end_range=(low, high))
+
+    def matching_timing(self, key: Hashable, timing: str, now: Optional[datetime] = None) -> np.ndarray:
+        return self.matching(key, end_range=timing_end_range(timing, now))
+
+    def active_during(self, key: Hashable, window_start: Optional[int], window_end: Optional[int]) -> np.ndarray:
+        """Owners with a job in the posting overlapping [window_start, window_end]."""
+        return self.matching(key, window=(window_start, window_end))
+
+    def matching(
+        self,
+        key: Hashable,
+        end_range: Optional[Tuple[Optional[float], Optional[float]]] = None,
+        window: Optional[Tuple[Optional[int], Optional[int]]] = None,
+    ) -> np.ndarray:
+        """Owners (with repeats) having one job that satisfies both conditions.
+
+        end_range is a half-open [low, high) range of end dates, as from timing_end_range;
+        window is a [start, end] period the job must overlap. Either bound may be None.
+        """
+        low, high = end_range or (None, None)
+        window_start, window_end = window or (None, None)
+        if window_start is not None:
+            low = window_start if low is None else max(low, window_start)
+        with self._lock:
+            posting = self._posting(key)
+            if posting is None:
+                return np.empty(0, dtype=np.int64)
+            first = 0 if low is None else int(np.searchsorted(posting.ends, low, side='left'))
+            last = len(posting.ends) if high is None else int(np.searchsorted(posting.ends, high, side='left'))
+            owners = posting.owners[first:last]
+            if window_end is not None:
+                owners = owners[posting.starts[first:last] <= window_end]
+            return owners
@@ -1,210 +1,250 @@
 import requests
 import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 import uuid
+from urllib.parse import parse_qsl, urlsplit
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import pytz
 
-from ..utils.tag_expert import tag_expert
-from ..utils.constants import constants
-from ..utils.google_dorking import get_user_pfp, reverse_image_search
-from ..utils.backend_interaction import get_from_backend, send_to_backend
+from .tag_expert import tag_expert
+from .constants import constants
+from .backend_interaction import get_from_backend, send_to_backend
+from .dedup_index import normalize_linkedin_url
+from .locations import gazetteer
+from .proxycurl_client import PERSON_ENDPOINT, proxycurl
 from dotenv import load_dotenv
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Iterator, List, Dict, Tuple, Optional
 
 if os.getenv('FLASK_ENV') != 'production':
     load_dotenv()
 
-api_key = os.getenv('PROXYCURL_API_KEY')
+# Concurrent search queries / profile enrichments in find_experts_and_create_profiles
+SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', '4'))
+ENRICH_MAX_WORKERS = int(os.getenv('ENRICH_MAX_WORKERS', '4'))
+PERSON_PROFILE_PARAMS = {
+    'extra': 'include',
+    'github_profile_id': 'include',
+    'facebook_profile_id': 'include',
+    'twitter_profile_id': 'include',
+    'personal_contact_number': 'include',
+    'personal_email': 'include',
+    'inferred_salary': 'include',
+    'skills': 'include',
+    'use_cache': 'if-recent',
+    'fallback_to_cache': 'never',
+}
+
+def normalize_profile_url(profile_url: str) -> Optional[str]:
+    """The profile URL as make_expert_from_linkedin expects it, or None if it is not LinkedIn."""
+    if not profile_url or 'linkedin' not in profile_url:
+        return None
+    profile_url = profile_url.strip()
+    if profile_url[:3] == "lin":
+        profile_url = "https://www." + profile_url
+    return profile_url
+
+
+def get_profile_type_ids() -> Dict[str, str]:
+    if constants.get('PROJECT_ID') is None:
+        return {}
+    profiles = get_from_backend(path=f'email-project-profiles/{constants["PROJECT_ID"]}')
+    return {profile['name']: profile['id'] for profile in profiles.get('profileTypes')}
+
+
+def fetch_linkedin_profile(profile_url: str) -> Optional[dict]:
+    """ProxyCurl person profile for a LinkedIn URL, or None if it could not be loaded."""
+    response = proxycurl.get_person(profile_url, extra_params=PERSON_PROFILE_PARAMS)
+    if not response.ok:
+        print(f'Failed to load profile: {response.status_code}, {response.text}')
+        return None
+    return response.data
+
+
+def _proxycurl_date(date: Optional[dict]) -> str:
+    return datetime(date.get("year", 1), date.get("month", 1), date.get("day", 1), tzinfo=pytz.UTC).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def normalize_linkedin_profile(profile_data: dict, profile_url: str, profile_ids: Optional[Dict[str, str]] = None) -> Tuple[dict, List[dict]]:
+    """Turn a ProxyCurl profile into the backend's expert record and its jobs (no network calls)."""
+    expert = {}
+    expert['id'] = str(uuid.uuid4())
+    expert['name'] = f'{profile_data.get("full_name")}'
+
+    occupation = profile_data.get("occupation")
+    if occupation and ' at ' in occupation:
+        role, company = occupation.split(' at ', 1)
+        expert['profession'] = role
+        expert['company'] = company
+    else:
+        expert['profession'] = occupation
+        expert['company'] = None
+    geography_parts = [profile_data.get("city"), profile_data.get("state"), profile_data.get("country")]
+    expert['geography'] = ', '.join([part for part in geography_parts if part])
+    expert['city'] = profile_data.get("city")
+    expert['state'] = profile_data.get("state")
+    expert['country'] = profile_data.get("country")
+    expert['countryFullName'] = profile_data.get("country_full_name")
+    # Resolved once here so location filters compare gazetteer positions, not strings
+    expert['locationId'] = gazetteer.resolve(expert['city'], expert['state'], expert['countryFullName'] or expert['country'])
+    expert['description'] = profile_data.get("headline")
+    expert['expertNetworkName'] = "Self-Sourced"
+    expert['favorite'] = False
+    expert['status'] = 'Sourced'
+    expert['internalStatus'] = 'Not Reviewed'
+    expert['checked'] = True
+    expert['linkedInLink'] = profile_url
+    expert['projectId'] = constants.get('PROJECT_ID')
+    if constants.get('PROJECT_ID') is not None:
+        profile_type_id = (profile_ids or {}).get('No Profile')
+        expert['profileTypeId'] = profile_type_id
+    if (profile_data.get("connections") or 0) < 50:
+        expert['linkedInConnectionCount'] = profile_data.get("connections")
+
+    recentEnd = (datetime.now() - relativedelta(years=100)).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+    jobs = []
+    for experience in profile_data.get("experiences") or []:
+        job = {}
+        job['id'] = str(uuid.uuid4())
+        job['role'] = experience.get("title")
+        job['company'] = experience.get("company")
+        job['projectId'] = constants.get('PROJECT_ID')
+        job['industry'] = experience.get("industry")
+        job['description'] = experience.get("description")
+        job['location'] = experience.get("location")
+        job['locationId'] = gazetteer.resolve_text(job['location'])
+        job['isEducation'] = False
+
+        start = experience.get("starts_at", {})
+        end = experience.get("ends_at", {})
+
+        if start:
+            job['startDate'] = _proxycurl_date(start)
+
+        if end and 'year' in end and 'month' in end and 'day' in end:
+            job['endDate'] = _proxycurl_date(end)
+        else:
+            job['endDate'] = None
+
+        job['expertId'] = expert['id']
+
+        if job['endDate']:
+            if datetime.fromisoformat(job['endDate']) > datetime.fromisoformat(recentEnd):
+                expert['startDate'] = job.get('startDate')
+                if expert['company'] is None: expert['company'] = job['company']
+                expert['departureTime'] = job["endDate"]
+
+        jobs.append(job)
+
+    # Process education data
+    for education in profile_data.get("education") or []:
+        edu_job = {}
+        edu_job['id'] = str(uuid.uuid4())
+        edu_job['role'] = education.get("degree_name")  # Degree as role
+        edu_job['company'] = education.get("school")    # School as company
+        edu_job['projectId'] = constants.get('PROJECT_ID')
+        edu_job['industry'] = None
+        edu_job['description'] = education.get("field_of_study")
+        edu_job['location'] = education.get("location")
+        edu_job['locationId'] = gazetteer.resolve_text(edu_job['location'])
+        edu_job['isEducation'] = True  # Mark as education
+
+        start = education.get("starts_at", {})
+        end = education.get("ends_at", {})
+
+        if start:
+            edu_job['startDate'] = _proxycurl_date(start)
+
+        if end and 'year' in end and 'month' in end and 'day' in end:
+            edu_job['endDate'] = _proxycurl_date(end)
+        else:
+            edu_job['endDate'] = None
+
+        edu_job['expertId'] = expert['id']
+        jobs.append(edu_job)
+
+    expert['profilePictureLink'] = profile_data.get('profile_pic_url')
+    return expert, jobs
+
+
+def resolve_profile_picture(expert: dict, profile_url: str) -> None:
+    """Replace a non-LinkedIn profile picture via Google dorking / reverse image search."""
+    # google_dorking ships with the app package only; importing it here keeps profile
+    # normalisation usable without it (benchmarks, load harness)
+    from .google_dorking import get_user_pfp, reverse_image_search
+
+    if expert['profilePictureLink'] and 'media.licdn.com' not in expert['profilePictureLink']:
+        expert['profilePictureLink'] = get_user_pfp(name=expert['name'], company=expert['company'], linkedin_link=profile_url)
+
+    if expert['profilePictureLink'] and 'media.licdn.com' not in expert['profilePictureLink']:
+        expert['profilePictureLink'] = reverse_image_search(expert['profilePictureLink'])
+
+
+def save_expert(user_email: str, expert: dict, meta_expert: dict, jobs: List[dict]) -> None:
+    """Link the expert to its meta expert and write the expert and its jobs to the backend."""
+    expert['metaExpertId'] = meta_expert['id']
+
+    send_to_backend(
+        data=expert,
+        path=f"expert/{user_email}",
+    )
+
+    send_to_backend(
+        data=jobs,
+        path=f"jobs",
+    )
+
 
 def make_expert_from_linkedin(profile_url: str, user_email: str, new_request_type: bool):
     print('making expert from linkedin')
-    if 'linkedin' not in profile_url:
+    profile_url = normalize_profile_url(profile_url)
+    if profile_url is None:
         print('invalid profile')
         return
-    
-    if profile_url[:2] == "lin":
-        profile_url = "https://www." + profile_url
-    
-    if constants['PROJECT_ID'] is not None:
-        profiles = get_from_backend(path=f'email-project-profiles/{constants["PROJECT_ID"]}')
-        profile_ids = {profile['name']: profile['id'] for profile in profiles.get('profileTypes')}
-
-    api_endpoint = 'https://nubela.co/proxycurl/api/v2/linkedin'
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json',
-    }
-    params = {
-        'linkedin_profile_url': profile_url,
-        'extra': 'include',
-        'github_profile_id': 'include',
-        'facebook_profile_id': 'include',
-        'twitter_profile_id': 'include',
-        'personal_contact_number': 'include',
-        'personal_email': 'include',
-        'inferred_salary': 'include',
-        'skills': 'include',
-        'use_cache': 'if-recent',
-        'fallback_to_cache': 'never',
-    }
-    response = requests.get(api_endpoint, params=params, headers=headers)
-
-    if response.status_code == 200:
-        profile_data = response.json()
-
-        expert = {}
-        expert['id'] = str(uuid.uuid4())
-        expert['name'] = f'{profile_data.get("full_name")}'
-        
-        occupation = profile_data.get("occupation")
-        if occupation and ' at ' in occupation:
-            role, company = occupation.split(' at ', 1)
-            expert['profession'] = role
-            expert['company'] = company
-        else:
-            expert['profession'] = occupation
-            expert['company'] = None
-        geography_parts = [profile_data.get("city"), profile_data.get("state"), profile_data.get("country")]
-        expert['geography'] = ', '.join([part for part in geography_parts if part])
-        expert['city'] = profile_data.get("city")
-        expert['state'] = profile_data.get("state")
-        expert['country'] = profile_data.get("country")
-        expert['countryFullName'] = profile_data.get("country_full_name")
-        expert['description'] = profile_data.get("headline")
-        expert['expertNetworkName'] = "Self-Sourced"
-        expert['favorite'] = False
-        expert['status'] = 'Sourced'
-        expert['internalStatus'] = 'Not Reviewed'
-        expert['checked'] = True
-        expert['linkedInLink'] = profile_url
-        expert['projectId'] = constants['PROJECT_ID']
-        if constants['PROJECT_ID'] is not None:
-            profile_type_id = profile_ids.get('No Profile')
-            expert['profileTypeId'] = profile_type_id
-        if (profile_data.get("connections") or 0) < 50:
-            expert['linkedInConnectionCount'] = profile_data["connections"]
-            
-        recentEnd = (datetime.now() - relativedelta(years=100)).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-        jobs = []
-        for experience in profile_data.get("experiences", []):
-            job = {}
-            job['id'] = str(uuid.uuid4())
-            job['role'] = experience.get("title")
-            job['company'] = experience.get("company")
-            job['projectId'] = constants['PROJECT_ID']
-            job['industry'] = experience.get("industry")
-            job['description'] = experience.get("description")
-            job['location'] = experience.get("location")
-            job['isEducation'] = False
-            
-            start = experience.get("starts_at", {})
-            end = experience.get("ends_at", {})
-
-            if start:
-                job['startDate'] = datetime(start.get("year", 1), start.get("month", 1), start.get("day", 1), tzinfo=pytz.UTC).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-                
-            if end and 'year' in end and 'month' in end and 'day' in end:
-                job['endDate'] = datetime(end.get("year", 1), end.get("month", 1), end.get("day", 1), tzinfo=pytz.UTC).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-            
-            else:
-                job['endDate'] = None
-
-            job['expertId'] = expert['id']
-
-            if job['endDate']:
-                if datetime.fromisoformat(job['endDate']) > datetime.fromisoformat(recentEnd):
-                    expert['startDate'] = job['startDate']
-                    if expert['company'] is None: expert['company'] = job['company']
-                    expert['departureTime'] = job["endDate"]
-
-            jobs.append(job)
-        
-        # Process education data
-        for education in profile_data.get("education", []):
-            edu_job = {}
-            edu_job['id'] = str(uuid.uuid4())
-            edu_job['role'] = education.get("degree_name")  # Degree as role
-            edu_job['company'] = education.get("school")    # School as company
-            edu_job['projectId'] = constants['PROJECT_ID']
-            edu_job['industry'] = None
-            edu_job['description'] = education.get("field_of_study")
-            edu_job['location'] = education.get("location")
-            edu_job['isEducation'] = True  # Mark as education
-            
-            start = education.get("starts_at", {})
-            end = education.get("ends_at", {})
-
-            if start:
-                edu_job['startDate'] = datetime(start.get("year", 1), start.get("month", 1), start.get("day", 1), tzinfo=pytz.UTC).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-                
-            if end and 'year' in end and 'month' in end and 'day' in end:
-                edu_job['endDate'] = datetime(end.get("year", 1), end.get("month", 1), end.get("day", 1), tzinfo=pytz.UTC).astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-            else:
-                edu_job['endDate'] = None
-
-            edu_job['expertId'] = expert['id']
-            jobs.append(edu_job)
-            
-        expert['profilePictureLink'] = profile_data.get('profile_pic_url')
-        if expert['profilePictureLink'] and 'media.licdn.com' not in expert['profilePictureLink']:
-            expert['profilePictureLink'] = get_user_pfp(name=expert['name'], company=expert['company'], linkedin_link=profile_url)
-            
-        if expert['profilePictureLink'] and 'media.licdn.com' not in expert['profilePictureLink']:
-            expert['profilePictureLink'] = reverse_image_search(expert['profilePictureLink'])
-            
-        if new_request_type is False:
-            print('returing expert and jobs for request type false')
-            return (expert, jobs) or []
-
-        expert['jobs'] = jobs
-        meta_expert = tag_expert(user_email=user_email, new_expert=expert.copy())
-        expert['metaExpertId'] = meta_expert['id']
-                
-        send_to_backend(
-            data=expert,
-            path=f"expert/{user_email}",
-        )
-
-        send_to_backend(
-            data=jobs,
-            path=f"jobs",
-        )
-            
-        print('returing expert and jobs for request type true')
-        return expert
 
-    else:
-        print(f'Failed to load profile: {response.status_code}, {response.text}')
+    profile_ids = get_profile_type_ids()
+    profile_data = fetch_linkedin_profile(profile_url)
+    if profile_data is None:
         return False
 
+    expert, jobs = normalize_linkedin_profile(profile_data, profile_url, profile_ids)
+    resolve_profile_picture(expert, profile_url)
+
+    if new_request_type is False:
+        print('returing expert and jobs for request type false')
+        return (expert, jobs) or []
+
+    expert['jobs'] = jobs
+    meta_expert, _ = tag_expert(user_email=user_email, new_expert=expert.copy())
+    save_expert(user_email, expert, meta_expert, jobs)
+
+    print('returing expert and jobs for request type true')
+    return expert
+
 
 def get_company_details(linkedin_url):
     """
     Fetch company details from Proxycurl API and flatten the address fields.
     
     :param linkedin_url: LinkedIn URL of the company
-    :param api_key: Proxycurl API key
     :return: Dictionary with company details
     """
-    url = "https://nubela.co/proxycurl/api/v2/linkedin"
     params = {
         "url": linkedin_url,
         'use_cache': 'if-recent',
         'fallback_to_cache': 'never',
     }
-    headers = {
-        "Authorization": f"Bearer {api_key}"
-    }
-    
-    response = requests.get(url, params=params, headers=headers)
-    
-    if response.status_code != 200:
+
+    response = proxycurl.get(PERSON_ENDPOINT, params)
+
+    if not response.ok:
         raise Exception(f"Error fetching data: {response.status_code}, {response.text}")
-    
-    data = response.json()
-    
+
+    data = response.data
+
     # Flatten the address fields
     address = data.get("address", {})
     company_details = {
@@ -227,16 +267,15 @@ def get_company_details(linkedin_url):
     return company_details
 
 
-def find_relevant_experts(
-    company: str,
-    role: str,
+def search_params(
+    company: Optional[str],
+    role: Optional[str],
     current: bool,
-    education: bool | None,
-    location: str | None,
+    education: Optional[Dict[str, List[str]]] = None,
+    location: str | Dict[str, str] | None = None,
     page_size: int = 20,
-) -> Tuple[List[Dict], Optional[str]]:
-    headers = {"Authorization": f"Bearer {api_key}"}
-    endpoint = "https://nubela.co/proxycurl/api/v2/search/person"
+) -> Dict[str, str]:
+    """ProxyCurl person-search params for one company x role query."""
     params: Dict[str, str] = {"page_size": str(page_size)}
 
     # Roles
@@ -246,10 +285,11 @@ def find_relevant_experts(
     else:
         params["past_role_title"] = role
         params["past_company_linkedin_profile_url"] = company
-        
 
-    # Location filters
-    if location:
+    # Location filters: free text, or ProxyCurl's own fields (e.g. {"country": "US", "city": "Boston"})
+    if isinstance(location, dict):
+        params.update(location)
+    elif location:
         params["location"] = location
 
     # Education filters
@@ -261,11 +301,189 @@ def find_relevant_experts(
         if "fields_of_study" in education:
             params["education_field_of_study"] = "|".join(education["fields_of_study"])
 
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def next_page_params(next_page: str) -> Dict[str, str]:
+    """Params of a ProxyCurl next_page URL, so the page is fetched through the client (and cache)."""
+    return dict(parse_qsl(urlsplit(next_page).query))
+
+
+def search_page(params: Dict[str, str]) -> Tuple[List[Dict], Optional[str]]:
+    resp = proxycurl.search_people(params)
+    if not resp.ok:
+        raise requests.HTTPError(f"ProxyCurl search failed: {resp.status_code}, {resp.text}")
+    payload = resp.data or {}
+    return payload.get("results") or [], payload.get("next_page")
+
+
+def find_relevant_experts(
+    company: str,
+    role: str,
+    current: bool,
+    education: bool | None,
+    location: str | None,
+    page_size: int = 20,
+) -> Tuple[List[Dict], Optional[str]]:
+    params = search_params(company, role, current, education, location, page_size)
     print(params)
-    resp = requests.get(endpoint, headers=headers, params=params, timeout=60)
-    resp.raise_for_status()
-    payload = resp.json()
-    return payload.get("results", []), payload.get("next_page")
+    return search_page(params)
+
+
+class SearchQuota:
+    """How many experts a search may still hand out, overall and per company.
+
+    A consumer claim()s a slot for each result it works on and settle()s it when done; a
+    result that fails (e.g. its profile cannot be enriched) frees its slot, so the search
+    keeps going. Claims in progress count against the quotas until they settle.
+    """
+
+    def __init__(self, max_total: float, max_per_company: float):
+        self.max_total = max_total
+        self.max_per_company = max_per_company
+        self.accepted = 0
+        self.in_flight = 0
+        self._accepted_by: Dict[str, int] = defaultdict(int)
+        self._in_flight_by: Dict[str, int] = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def _is_open(self, company: str) -> bool:
+        return self.accepted < self.max_total and self._accepted_by[company] < self.max_per_company
+
+    def _has_room(self, company: str) -> bool:
+        return (self.accepted + self.in_flight < self.max_total
+                and self._accepted_by[company] + self._in_flight_by[company] < self.max_per_company)
+
+    def is_open(self, company: str) -> bool:
+        """Whether company could still need results (its quota is not met by accepted ones)."""
+        with self._cond:
+            return self._is_open(company)
+
+    def has_room(self, company: str) -> bool:
+        """Whether a result for company can be claimed right now."""
+        with self._cond:
+            return self._has_room(company)
+
+    def is_full(self) -> bool:
+        with self._cond:
+            return self.accepted >= self.max_total
+
+    def claim(self, company: str) -> bool:
+        with self._cond:
+            if not self._has_room(company):
+                return False
+            self.in_flight += 1
+            self._in_flight_by[company] += 1
+            return True
+
+    def settle(self, company: str, accepted: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._in_flight_by[company] -= 1
+            if accepted:
+                self.accepted += 1
+                self._accepted_by[company] += 1
+            self._cond.notify_all()
+
+    def wait_for_room(self, company: str) -> bool:
+        """Block while unsettled claims fill company's quota; False once accepted results meet it.
+
+        A claim that settles as failed wakes the waiter with its slot free again, so the rest
+        of a page is only given up once the quota can no longer change.
+        """
+        with self._cond:
+            while not self._has_room(company):
+                if not self._is_open(company):
+                    return False
+                self._cond.wait()
+            return True
+
+    def wait_for_settle(self) -> None:
+        with self._cond:
+            if self.in_flight:
+                self._cond.wait()
+
+
+def iter_relevant_experts(
+    companies: Optional[List[str]],
+    roles: Optional[List[str]],
+    current: bool,
+    locations: str | Dict[str, str] | None = None,
+    education: Optional[Dict[str, List[str]]] = None,
+    page_size: int = 20,
+    quota: Optional[SearchQuota] = None,
+    max_workers: int = SEARCH_MAX_WORKERS,
+) -> Iterator[Tuple[str, Optional[str], Dict]]:
+    """Yield (company, role, search result) for every company x role query, lazily.
+
+    Queries run concurrently on max_workers threads (the ProxyCurl client enforces the API
+    rate limit). A query's next_page is requested only after its current page has been
+    handed out, and only while the quota still has room for its company, so no page is paid
+    for once max_experts / max_experts_per_company are met. Profiles found by several queries
+    are yielded once.
+    """
+    quota = quota or SearchQuota(float('inf'), float('inf'))
+    pending = deque(
+        (company, role, search_params(company, role, current, education, locations, page_size))
+        for company in companies or [] for role in roles or [None]
+    )
+    seen = set()
+    running: Dict[Future, Tuple[str, Optional[str]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while True:
+                waiting = deque()
+                for company, role, params in pending:
+                    if len(running) < max_workers and quota.has_room(company):
+                        running[pool.submit(search_page, params)] = (company, role)
+                    elif quota.is_open(company):
+                        waiting.append((company, role, params))
+                    # otherwise the company's quota is met and the query is dropped
+                pending = waiting
+                if not running:
+                    if not pending:
+                        return
+                    # Only claims still being worked on hold the quotas; see whether they fail
+                    quota.wait_for_settle()
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    company, role = running.pop(future)
+                    try:
+                        results, next_page = future.result()
+                    except Exception as e:
+                        print(f"Search for {role} at {company} failed: {e}")
+                        continue
+                    for result in results:
+                        key = normalize_linkedin_url(result.get('linkedin_profile_url'))
+                        if key is None or key in seen:
+                            continue
+                        if not quota.wait_for_room(company):
+                            break
+                        seen.add(key)
+                        yield company, role, result
+                    if quota.is_full():
+                        return
+                    if next_page:
+                        pending.append((company, role, next_page_params(next_page)))
+        finally:
+            for future in running:
+                future.cancel()
+
+
+def _enrich_search_result(profile_url: str, user_email: str, company: str, quota: SearchQuota) -> Optional[Dict]:
+    expert = None
+    try:
+        expert_data = make_expert_from_linkedin(profile_url, user_email, False)
+        if expert_data:
+            expert, jobs = expert_data
+            expert['linkedInLink'] = profile_url  # Ensure LinkedIn link is included
+    except Exception as e:
+        print(f"Enriching {profile_url} failed: {e}")
+    finally:
+        quota.settle(company, expert is not None)
+    return expert
 
 
 def find_experts_and_create_profiles(
@@ -279,46 +497,23 @@ def find_experts_and_create_profiles(
     max_experts: int = 2,
     max_experts_per_company: int = 1,
     enrich_experts: bool = False
-) -> Dict[str, List[Dict]]:
-    all_experts = []
-    experts_count = 0
-    
-    # Process each company individually
-    for company in companies:
-        for role in roles:
-            if experts_count >= max_experts:
-                break
-                
-            # Search for experts at this specific company
-            results, next_page = find_relevant_experts(
-                roles=role,
-                companies=company,  # Pass as a single-item list
-                locations=locations,
-                page_size=page_size,
-                current=current
-            )
-            
-            company_experts = []
-            count = 0
-            for result in results:
-                if count >= max_experts_per_company or experts_count >= max_experts:
-                    break
-                    
-                profile_url = result.get('linkedin_profile_url')
-                if not profile_url:
-                    continue
-                    
-                if enrich_experts:
-                    expert_data = make_expert_from_linkedin(profile_url, user_email, False)
-                    if expert_data:
-                        expert, jobs = expert_data
-                        expert['linkedInLink'] = profile_url  # Ensure LinkedIn link is included
-                        company_experts.append(expert)
-                        count += 1
-                        experts_count += 1
-            
-            if company_experts:
-                all_experts.extend(company_experts)
-    
-    return all_experts
+) -> List[Dict]:
+    """Find up to max_experts people (max_experts_per_company each) across companies x roles.
 
+    Search results stream in from iter_relevant_experts and each profile is enriched
+    (make_expert_from_linkedin) on a worker pool while later pages are still being fetched; a
+    profile that fails to enrich frees its slot for the next result. Results keep search order.
+    Only enriched experts are returned, so without enrich_experts the result is empty (as it
+    always was) and no search is paid for.
+    """
+    if not enrich_experts:
+        return []
+    quota = SearchQuota(max_experts, max_experts_per_company)
+    found: List[Future] = []
+    with ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS) as pool:
+        for company, role, result in iter_relevant_experts(companies, roles, current, locations, page_size=page_size, quota=quota):
+            if not quota.claim(company):
+                continue
+            found.append(pool.submit(_enrich_search_result, result['linkedin_profile_url'], user_email, company, quota))
+    experts = [future.result() for future in found]
+    return [expert for expert in experts if expert]
@@ -0,0 +1,209 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+# Prompts and replies hold candidates' personal data: keep them in the user's cache directory
+# (as proxycurl_client does), not in whatever directory the process was started from
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'llm', 'cache.sqlite3'
+))
+LLM_CACHE_TTL_SECONDS = float(os.getenv('LLM_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '2048'))
+LLM_CACHE_DISK_ENTRIES = int(os.getenv('LLM_CACHE_DISK_ENTRIES', '200000'))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(message: str) -> str:
+    """Collapse whitespace so re-indented templates map to the same cache entry."""
+    return _WHITESPACE.sub(' ', message).strip()
+
+
+def prompt_key(model: str, message: str) -> str:
+    digest = hashlib.sha256()
+    digest.update((model or '').encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(normalize_prompt(message).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """Content-addressed cache of parsed LLM JSON responses.
+
+    Lookups hit an in-memory LRU first and then an SQLite file, so identical prompts
+    (same seniority job, same expert re-tagged) are answered without an OpenAI call.
+    Entries older than ttl_seconds are ignored and purged; the disk tier is trimmed to
+    max_disk_entries by last access. All SQLite work runs on one dedicated thread, so
+    get_async/set_nowait never block the event loop they are called from on disk I/O.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_disk_entries: int = LLM_CACHE_DISK_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        # _lock guards the memory tier and stats only; the disk tier is confined to _disk
+        self._lock = threading.Lock()
+        self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm-cache')
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, created_at: float, response: Any) -> None:
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _get_memory(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if now - cached[0] < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return copy.deepcopy(cached[1])
+                del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[Any]:
+        """Disk-tier lookup; only ever runs on the _disk thread."""
+        parsed = None
+        db = self._connection()
+        if db is not None:
+            row = db.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                response, created_at = row
+                if now - created_at < self.ttl_seconds:
+                    db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    parsed = json.loads(response)
+                else:
+                    db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                db.commit()
+        with self._lock:
+            if parsed is None:
+                self.stats['misses'] += 1
+                return None
+            self._remember(key, created_at, parsed)
+            self.stats['disk_hits'] += 1
+        return copy.deepcopy(parsed)
+
+    def get(self, model: str, message: str) -> Optional[Any]:
+        key = prompt_key(model, message)
+        now = time.time()
+        cached = self._get_memory(key, now)
+        if cached is not None:
+            return cached
+        return self._disk.submit(self._get_disk, key, now).result()
+
+    async def get_async(self, model: str, message: str) -> Optional[Any]:
+        """get() for coroutines: the memory tier is checked inline, the disk tier off the loop."""
+        key = prompt_key(model, message)
+        now = time.time()
+        cached = self._get_memory(key, now)
+        if cached is not None:
+            return cached
+        return await asyncio.get_running_loop().run_in_executor(self._disk, self._get_disk, key, now)
+
+    def _set_disk(self, key: str, model: str, serialized: str, now: float) -> None:
+        db = self._connection()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, model, serialized, now, now),
+        )
+        self._writes_since_trim += 1
+        if self._writes_since_trim >= 100:
+            self._trim(db, now)
+        db.commit()
+
+    def _set_memory(self, model: str, message: str, response: Any) -> Future:
+        key = prompt_key(model, message)
+        now = time.time()
+        serialized = json.dumps(response)
+        with self._lock:
+            # Store a private copy so callers mutating their result cannot corrupt the cache
+            self._remember(key, now, copy.deepcopy(response))
+            self.stats['writes'] += 1
+        return self._disk.submit(self._set_disk, key, model, serialized, now)
+
+    def set(self, model: str, message: str, response: Any) -> None:
+        self._set_memory(model, message, response).result()
+
+    def set_nowait(self, model: str, message: str, response: Any) -> None:
+        """Cache a response without waiting for the disk write (later lookups hit memory first)."""
+        self._set_memory(model, message, response)
+
+    def _trim(self, db: sqlite3.Connection, now: float) -> None:
+        self._writes_since_trim = 0
+        db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def hit_rate(self) -> float:
+        with self._lock:
+            return self._hit_rate(self.stats)
+
+    @staticmethod
+    def _hit_rate(stats: Dict[str, int]) -> float:
+        hits = stats['memory_hits'] + stats['disk_hits']
+        total = hits + stats['misses']
+        return hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        stats['hit_rate'] = self._hit_rate(stats)
+        return stats
+
+    def _clear_disk(self) -> None:
+        db = self._connection()
+        if db is not None:
+            db.execute("DELETE FROM llm_cache")
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self._disk.submit(self._clear_disk).result()
+
+
+llm_cache = LLMResponseCache() if LLM_CACHE_ENABLED else None
@@ -0,0 +1,94 @@
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '64'))
+LLM_REQUEST_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT', '120'))
+
+
+class LLMEngine:
+    """One asyncio event loop, running on a daemon thread, shared by every LLM call in the process.
+
+    All requests go through a single AsyncOpenAI client (and therefore a single httpx connection
+    pool), so many concurrent tag_expert calls share connections instead of each spawning its own
+    thread pool and client. Synchronous code hands coroutines to the loop with run(). Admission
+    (concurrency and rate limits) is handled by llm_scheduler.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+
+                    def run_loop():
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(ready.set)
+                        loop.run_forever()
+
+                    self._thread = threading.Thread(target=run_loop, name='llm-engine', daemon=True)
+                    self._thread.start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The shared client; only touch it from coroutines running on the engine loop."""
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                timeout=LLM_REQUEST_TIMEOUT,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    ),
+                    timeout=LLM_REQUEST_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the engine loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on the engine loop and block the calling thread for its result."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("LLMEngine.run() called from the engine loop; await the coroutine instead")
+        return self.submit(coro).result()
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        if self._client is not None:
+            try:
+                self.submit(self._client.close()).result(timeout=5)
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        if not self._loop.is_running():
+            self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+
+engine = LLMEngine()
+atexit.register(engine.close)
@@ -1,20 +1,20 @@
-import json
+import asyncio
 import uuid
-import os
-import concurrent.futures
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
+from typing import List, Dict, Any, Optional
 import litellm  # Import litellm for handling model requests
-from openai import OpenAI
-import pytz
+from openai import RateLimitError
 from .constants import constants
-from .backend_interaction import send_to_backend
+from .llm_engine import engine
+from .llm_cache import llm_cache
+from .llm_scheduler import scheduler, PRIORITY_DEFAULT, DEFAULT_COMPLETION_TOKENS
+from .metrics import metrics
+from .spend_reporter import spend_reporter
+from .token_counting import count_tokens
+from .wire_codec import parse_llm_json
 
 
-default_model = constants["MODEL"]
-
-# Create a ThreadPoolExecutor for parallel LLM requests
-LLM_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+# The app sets MODEL at startup; scripts and benchmarks importing this module fall back to the job model
+default_model = constants.get("MODEL", constants["JOB_DETAILS_MODEL"])
 
 def track_cost_callback(kwargs, completion_response, start_time, end_time):
     try:
@@ -27,56 +27,87 @@ def track_cost_callback(kwargs, completion_response, start_time, end_time):
 litellm.success_callback = [track_cost_callback]
 
 
-def get_llm_response(message, model: str = None):
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-    response = client.chat.completions.create(
-        model=model,
-        response_format={"type": "json_object"},
-        #temperature=0,
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
-            {"role": "user", "content": message}
-        ]
-    )
+async def get_llm_response_async(message, model: str = None, use_cache: bool = True,
+                                 priority: int = PRIORITY_DEFAULT, schema: Optional[Dict[str, Any]] = None,
+                                 label: str = 'other'):
+    """Send one JSON-mode chat request through the shared engine client.
+
+    Responses are cached by (model, normalized prompt); a cache hit returns without calling
+    OpenAI or recording spend. Pass use_cache=False to force a fresh completion. Every call waits
+    for a scheduler slot sized by its estimated tokens; lower priority values are served first.
+    A reply that does not match schema (see wire_codec.parse_llm_json) raises ValueError and is not cached.
+    label names the call class (e.g. 'seniority') in the llm_* metrics.
+    """
+    if use_cache and llm_cache is not None:
+        cached = await llm_cache.get_async(model, message)
+        metrics.increment('llm_cache_total', call=label, result='miss' if cached is None else 'hit')
+        if cached is not None:
+            return cached
+
+    estimated_tokens = count_tokens(message, model) + DEFAULT_COMPLETION_TOKENS
+    with metrics.timer('llm_request_seconds', call=label):
+        async with scheduler.slot(model, estimated_tokens, priority) as usage:
+            try:
+                response = await engine.client.chat.completions.create(
+                    model=model,
+                    response_format={"type": "json_object"},
+                    #temperature=0,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
+                        {"role": "user", "content": message}
+                    ]
+                )
+            except RateLimitError as e:
+                retry_after = e.response.headers.get('retry-after') if e.response is not None else None
+                try:
+                    retry_after = float(retry_after)
+                except (TypeError, ValueError):
+                    retry_after = 1.0
+                scheduler.report_rate_limited(model, retry_after)
+                raise
+            if response.usage is not None:
+                usage['tokens'] = response.usage.total_tokens
 
     data = response.choices[0].message.content
-    clean_data = data.replace("```", "").replace("json", "").strip()
-    
     try:
-        final_response = json.loads(clean_data)
-    except json.JSONDecodeError as e:
-        print(f"Invalid JSON response received: {clean_data}")
+        final_response = parse_llm_json(data, schema)
+    except ValueError as e:
+        print(f"Invalid JSON response received: {data}")
         raise ValueError(f"Failed to parse JSON: {e}")
-    
-    # Extract token usage information
-    tokens_used = response.usage.total_tokens
-    
-    spend = {
-        "id": str(uuid.uuid4()),
-        "transactionDate": datetime.now(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "model": model,
-        "spend": tokens_used * 0.00250 / 1000,
-    }
-    
-    spend['sourceEmailId'] = constants['SOURCING_ID']
-    spend['testId'] = constants['TEST_ID']
-    send_to_backend(data=spend, path=f'spend')
+
+    if llm_cache is not None:
+        llm_cache.set_nowait(model, message, final_response)
+
+    if response.usage is not None:
+        # Usage is buffered and posted to the backend in batches off the request path
+        spend_reporter.record(model, response.usage.prompt_tokens, response.usage.completion_tokens)
+        metrics.increment('llm_tokens_total', response.usage.prompt_tokens, call=label, kind='prompt')
+        metrics.increment('llm_tokens_total', response.usage.completion_tokens, call=label, kind='completion')
 
     print('done getting llm response')
-    
+
     return final_response
 
 
-def _get_llm_response_parallel(request_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Helper function for parallel LLM requests"""
+def get_llm_response(message, model: str = None, use_cache: bool = True, priority: int = PRIORITY_DEFAULT,
+                     schema: Optional[Dict[str, Any]] = None, label: str = 'other'):
+    return engine.run(get_llm_response_async(message, model, use_cache, priority, schema, label))
+
+
+async def _get_llm_response_parallel(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Helper coroutine for parallel LLM requests"""
+    request_id = request_data.get('id', str(uuid.uuid4()))
     try:
         message = request_data.get('message', '')
         model = request_data.get('model', default_model)
-        request_id = request_data.get('id', str(uuid.uuid4()))
-        
+        use_cache = request_data.get('use_cache', True)
+        priority = request_data.get('priority', PRIORITY_DEFAULT)
+        schema = request_data.get('schema')
+        label = request_data.get('label', 'other')
+
         # Get the response using the existing function
-        response = get_llm_response(message, model)
-        
+        response = await get_llm_response_async(message, model, use_cache, priority, schema, label)
+
         return {
             'id': request_id,
             'status': 'success',
@@ -90,48 +121,33 @@ def _get_llm_response_parallel(request_data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+async def get_llm_responses_async(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run a batch of LLM requests concurrently on the engine loop (see get_llm_responses_parallel)."""
+    return list(await asyncio.gather(*(_get_llm_response_parallel(req) for req in requests)))
+
+
 def get_llm_responses_parallel(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Execute multiple LLM requests in parallel using true asynchronous execution
-    
+    """Execute multiple LLM requests in parallel on the shared asyncio engine
+
     Args:
         requests: List of dictionaries with the following keys:
             - message: The message to send to the LLM
             - model: The model to use (optional)
             - id: Optional identifier to track the request
-    
+            - use_cache: Set to False to bypass the response cache (optional)
+            - priority: Scheduler priority, e.g. PRIORITY_INTERACTIVE or PRIORITY_BULK (optional)
+            - schema: Response schema the reply must match, e.g. SENIORITY_SCHEMA (optional)
+            - label: Call class for metrics, e.g. 'seniority' or 'tags' (optional)
+
     Returns:
         List of response dictionaries with original request ID, status and data
     """
     if not requests:
         return []
-        
-    # Increase max_workers for the global executor based on request count
-    max_workers = min(len(requests) * 2, 20)  # Scale based on requests but cap at 20
-    
-    # Create a dedicated thread pool for this batch of requests
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as batch_executor:
-        # Submit all requests to the executor at once
-        print(f"Submitting {len(requests)} parallel LLM requests...")
-        futures_dict = {
-            batch_executor.submit(_get_llm_response_parallel, req): req.get('id', str(uuid.uuid4()))
-            for req in requests
-        }
-        
-        # Process results as they complete using as_completed for true asynchronous behavior
-        results = []
-        for future in concurrent.futures.as_completed(futures_dict):
-            req_id = futures_dict[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                print(f"Error in parallel LLM request {req_id}: {str(e)}")
-                results.append({
-                    'id': req_id,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                
-        print(f"Completed {len(results)}/{len(requests)} parallel LLM requests")
-        return results
 
+    # Every caller shares the engine's loop, client and connection pool; concurrency and rate
+    # limits are enforced process-wide by the scheduler rather than per batch
+    print(f"Submitting {len(requests)} parallel LLM requests...")
+    results = engine.run(get_llm_responses_async(requests))
+    print(f"Completed {len(results)}/{len(requests)} parallel LLM requests")
+    return results
@@ -0,0 +1,187 @@
+import asyncio
+import bisect
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set
+
+from .constants import MODEL_RATE_LIMITS, DEFAULT_MODEL_RATE_LIMIT
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BULK = 2
+
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '32'))
+# Fraction of the provider limits the scheduler allows itself, leaving headroom for other clients
+LLM_RATE_LIMIT_HEADROOM = float(os.getenv('LLM_RATE_LIMIT_HEADROOM', '0.9'))
+DEFAULT_COMPLETION_TOKENS = 512
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute, capped at one minute's worth."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be consumed (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def pause(self, seconds: float, now: float) -> None:
+        """Empty the bucket so nothing is granted for roughly seconds (after a 429)."""
+        self._refill(now)
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class _Waiter:
+    __slots__ = ('model', 'tokens', 'future')
+
+    def __init__(self, model: str, tokens: int, future: asyncio.Future):
+        self.model = model
+        self.tokens = tokens
+        self.future = future
+
+
+class LLMScheduler:
+    """Process-wide admission control for every outbound LLM request.
+
+    Requests wait in priority order until their model's requests-per-minute and
+    tokens-per-minute buckets and the global concurrency limit all allow them, so callers are
+    slowed down (backpressure) instead of provoking bursts of 429s. A lower-priority request
+    never overtakes a waiting higher-priority request for the same model. Must be used from the
+    LLM engine's event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rate_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        headroom: float = LLM_RATE_LIMIT_HEADROOM,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rate_limits = rate_limits if rate_limits is not None else MODEL_RATE_LIMITS
+        self.headroom = headroom
+        self._request_buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {'granted': 0, 'waited': 0, 'rate_limited': 0}
+
+    def _buckets(self, model: str):
+        if model not in self._request_buckets:
+            limits = self.rate_limits.get(model, DEFAULT_MODEL_RATE_LIMIT)
+            self._request_buckets[model] = TokenBucket(limits['rpm'] * self.headroom)
+            self._token_buckets[model] = TokenBucket(limits['tpm'] * self.headroom)
+        return self._request_buckets[model], self._token_buckets[model]
+
+    async def acquire(self, model: str, tokens: int, priority: int = PRIORITY_DEFAULT) -> None:
+        future = asyncio.get_running_loop().create_future()
+        bisect.insort(self._waiters, (priority, next(self._sequence), _Waiter(model, tokens, future)))
+        self._dispatch()
+        if not future.done():
+            self.stats['waited'] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before cancellation: give the slot back
+                self.release(model, tokens, tokens)
+            else:
+                self._waiters = [entry for entry in self._waiters if entry[2].future is not future]
+            raise
+
+    def release(self, model: str, reserved_tokens: int, used_tokens: Optional[int] = None) -> None:
+        """Free a concurrency slot and correct the token bucket with the actual usage."""
+        self._in_flight -= 1
+        if used_tokens is not None:
+            _, token_bucket = self._buckets(model)
+            difference = reserved_tokens - used_tokens
+            if difference > 0:
+                token_bucket.refund(difference)
+            elif difference < 0:
+                token_bucket.consume(-difference, time.monotonic())
+        self._dispatch()
+
+    def report_rate_limited(self, model: str, retry_after: float = 1.0) -> None:
+        """Pause a model after the provider rejected a request with a 429."""
+        self.stats['rate_limited'] += 1
+        request_bucket, token_bucket = self._buckets(model)
+        now = time.monotonic()
+        request_bucket.pause(retry_after, now)
+        token_bucket.pause(retry_after, now)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        blocked_models: Set[str] = set()
+        next_check: Optional[float] = None
+        remaining = []
+        for entry in self._waiters:
+            waiter = entry[2]
+            if waiter.future.done():
+                continue
+            if self._in_flight >= self.max_concurrency or waiter.model in blocked_models:
+                remaining.append(entry)
+                continue
+            request_bucket, token_bucket = self._buckets(waiter.model)
+            wait = max(request_bucket.wait_time(1, now), token_bucket.wait_time(waiter.tokens, now))
+            if wait > 0:
+                blocked_models.add(waiter.model)
+                next_check = wait if next_check is None else min(next_check, wait)
+                remaining.append(entry)
+                continue
+            request_bucket.consume(1, now)
+            token_bucket.consume(waiter.tokens, now)
+            self._in_flight += 1
+            self.stats['granted'] += 1
+            waiter.future.set_result(None)
+        self._waiters = remaining
+
+        if next_check is not None:
+            loop = asyncio.get_running_loop()
+            if self._timer is not None and self._timer.when() > loop.time() + next_check:
+                self._timer.cancel()
+                self._timer = None
+            if self._timer is None:
+                self._timer = loop.call_later(next_check, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, model: str, tokens: int, priority: int = PRIORITY_DEFAULT):
+        """Hold an admission slot for one request; set usage['tokens'] to settle the bucket."""
+        await self.acquire(model, tokens, priority)
+        usage = {'tokens': None}
+        try:
+            yield usage
+        finally:
+            self.release(model, tokens, usage['tokens'])
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, queued=len(self._waiters), in_flight=self._in_flight)
+
+
+scheduler = LLMScheduler()
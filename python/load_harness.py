@@ -0,0 +1,564 @@
+"""End-to-end load test of the ingestion flows against local stand-ins for OpenAI, the backend and ProxyCurl.
+
+Run in a fresh process, e.g. `python -m <package>.load_harness --flows 200 --concurrency 32`. The
+pipeline modules read their endpoints from the environment when first imported, so the harness
+starts the stand-ins, points BACKEND_URL, OPENAI_BASE_URL and PROXYCURL_BASE_URL at them and only
+then imports linkedin_requests / tag_expert. The stand-ins run in a child process, so the thread
+count and peak RSS reported are the pipeline's own.
+
+Run it as a module of the app's utils package (e.g. `python -m app.utils.load_harness`): the
+pipeline imports its siblings relatively. The 'linkedin' kind also uses the app's google_dorking
+module; without it, a no-op stand-in is installed and profile pictures keep their ProxyCurl URL.
+"""
+import abc
+import argparse
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import types
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from . import synthetic_data
+from .constants import SENIORITY_LEVELS
+
+LOAD_USER_EMAIL = os.getenv('LOAD_USER_EMAIL', 'load-test@example.com')
+LOAD_ORGANIZATION_ID = os.getenv('LOAD_ORGANIZATION_ID', 'load-test-org')
+# Stand-in latencies are log-normal: the median in ms and the sigma of the underlying normal
+LOAD_LLM_LATENCY_MS = float(os.getenv('LOAD_LLM_LATENCY_MS', '800'))
+LOAD_LLM_LATENCY_SIGMA = float(os.getenv('LOAD_LLM_LATENCY_SIGMA', '0.5'))
+# Fraction of chat completions answered with a 500, and with a 429 (retry-after: 1)
+LOAD_LLM_ERROR_RATE = float(os.getenv('LOAD_LLM_ERROR_RATE', '0.0'))
+LOAD_LLM_RATE_LIMIT_RATE = float(os.getenv('LOAD_LLM_RATE_LIMIT_RATE', '0.0'))
+LOAD_BACKEND_LATENCY_MS = float(os.getenv('LOAD_BACKEND_LATENCY_MS', '20'))
+LOAD_PROXYCURL_LATENCY_MS = float(os.getenv('LOAD_PROXYCURL_LATENCY_MS', '400'))
+LOAD_PROXYCURL_ERROR_RATE = float(os.getenv('LOAD_PROXYCURL_ERROR_RATE', '0.0'))
+LOAD_SAMPLE_INTERVAL_SECONDS = 0.1
+
+# Job lines of the batch seniority prompt: `<job id>: {...}`
+_JOB_LINE = re.compile(r'^(\S+): \{', re.MULTILINE)
+
+
+class StandInConfig(NamedTuple):
+    llm_latency_ms: float = LOAD_LLM_LATENCY_MS
+    llm_latency_sigma: float = LOAD_LLM_LATENCY_SIGMA
+    llm_error_rate: float = LOAD_LLM_ERROR_RATE
+    llm_rate_limit_rate: float = LOAD_LLM_RATE_LIMIT_RATE
+    backend_latency_ms: float = LOAD_BACKEND_LATENCY_MS
+    proxycurl_latency_ms: float = LOAD_PROXYCURL_LATENCY_MS
+    proxycurl_error_rate: float = LOAD_PROXYCURL_ERROR_RATE
+    # Meta experts the fake backend starts with (synthetic_data.generate_roster)
+    roster_size: int = 5000
+    seed: int = 0
+    user_email: str = LOAD_USER_EMAIL
+    organization_id: str = LOAD_ORGANIZATION_ID
+    # Recorded ProxyCurl profiles to replay: a ProxyCurl cache file or a JSONL of profiles
+    replay_path: Optional[str] = None
+
+
+def _latency(median_ms: float, sigma: float) -> float:
+    if median_ms <= 0:
+        return 0.0
+    return random.lognormvariate(math.log(median_ms / 1000), sigma)
+
+
+class _StandIn(abc.ABC):
+    """One fake service: handle() answers a request after latency(); stats are served on /_stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'errors_injected': 0}
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def latency(self) -> float:
+        return 0.0
+
+    @abc.abstractmethod
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any, Dict[str, str]]:
+        """(status, JSON payload, extra headers) for one request."""
+
+
+class OpenAIStandIn(_StandIn):
+    """OpenAI-compatible /v1/chat/completions answering each pipeline prompt with valid JSON.
+
+    The reply is picked by recognizing the template (find_father, batch or single seniority,
+    expert tags), so responses pass the per-prompt schemas and the pipeline runs its full path.
+    """
+
+    def __init__(self, config: StandInConfig):
+        super().__init__()
+        self.config = config
+
+    def latency(self) -> float:
+        return _latency(self.config.llm_latency_ms, self.config.llm_latency_sigma)
+
+    @staticmethod
+    def reply(prompt: str) -> Dict[str, Any]:
+        if '"relevant_expert_id"' in prompt:
+            return {'relevant_expert_id': {'id': None}}
+        if '"seniorities"' in prompt:
+            return {'seniorities': [{'id': job_id, 'seniority': random.choice(SENIORITY_LEVELS)} for job_id in _JOB_LINE.findall(prompt)]}
+        if '"seniority"' in prompt:
+            return {'seniority': random.choice(SENIORITY_LEVELS)}
+        if 'tag extractor' in prompt:
+            return {'tags': random.sample(synthetic_data.FUNCTIONAL_EXPERTISE + synthetic_data.TECHNICAL_SKILLS, 4)}
+        return {}
+
+    def handle(self, method, path, query, body):
+        if method != 'POST' or not path.endswith('/chat/completions'):
+            return 404, {'error': {'message': f'Unknown endpoint {path}'}}, {}
+        roll = random.random()
+        if roll < self.config.llm_rate_limit_rate:
+            self.count('errors_injected')
+            return 429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}}, {'retry-after': '1'}
+        if roll < self.config.llm_rate_limit_rate + self.config.llm_error_rate:
+            self.count('errors_injected')
+            return 500, {'error': {'message': 'The server had an error processing your request', 'type': 'server_error'}}, {}
+        prompt = '\n'.join(str(message.get('content') or '') for message in body.get('messages', []))
+        content = json.dumps(self.reply(prompt))
+        # About four characters per token, close enough for spend and scheduler accounting
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        self.count('tokens', usage['total_tokens'])
+        return 200, {
+            'id': f'chatcmpl-load-{random.getrandbits(48):x}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage,
+        }, {}
+
+
+class BackendStandIn(_StandIn):
+    """The backend routes the pipeline uses, over an in-memory meta-experts store.
+
+    Starts with a synthetic roster for config.user_email; meta-experts/{email} serves it in
+    full or, with updatedSince, only what was written after that time.
+    """
+
+    def __init__(self, config: StandInConfig):
+        super().__init__()
+        self.config = config
+        roster = synthetic_data.generate_roster(config.roster_size, config.seed, organization_id=config.organization_id)
+        now = time.time()
+        # email -> meta expert id -> (updated at, meta expert)
+        self.meta_experts: Dict[str, Dict[str, Tuple[float, dict]]] = {
+            config.user_email: {expert['id']: (now, expert) for expert in roster.experts}
+        }
+
+    def latency(self) -> float:
+        return _latency(self.config.backend_latency_ms, 0.25)
+
+    def handle(self, method, path, query, body):
+        parts = path.strip('/').split('/')
+        route = parts[0]
+        items = body if isinstance(body, list) else [body]
+        if method == 'GET' and route == 'meta-experts':
+            store = self.meta_experts.get(parts[1], {})
+            since = query.get('updatedSince')
+            with self._lock:
+                entries = list(store.values())
+            if since:
+                since_ts = datetime.fromisoformat(since.replace('Z', '+00:00')).timestamp()
+                entries = [entry for entry in entries if entry[0] >= since_ts]
+                return 200, {'metaExperts': [expert for _, expert in entries], 'deletedIds': []}, {}
+            return 200, {'metaExperts': [expert for _, expert in entries]}, {}
+        if method in ('POST', 'PUT') and route == 'meta-expert':
+            now = time.time()
+            with self._lock:
+                store = self.meta_experts.setdefault(parts[1], {})
+                for expert in items:
+                    store[expert.get('id')] = (now, expert)
+            self.count('meta_experts_created' if method == 'POST' else 'meta_experts_updated', len(items))
+            return 200, body, {}
+        if method == 'POST' and route in ('meta-expert-tags', 'expert', 'jobs', 'spend'):
+            self.count(f"{route.replace('-', '_')}_written", len(items))
+            return 200, {'status': 'ok', 'count': len(items)}, {}
+        if method == 'GET' and route == 'email-project-profiles':
+            return 200, {'profileTypes': []}, {}
+        return 404, {'error': f'Unknown route {method} {path}'}, {}
+
+
+class ProxyCurlReplayer(_StandIn):
+    """ProxyCurl person endpoint replaying recorded profiles, or synthetic ones without a recording.
+
+    The profile served for a URL is chosen from the URL alone, so repeated lookups agree.
+    """
+
+    def __init__(self, config: StandInConfig):
+        super().__init__()
+        self.config = config
+        self.profiles = self._load(config.replay_path) if config.replay_path else []
+
+    @staticmethod
+    def _load(path: str) -> List[dict]:
+        if path.endswith(('.jsonl', '.ndjson')):
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        # A cache file written by proxycurl_client.ProxyCurlCache
+        db = sqlite3.connect(path)
+        try:
+            rows = db.execute("SELECT response FROM proxycurl_cache WHERE endpoint LIKE '%linkedin' ORDER BY key").fetchall()
+        finally:
+            db.close()
+        return [json.loads(row[0]) for row in rows]
+
+    def latency(self) -> float:
+        return _latency(self.config.proxycurl_latency_ms, 0.5)
+
+    def handle(self, method, path, query, body):
+        if path.rstrip('/').endswith('/search/person'):
+            return 200, {'results': [], 'next_page': None, 'total_result_count': 0}, {}
+        # ProxyCurl accepts the profile as linkedin_profile_url or, in older clients, url
+        profile_url = query.get('linkedin_profile_url') or query.get('url')
+        if not path.rstrip('/').endswith('/linkedin') or not profile_url:
+            return 404, {'description': 'Not found', 'code': 404}, {}
+        if random.random() < self.config.proxycurl_error_rate:
+            self.count('errors_injected')
+            return 503, {'description': 'Service unavailable', 'code': 503}, {}
+        rng = random.Random(profile_url)
+        if self.profiles:
+            self.count('replayed')
+            return 200, rng.choice(self.profiles), {}
+        self.count('synthetic')
+        return 200, synthetic_data.proxycurl_profile(rng), {}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real APIs, so client connection pools behave as in production
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        stand_in: _StandIn = self.server.stand_in
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        if url.path == '/_stats':
+            status, payload, headers = 200, stand_in.stats, {}
+        else:
+            stand_in.count('requests')
+            time.sleep(stand_in.latency())
+            try:
+                status, payload, headers = stand_in.handle(self.command, url.path, query, body)
+            except Exception as e:
+                status, payload, headers = 500, {'error': f'{type(e).__name__}: {e}'}, {}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_stand_ins(config: StandInConfig, ready) -> None:
+    """Child process body: start the three stand-ins and report their base URLs on ready."""
+    servers = {}
+    for name, stand_in in (
+        ('openai', OpenAIStandIn(config)),
+        ('backend', BackendStandIn(config)),
+        ('proxycurl', ProxyCurlReplayer(config)),
+    ):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+        server.daemon_threads = True
+        server.stand_in = stand_in
+        threading.Thread(target=server.serve_forever, name=f'stand-in-{name}', daemon=True).start()
+        servers[name] = f'http://127.0.0.1:{server.server_port}'
+    ready.put(servers)
+    threading.Event().wait()
+
+
+def start_stand_ins(config: StandInConfig) -> Tuple[multiprocessing.Process, Dict[str, str]]:
+    """Start the stand-ins in a child process; returns it and {'openai'|'backend'|'proxycurl': url}."""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_stand_ins, args=(config, ready), name='load-stand-ins', daemon=True)
+    process.start()
+    return process, ready.get(timeout=120)
+
+
+def stand_in_stats(urls: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    stats = {}
+    for name, url in urls.items():
+        with urllib.request.urlopen(f'{url}/_stats', timeout=10) as response:
+            stats[name] = json.loads(response.read())
+    return stats
+
+
+def point_pipeline_at(urls: Dict[str, str]) -> None:
+    """Set the environment the pipeline reads its endpoints (and cache switches) from."""
+    if f'{__package__}.backend_interaction' in sys.modules:
+        print("Warning: pipeline modules were imported before the stand-ins started; they keep their old endpoints")
+    os.environ.update({
+        'BACKEND_URL': urls['backend'],
+        'OPENAI_BASE_URL': f"{urls['openai']}/v1",
+        'OPENAI_API_KEY': 'load-test',
+        'PROXYCURL_BASE_URL': urls['proxycurl'],
+        'PROXYCURL_API_KEY': 'load-test',
+    })
+    # Every flow should reach the stand-ins rather than a cache warmed by an earlier run, and the
+    # stand-in has no ProxyCurl quota to protect; export these to measure with them on
+    os.environ.setdefault('LLM_CACHE_ENABLED', 'false')
+    os.environ.setdefault('PROXYCURL_CACHE_ENABLED', 'false')
+    os.environ.setdefault('PROXYCURL_RATE_LIMIT_PER_MINUTE', '1000000')
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _ProcessSampler:
+    """Samples this process's thread count (and RSS) on a background thread, keeping the peaks."""
+
+    def __init__(self, interval: float = LOAD_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='load-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            rss = _rss_bytes()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def __enter__(self) -> '_ProcessSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def _ensure_google_dorking() -> None:
+    """Install a no-op google_dorking when the app's module is not next to this one."""
+    name = f'{__package__}.google_dorking'
+    try:
+        importlib.import_module(name)
+    except ModuleNotFoundError as e:
+        if e.name != name:
+            raise
+        stand_in = types.ModuleType(name)
+        stand_in.get_user_pfp = lambda name=None, company=None, linkedin_link=None: None
+        stand_in.reverse_image_search = lambda image_url: image_url
+        sys.modules[name] = stand_in
+        print("google_dorking not found; profile picture lookups are skipped")
+
+
+def build_flows(kind: str, count: int, config: StandInConfig, repeat_rate: float = 0.2) -> List[Callable[[], Any]]:
+    """count flow callables; repeat_rate of them are for experts already in the backend roster.
+
+    'linkedin' flows run make_expert_from_linkedin on a profile URL (ProxyCurl, dedup, LLM and
+    backend writes); 'tag' flows run tag_expert on a synthetic incoming expert (no ProxyCurl).
+    """
+    # Same seed as the backend stand-in, so repeats point at experts it actually stores
+    roster = synthetic_data.generate_roster(config.roster_size, config.seed, organization_id=config.organization_id).experts
+    rng = random.Random(config.seed + 1)
+    flows = []
+    if kind == 'linkedin':
+        _ensure_google_dorking()
+        from .linkedin_requests import make_expert_from_linkedin
+
+        linked = [expert for expert in roster if expert.get('linkedInLink')]
+        for i in range(count):
+            if linked and rng.random() < repeat_rate:
+                url = rng.choice(linked)['linkedInLink']
+            else:
+                url = f'https://www.linkedin.com/in/load-test-{config.seed}-{i}'
+            flows.append(lambda url=url: make_expert_from_linkedin(url, config.user_email, True))
+    elif kind == 'tag':
+        from .tag_expert import tag_expert
+
+        for _ in range(count):
+            match = rng.choice(('linkedin', 'email', 'name')) if rng.random() < repeat_rate else 'none'
+            expert = synthetic_data.incoming_expert(rng.choice(roster), rng, config.organization_id, match)
+            flows.append(lambda expert=expert: tag_expert(config.user_email, expert))
+    else:
+        raise ValueError(f"Unknown flow kind: {kind}")
+    return flows
+
+
+def run_flows(flows: List[Callable[[], Any]], concurrency: int) -> Dict[str, Any]:
+    """Run the flows on concurrency threads; returns latency percentiles, throughput and peaks."""
+    latencies: List[float] = []
+    failures: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def run_one(flow: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            result = flow()
+            error = None if result not in (None, False) else 'no result'
+        except Exception as e:
+            error = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if error is not None:
+                failures[error] = failures.get(error, 0) + 1
+
+    started = time.perf_counter()
+    with _ProcessSampler() as sampler, ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load-flow') as pool:
+        list(pool.map(run_one, flows))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    peak_rss = max(filter(None, (sampler.peak_rss, _peak_rss_bytes())), default=None)
+    return {
+        'flows': len(flows),
+        'failed': sum(failures.values()),
+        'failures': failures,
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'per_second': len(flows) / elapsed if elapsed else 0.0,
+        'p50_s': _percentile(ordered, 50),
+        'p95_s': _percentile(ordered, 95),
+        'p99_s': _percentile(ordered, 99),
+        'max_s': ordered[-1] if ordered else 0.0,
+        'peak_threads': sampler.peak_threads,
+        'peak_rss_mb': peak_rss / (1024 * 1024) if peak_rss else None,
+    }
+
+
+def _metric_means(snapshot: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Count and mean ms of each instrumented histogram, per label set (see metrics.py)."""
+    means = {}
+    for name, series in snapshot['histograms'].items():
+        for entry in series:
+            labels = ','.join(f'{key}={value}' for key, value in sorted(entry['labels'].items()))
+            means[f'{name}{{{labels}}}'] = {
+                'count': entry['count'],
+                'mean_ms': 1000 * entry['sum'] / entry['count'] if entry['count'] else 0.0,
+            }
+    return means
+
+
+def report(summary: Dict[str, Any]) -> None:
+    print(
+        f"Load test: {summary['flows']} {summary['kind']} flows x{summary['concurrency']}, {summary['failed']} failed "
+        f"in {summary['elapsed_s']:.1f} s ({summary['per_second']:.2f} flows/s)"
+    )
+    print(
+        f"  latency p50 {summary['p50_s']:.2f} s  p95 {summary['p95_s']:.2f} s  p99 {summary['p99_s']:.2f} s  "
+        f"max {summary['max_s']:.2f} s"
+    )
+    rss = f"{summary['peak_rss_mb']:.0f} MB" if summary['peak_rss_mb'] is not None else 'n/a'
+    print(f"  peak threads {summary['peak_threads']}  peak RSS {rss}")
+    if summary['failures']:
+        print(f"  failures: {', '.join(f'{error} x{count}' for error, count in summary['failures'].items())}")
+    for name, stats in summary['stand_ins'].items():
+        print(f"  {name:<9} {', '.join(f'{key} {value}' for key, value in sorted(stats.items()))}")
+    for name, stats in sorted(summary['stages'].items()):
+        print(f"  {name:<75} {stats['count']:>6}  {stats['mean_ms']:9.1f} ms avg")
+
+
+def run_load_test(kind: str = 'linkedin', flows: int = 100, concurrency: int = 16, repeat_rate: float = 0.2,
+                  config: StandInConfig = StandInConfig()) -> Dict[str, Any]:
+    """Start the stand-ins, drive the flows against them and report; returns the summary."""
+    process, urls = start_stand_ins(config)
+    try:
+        point_pipeline_at(urls)
+        from .metrics import metrics
+
+        flow_calls = build_flows(kind, flows, config, repeat_rate)
+        metrics.reset()
+        summary = run_flows(flow_calls, concurrency)
+        # Buffered spend records go to the fake backend before it stops, not at interpreter exit
+        from .spend_reporter import spend_reporter
+        spend_reporter.flush()
+        summary['kind'] = kind
+        summary['stand_ins'] = stand_in_stats(urls)
+        summary['stages'] = _metric_means(metrics.export_json())
+    finally:
+        process.terminate()
+        process.join(timeout=5)
+    report(summary)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the ingestion flows against local stand-in services.')
+    parser.add_argument('--kind', choices=('linkedin', 'tag'), default='linkedin',
+                        help="make_expert_from_linkedin flows, or tag_expert on synthetic experts")
+    parser.add_argument('--flows', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--repeat-rate', type=float, default=0.2, help="share of flows for experts already in the roster")
+    parser.add_argument('--roster-size', type=int, default=StandInConfig._field_defaults['roster_size'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--llm-latency-ms', type=float, default=LOAD_LLM_LATENCY_MS)
+    parser.add_argument('--llm-latency-sigma', type=float, default=LOAD_LLM_LATENCY_SIGMA)
+    parser.add_argument('--llm-error-rate', type=float, default=LOAD_LLM_ERROR_RATE)
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=LOAD_LLM_RATE_LIMIT_RATE)
+    parser.add_argument('--backend-latency-ms', type=float, default=LOAD_BACKEND_LATENCY_MS)
+    parser.add_argument('--proxycurl-latency-ms', type=float, default=LOAD_PROXYCURL_LATENCY_MS)
+    parser.add_argument('--proxycurl-error-rate', type=float, default=LOAD_PROXYCURL_ERROR_RATE)
+    parser.add_argument('--replay', help="ProxyCurl cache file or JSONL of recorded profiles to serve")
+    parser.add_argument('--json', help="also write the summary to this file")
+    args = parser.parse_args()
+    summary = run_load_test(
+        args.kind, args.flows, args.concurrency, args.repeat_rate,
+        StandInConfig(
+            llm_latency_ms=args.llm_latency_ms,
+            llm_latency_sigma=args.llm_latency_sigma,
+            llm_error_rate=args.llm_error_rate,
+            llm_rate_limit_rate=args.llm_rate_limit_rate,
+            backend_latency_ms=args.backend_latency_ms,
+            proxycurl_latency_ms=args.proxycurl_latency_ms,
+            proxycurl_error_rate=args.proxycurl_error_rate,
+            roster_size=args.roster_size,
+            seed=args.seed,
+            replay_path=args.replay,
+        ),
+    )
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
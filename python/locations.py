@@ -0,0 +1,684 @@
+import bisect
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Optional JSON list of extra nodes: [{"id", "name", "kind", "parent", "aliases": [...]}, ...]
+LOCATIONS_GAZETTEER_PATH = os.getenv('LOCATIONS_GAZETTEER_PATH')
+ROOT_ID = 'world'
+KIND_DEPTH = {'world': 0, 'continent': 1, 'subregion': 2, 'country': 3, 'state': 4, 'city': 5}
+
+CONTINENTS = """
+AF|Africa
+AN|Antarctica
+AS|Asia|APAC
+EU|Europe
+NA|North America
+OC|Oceania|Australasia
+SA|South America|Latin America;LATAM
+"""
+
+# UN M49 subregions: id|name|continent|aliases
+SUBREGIONS = """
+northern-america|Northern America|NA
+central-america|Central America|NA
+caribbean|Caribbean|NA
+northern-europe|Northern Europe|EU|Nordics;Scandinavia
+western-europe|Western Europe|EU|DACH;Benelux
+southern-europe|Southern Europe|EU
+eastern-europe|Eastern Europe|EU|CEE
+eastern-asia|Eastern Asia|AS|East Asia
+south-eastern-asia|South-eastern Asia|AS|Southeast Asia;South East Asia;SEA
+southern-asia|Southern Asia|AS|South Asia
+central-asia|Central Asia|AS
+western-asia|Western Asia|AS|Middle East;MENA;Gulf;GCC
+northern-africa|Northern Africa|AF|North Africa
+western-africa|Western Africa|AF|West Africa
+eastern-africa|Eastern Africa|AF|East Africa
+middle-africa|Middle Africa|AF|Central Africa
+southern-africa|Southern Africa|AF
+australia-new-zealand|Australia and New Zealand|OC|ANZ
+melanesia|Melanesia|OC
+micronesia|Micronesia|OC
+polynesia|Polynesia|OC
+"""
+
+# ISO 3166-1 alpha-2|name|parent (subregion id, or continent code where M49 has none)|aliases
+COUNTRIES = """
+US|United States|northern-america|United States of America;USA;U.S.;U.S.A.;America
+CA|Canada|northern-america
+MX|Mexico|central-america|México
+GT|Guatemala|central-america
+BZ|Belize|central-america
+SV|El Salvador|central-america
+HN|Honduras|central-america
+NI|Nicaragua|central-america
+CR|Costa Rica|central-america
+PA|Panama|central-america
+CU|Cuba|caribbean
+DO|Dominican Republic|caribbean
+HT|Haiti|caribbean
+JM|Jamaica|caribbean
+PR|Puerto Rico|caribbean
+TT|Trinidad and Tobago|caribbean
+BS|Bahamas|caribbean|The Bahamas
+BB|Barbados|caribbean
+AR|Argentina|SA
+BO|Bolivia|SA
+BR|Brazil|SA|Brasil
+CL|Chile|SA
+CO|Colombia|SA
+EC|Ecuador|SA
+GY|Guyana|SA
+PY|Paraguay|SA
+PE|Peru|SA|Perú
+SR|Suriname|SA
+UY|Uruguay|SA
+VE|Venezuela|SA
+GB|United Kingdom|northern-europe|UK;U.K.;Great Britain;Britain
+IE|Ireland|northern-europe|Republic of Ireland
+IS|Iceland|northern-europe
+NO|Norway|northern-europe
+SE|Sweden|northern-europe
+FI|Finland|northern-europe
+DK|Denmark|northern-europe
+EE|Estonia|northern-europe
+LV|Latvia|northern-europe
+LT|Lithuania|northern-europe
+DE|Germany|western-europe|Deutschland
+FR|France|western-europe
+NL|Netherlands|western-europe|The Netherlands;Holland
+BE|Belgium|western-europe
+LU|Luxembourg|western-europe
+CH|Switzerland|western-europe
+AT|Austria|western-europe
+LI|Liechtenstein|western-europe
+MC|Monaco|western-europe
+ES|Spain|southern-europe|España
+PT|Portugal|southern-europe
+IT|Italy|southern-europe|Italia
+GR|Greece|southern-europe
+MT|Malta|southern-europe
+CY|Cyprus|western-asia
+SI|Slovenia|southern-europe
+HR|Croatia|southern-europe
+BA|Bosnia and Herzegovina|southern-europe
+RS|Serbia|southern-europe
+ME|Montenegro|southern-europe
+MK|North Macedonia|southern-europe|Macedonia
+AL|Albania|southern-europe
+XK|Kosovo|southern-europe
+PL|Poland|eastern-europe
+CZ|Czechia|eastern-europe|Czech Republic
+SK|Slovakia|eastern-europe
+HU|Hungary|eastern-europe
+RO|Romania|eastern-europe
+BG|Bulgaria|eastern-europe
+MD|Moldova|eastern-europe
+UA|Ukraine|eastern-europe
+BY|Belarus|eastern-europe
+RU|Russia|eastern-europe|Russian Federation
+CN|China|eastern-asia|People's Republic of China;PRC;Mainland China
+HK|Hong Kong|eastern-asia|Hong Kong SAR
+MO|Macau|eastern-asia|Macao
+TW|Taiwan|eastern-asia
+JP|Japan|eastern-asia
+KR|South Korea|eastern-asia|Korea;Republic of Korea
+KP|North Korea|eastern-asia
+MN|Mongolia|eastern-asia
+SG|Singapore|south-eastern-asia
+MY|Malaysia|south-eastern-asia
+ID|Indonesia|south-eastern-asia
+TH|Thailand|south-eastern-asia
+VN|Vietnam|south-eastern-asia|Viet Nam
+PH|Philippines|south-eastern-asia
+MM|Myanmar|south-eastern-asia|Burma
+KH|Cambodia|south-eastern-asia
+LA|Laos|south-eastern-asia
+BN|Brunei|south-eastern-asia
+TL|Timor-Leste|south-eastern-asia|East Timor
+IN|India|southern-asia
+PK|Pakistan|southern-asia
+BD|Bangladesh|southern-asia
+LK|Sri Lanka|southern-asia
+NP|Nepal|southern-asia
+BT|Bhutan|southern-asia
+MV|Maldives|southern-asia
+AF|Afghanistan|southern-asia
+IR|Iran|southern-asia
+KZ|Kazakhstan|central-asia
+UZ|Uzbekistan|central-asia
+KG|Kyrgyzstan|central-asia
+TJ|Tajikistan|central-asia
+TM|Turkmenistan|central-asia
+AE|United Arab Emirates|western-asia|UAE;U.A.E.
+SA|Saudi Arabia|western-asia|KSA
+QA|Qatar|western-asia
+KW|Kuwait|western-asia
+BH|Bahrain|western-asia
+OM|Oman|western-asia
+YE|Yemen|western-asia
+IL|Israel|western-asia
+PS|Palestine|western-asia
+JO|Jordan|western-asia
+LB|Lebanon|western-asia
+SY|Syria|western-asia
+IQ|Iraq|western-asia
+TR|Turkey|western-asia|Türkiye;Turkiye
+GE|Georgia|western-asia
+AM|Armenia|western-asia
+AZ|Azerbaijan|western-asia
+EG|Egypt|northern-africa
+MA|Morocco|northern-africa
+DZ|Algeria|northern-africa
+TN|Tunisia|northern-africa
+LY|Libya|northern-africa
+SD|Sudan|northern-africa
+NG|Nigeria|western-africa
+GH|Ghana|western-africa
+SN|Senegal|western-africa
+CI|Côte d'Ivoire|western-africa|Ivory Coast;Cote d'Ivoire
+ML|Mali|western-africa
+BF|Burkina Faso|western-africa
+NE|Niger|western-africa
+GN|Guinea|western-africa
+BJ|Benin|western-africa
+TG|Togo|western-africa
+SL|Sierra Leone|western-africa
+LR|Liberia|western-africa
+MR|Mauritania|western-africa
+GM|Gambia|western-africa|The Gambia
+CV|Cabo Verde|western-africa|Cape Verde
+KE|Kenya|eastern-africa
+ET|Ethiopia|eastern-africa
+TZ|Tanzania|eastern-africa
+UG|Uganda|eastern-africa
+RW|Rwanda|eastern-africa
+BI|Burundi|eastern-africa
+SO|Somalia|eastern-africa
+DJ|Djibouti|eastern-africa
+ER|Eritrea|eastern-africa
+SS|South Sudan|eastern-africa
+MG|Madagascar|eastern-africa
+MU|Mauritius|eastern-africa
+MZ|Mozambique|eastern-africa
+MW|Malawi|eastern-africa
+ZM|Zambia|eastern-africa
+ZW|Zimbabwe|eastern-africa
+SC|Seychelles|eastern-africa
+CM|Cameroon|middle-africa
+CD|Democratic Republic of the Congo|middle-africa|DRC;DR Congo
+CG|Republic of the Congo|middle-africa|Congo
+GA|Gabon|middle-africa
+AO|Angola|middle-africa
+TD|Chad|middle-africa
+CF|Central African Republic|middle-africa
+GQ|Equatorial Guinea|middle-africa
+ZA|South Africa|southern-africa|RSA
+NA|Namibia|southern-africa
+BW|Botswana|southern-africa
+LS|Lesotho|southern-africa
+SZ|Eswatini|southern-africa|Swaziland
+AU|Australia|australia-new-zealand
+NZ|New Zealand|australia-new-zealand|Aotearoa
+PG|Papua New Guinea|melanesia
+FJ|Fiji|melanesia
+SB|Solomon Islands|melanesia
+VU|Vanuatu|melanesia
+GU|Guam|micronesia
+WS|Samoa|polynesia
+TO|Tonga|polynesia
+"""
+
+# country|code|name|aliases (state ids are "<country>-<code>")
+STATES = """
+US|AL|Alabama
+US|AK|Alaska
+US|AZ|Arizona
+US|AR|Arkansas
+US|CA|California
+US|CO|Colorado
+US|CT|Connecticut
+US|DE|Delaware
+US|DC|District of Columbia|Washington DC;Washington D.C.;D.C.
+US|FL|Florida
+US|GA|Georgia
+US|HI|Hawaii
+US|ID|Idaho
+US|IL|Illinois
+US|IN|Indiana
+US|IA|Iowa
+US|KS|Kansas
+US|KY|Kentucky
+US|LA|Louisiana
+US|ME|Maine
+US|MD|Maryland
+US|MA|Massachusetts
+US|MI|Michigan
+US|MN|Minnesota
+US|MS|Mississippi
+US|MO|Missouri
+US|MT|Montana
+US|NE|Nebraska
+US|NV|Nevada
+US|NH|New Hampshire
+US|NJ|New Jersey
+US|NM|New Mexico
+US|NY|New York|New York State
+US|NC|North Carolina
+US|ND|North Dakota
+US|OH|Ohio
+US|OK|Oklahoma
+US|OR|Oregon
+US|PA|Pennsylvania
+US|RI|Rhode Island
+US|SC|South Carolina
+US|SD|South Dakota
+US|TN|Tennessee
+US|TX|Texas
+US|UT|Utah
+US|VT|Vermont
+US|VA|Virginia
+US|WA|Washington|Washington State
+US|WV|West Virginia
+US|WI|Wisconsin
+US|WY|Wyoming
+CA|AB|Alberta
+CA|BC|British Columbia
+CA|MB|Manitoba
+CA|NB|New Brunswick
+CA|NL|Newfoundland and Labrador
+CA|NS|Nova Scotia
+CA|ON|Ontario
+CA|PE|Prince Edward Island
+CA|QC|Quebec|Québec
+CA|SK|Saskatchewan
+CA|NT|Northwest Territories
+CA|NU|Nunavut
+CA|YT|Yukon
+AU|NSW|New South Wales
+AU|VIC|Victoria
+AU|QLD|Queensland
+AU|WA|Western Australia
+AU|SA|South Australia
+AU|TAS|Tasmania
+AU|ACT|Australian Capital Territory
+AU|NT|Northern Territory
+GB|ENG|England
+GB|SCT|Scotland
+GB|WLS|Wales
+GB|NIR|Northern Ireland
+"""
+
+# parent (state or country id)|name|aliases
+CITIES = """
+US-NY|New York City|New York;NYC;Manhattan;Brooklyn
+US-CA|San Francisco|SF;San Francisco Bay
+US-CA|Los Angeles|LA
+US-CA|San Diego
+US-CA|San Jose|Silicon Valley
+US-CA|Palo Alto
+US-CA|Mountain View
+US-CA|Menlo Park
+US-CA|Oakland
+US-CA|Sacramento
+US-WA|Seattle
+US-WA|Redmond
+US-OR|Portland
+US-MA|Boston
+US-MA|Cambridge
+US-IL|Chicago
+US-TX|Austin
+US-TX|Dallas|Dallas-Fort Worth;DFW
+US-TX|Houston
+US-TX|San Antonio
+US-GA|Atlanta
+US-FL|Miami
+US-FL|Tampa
+US-FL|Orlando
+US-CO|Denver
+US-CO|Boulder
+US-AZ|Phoenix
+US-PA|Philadelphia
+US-PA|Pittsburgh
+US-DC|Washington|Washington DC
+US-VA|Arlington
+US-MD|Baltimore
+US-NC|Charlotte
+US-NC|Raleigh|Raleigh-Durham;Research Triangle
+US-TN|Nashville
+US-MN|Minneapolis|Minneapolis-St. Paul;Twin Cities
+US-MI|Detroit
+US-OH|Columbus
+US-OH|Cleveland
+US-UT|Salt Lake City
+US-NV|Las Vegas
+US-MO|St. Louis|Saint Louis
+US-NJ|Newark
+US-NJ|Jersey City
+US-CT|Stamford
+US-NY|Ithaca
+CA-ON|Toronto
+CA-ON|Ottawa
+CA-ON|Waterloo
+CA-QC|Montreal|Montréal
+CA-BC|Vancouver
+CA-AB|Calgary
+GB-ENG|London
+GB-ENG|Manchester
+GB-ENG|Birmingham
+GB-ENG|Oxford
+GB-ENG|Cambridge
+GB-SCT|Edinburgh
+GB-SCT|Glasgow
+IE|Dublin
+FR|Paris
+DE|Berlin
+DE|Munich|München
+DE|Frankfurt|Frankfurt am Main
+DE|Hamburg
+NL|Amsterdam
+NL|Rotterdam
+BE|Brussels|Bruxelles
+CH|Zurich|Zürich
+CH|Geneva|Genève
+ES|Madrid
+ES|Barcelona
+IT|Milan|Milano
+IT|Rome|Roma
+PT|Lisbon|Lisboa
+SE|Stockholm
+DK|Copenhagen
+NO|Oslo
+FI|Helsinki
+PL|Warsaw|Warszawa
+AT|Vienna|Wien
+CZ|Prague|Praha
+IL|Tel Aviv|Tel Aviv-Yafo
+AE|Dubai
+AE|Abu Dhabi
+SA|Riyadh
+IN|Bangalore|Bengaluru
+IN|Mumbai|Bombay
+IN|New Delhi|Delhi;Delhi NCR;Gurgaon;Gurugram
+IN|Hyderabad
+IN|Pune
+IN|Chennai
+CN|Beijing
+CN|Shanghai
+CN|Shenzhen
+JP|Tokyo
+KR|Seoul
+TW|Taipei
+AU-NSW|Sydney
+AU-VIC|Melbourne
+AU-QLD|Brisbane
+NZ|Auckland
+BR|São Paulo|Sao Paulo
+BR|Rio de Janeiro
+MX|Mexico City|Ciudad de México;CDMX
+AR|Buenos Aires
+CO|Bogotá|Bogota
+CL|Santiago
+ZA|Johannesburg
+ZA|Cape Town
+NG|Lagos
+KE|Nairobi
+EG|Cairo
+"""
+
+# Words LinkedIn wraps around place names ("Greater Boston", "San Francisco Bay Area")
+_NOISE_RE = re.compile(r"^(greater|metro|metropolitan)\s+|\s+(bay area|metropolitan area|metro area|area)$")
+_PUNCT_RE = re.compile(r"[^\w\s-]")
+_SPACE_RE = re.compile(r"[\s-]+")
+
+
+def normalize_place(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    key = _SPACE_RE.sub(' ', _PUNCT_RE.sub(' ', name.lower())).strip()
+    key = _NOISE_RE.sub('', key).strip()
+    return key or None
+
+
+def _slug(name: str) -> str:
+    return normalize_place(name).replace(' ', '-')
+
+
+class Gazetteer:
+    """Location tree (world > continent > subregion > country > state > city) with Euler-tour spans.
+
+    After freezing, every node has tin (its DFS entry position) and tout (one past its last
+    descendant), so "X is within Y" is the integer test tin[Y] <= tin[X] < tout[Y] and all
+    places inside Y occupy the contiguous range [tin[Y], tout[Y]). Nodes can be added at any
+    time; spans are recomputed lazily on the next lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._nodes: Dict[str, dict] = {ROOT_ID: {'id': ROOT_ID, 'name': 'World', 'kind': 'world', 'parent': None}}
+        self._children: Dict[str, List[str]] = {ROOT_ID: []}
+        self._aliases: Dict[str, List[str]] = {'world': [ROOT_ID], 'global': [ROOT_ID], 'worldwide': [ROOT_ID]}
+        self._tin: Dict[str, int] = {}
+        self._tout: Dict[str, int] = {}
+        self._dirty = True
+        # Bumped on every add; caches keyed on it drop stale resolutions and positions
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def add(self, node_id: str, name: str, kind: str, parent: str, aliases: Iterable[str] = ()) -> None:
+        with self._lock:
+            if parent not in self._nodes:
+                raise KeyError(f"Unknown parent location {parent!r} for {node_id!r}")
+            if node_id in self._nodes:
+                return
+            self._nodes[node_id] = {'id': node_id, 'name': name, 'kind': kind, 'parent': parent}
+            self._children[node_id] = []
+            self._children[parent].append(node_id)
+            for alias in (name, *aliases):
+                key = normalize_place(alias)
+                if key and node_id not in self._aliases.setdefault(key, []):
+                    self._aliases[key].append(node_id)
+            self._dirty = True
+            self.version += 1
+
+    def _freeze(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            tin, tout = {}, {}
+            counter = 0
+            stack: List[Tuple[str, bool]] = [(ROOT_ID, False)]
+            while stack:
+                node_id, leaving = stack.pop()
+                if leaving:
+                    tout[node_id] = counter
+                    continue
+                tin[node_id] = counter
+                counter += 1
+                stack.append((node_id, True))
+                stack.extend((child, False) for child in reversed(self._children[node_id]))
+            self._tin, self._tout = tin, tout
+            self._dirty = False
+
+    def node(self, node_id: str) -> Optional[dict]:
+        return self._nodes.get(node_id)
+
+    def span(self, node_id: str) -> Tuple[int, int]:
+        """[tin, tout) range of Euler-tour positions covered by a node and its descendants."""
+        self._freeze()
+        return self._tin[node_id], self._tout[node_id]
+
+    def position(self, node_id: str) -> int:
+        self._freeze()
+        return self._tin[node_id]
+
+    def is_within(self, node_id: str, ancestor_id: str) -> bool:
+        """True when node_id is ancestor_id or lies inside it."""
+        self._freeze()
+        return self._tin[ancestor_id] <= self._tin[node_id] < self._tout[ancestor_id]
+
+    def ancestors(self, node_id: str) -> List[str]:
+        """node_id and every enclosing node up to the root, most specific first."""
+        chain = []
+        while node_id is not None:
+            chain.append(node_id)
+            node_id = self._nodes[node_id]['parent']
+        return chain
+
+    def lookup(self, name: Optional[str], kind: Optional[str] = None, within: Optional[str] = None) -> List[str]:
+        candidates = self._aliases.get(normalize_place(name), []) if name else []
+        if kind is not None:
+            candidates = [c for c in candidates if self._nodes[c]['kind'] == kind]
+        if within is not None:
+            candidates = [c for c in candidates if self.is_within(c, within)]
+        return list(candidates)
+
+    def resolve(self, city: Optional[str] = None, state: Optional[str] = None, country: Optional[str] = None) -> Optional[str]:
+        """Most specific node for structured parts (e.g. Proxycurl's city/state/country)."""
+        node = None
+        countries = self.lookup(country, 'country') if country else []
+        if countries:
+            node = countries[0]
+        if state:
+            states = self.lookup(state, 'state', within=node) or ([] if node else self.lookup(state))
+            if states:
+                node = states[0]
+        if city:
+            cities = self.lookup(city, 'city', within=node)
+            if cities:
+                node = cities[0]
+        return node
+
+    def resolve_text(self, text: Optional[str]) -> Optional[str]:
+        """Resolve free text such as "Austin, Texas, United States" or "Greater Boston"."""
+        if not text:
+            return None
+        return self._resolve_text_cached(text, self.version)
+
+    @lru_cache(maxsize=100_000)
+    def _resolve_text_cached(self, text: str, _version: int) -> Optional[str]:
+        whole = self.lookup(text)
+        if len(whole) == 1:
+            return whole[0]
+        parts = [self.lookup(part) for part in text.split(',')]
+        parts = [candidates for candidates in parts if candidates]
+        if not parts:
+            return None
+        # Pick the candidate best supported by the other parts (they should be its ancestors),
+        # then the most specific one ("New York, NY, United States" is the city). Unsupported
+        # ambiguous names fall back to the broadest reading ("Georgia" alone is the country).
+        best, best_key = None, None
+        for i, candidates in enumerate(parts):
+            for candidate in candidates:
+                enclosing = set(self.ancestors(candidate))
+                support = sum(
+                    1 for j, others in enumerate(parts) if j != i and any(other in enclosing for other in others)
+                )
+                depth = KIND_DEPTH.get(self._nodes[candidate]['kind'], 0)
+                key = (support, depth if support else -depth)
+                if best_key is None or key > best_key:
+                    best, best_key = candidate, key
+        return best
+
+
+def _rows(table: str) -> List[List[str]]:
+    return [line.split('|') for line in table.strip().splitlines()]
+
+
+def build_default_gazetteer(extra_path: Optional[str] = LOCATIONS_GAZETTEER_PATH) -> Gazetteer:
+    gazetteer = Gazetteer()
+    for code, name, *aliases in _rows(CONTINENTS):
+        gazetteer.add(f"continent:{code}", name, 'continent', ROOT_ID, aliases[0].split(';') if aliases else ())
+    for slug, name, continent, *aliases in _rows(SUBREGIONS):
+        gazetteer.add(f"subregion:{slug}", name, 'subregion', f"continent:{continent}", aliases[0].split(';') if aliases else ())
+    for code, name, parent, *aliases in _rows(COUNTRIES):
+        parent_id = f"continent:{parent}" if len(parent) == 2 else f"subregion:{parent}"
+        gazetteer.add(f"country:{code}", name, 'country', parent_id, [code, *(aliases[0].split(';') if aliases else ())])
+    for country, code, name, *aliases in _rows(STATES):
+        gazetteer.add(f"state:{country}-{code}", name, 'state', f"country:{country}",
+                      [code, *(aliases[0].split(';') if aliases else ())])
+    for parent, name, *aliases in _rows(CITIES):
+        parent_id = f"state:{parent}" if '-' in parent else f"country:{parent}"
+        gazetteer.add(f"city:{parent}-{_slug(name)}", name, 'city', parent_id, aliases[0].split(';') if aliases else ())
+    if extra_path and os.path.exists(extra_path):
+        with open(extra_path) as f:
+            for node in json.load(f):
+                gazetteer.add(node['id'], node['name'], node['kind'], node['parent'], node.get('aliases', ()))
+    return gazetteer
+
+
+gazetteer = build_default_gazetteer()
+
+
+def resolve_expert_location(expert: dict) -> Optional[str]:
+    """Node id for an expert's home location (structured city/state/country, else geography)."""
+    return (
+        gazetteer.resolve(expert.get('city'), expert.get('state'), expert.get('countryFullName') or expert.get('country'))
+        or gazetteer.resolve_text(expert.get('geography'))
+    )
+
+
+def resolve_job_location(job: dict) -> Optional[str]:
+    return job.get('locationId') or gazetteer.resolve_text(job.get('location'))
+
+
+class LocationRangeIndex:
+    """Items sorted by the Euler-tour position of their location node.
+
+    Everything located inside a region is one contiguous slice, found with two binary searches,
+    so a region filter never compares place names. Additions and removals are cheap; the sorted
+    arrays are rebuilt lazily on the next query.
+    """
+
+    def __init__(self, places: Gazetteer = None):
+        self.gazetteer = places or gazetteer
+        self._items: Dict[object, str] = {}
+        self._positions: List[int] = []
+        self._sorted_items: List[object] = []
+        self._dirty = False
+        self._built_version = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item, node_id: Optional[str]) -> None:
+        if node_id is None or node_id not in self.gazetteer:
+            return
+        with self._lock:
+            self._items[item] = node_id
+            self._dirty = True
+
+    def discard(self, item) -> None:
+        with self._lock:
+            if self._items.pop(item, None) is not None:
+                self._dirty = True
+
+    def _rebuild(self) -> None:
+        entries = sorted(((self.gazetteer.position(node), item) for item, node in self._items.items()),
+                         key=lambda entry: entry[0])
+        self._positions = [position for position, _ in entries]
+        self._sorted_items = [item for _, item in entries]
+        self._dirty = False
+        self._built_version = self.gazetteer.version
+
+    def within(self, node_id: str) -> List[object]:
+        """Every item located at node_id or anywhere inside it."""
+        if node_id not in self.gazetteer:
+            return []
+        start, end = self.gazetteer.span(node_id)
+        with self._lock:
+            if self._dirty or self._built_version != self.gazetteer.version:
+                self._rebuild()
+            low = bisect.bisect_left(self._positions, start)
+            high = bisect.bisect_left(self._positions, end)
+            return self._sorted_items[low:high]
@@ -0,0 +1,255 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# When disabled every call below is a no-op on a shared null object
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Serve /metrics (Prometheus text) and /metrics.json on this port; 0 leaves it to the host app
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+# Interface the server listens on; loopback by default, since the counters describe internal
+# calls. Set to 0.0.0.0 to let a scraper on another host reach it.
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    'roster_fetch_seconds': 'Time to serve a meta-experts roster, by cache result',
+    'dedup_match_seconds': 'Time identify_repeat_experts spends matching one expert, by how it matched',
+    'tag_expert_stage_seconds': 'Time in each tag_expert stage (plan, enrich, write)',
+    'llm_request_seconds': 'LLM request latency including scheduler wait, by call class',
+    'llm_tokens_total': 'Prompt and completion tokens used, by call class',
+    'llm_cache_total': 'LLM response cache lookups, by call class and hit or miss',
+    'proxycurl_request_seconds': 'ProxyCurl HTTP request latency, by endpoint and status',
+    'proxycurl_cache_total': 'ProxyCurl lookups answered from the cache, coalesced or fetched',
+    'backend_request_seconds': 'Backend API request latency, by HTTP method',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    """Context manager observing its duration; adds outcome="ok"/"error" to the labels."""
+
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def label(self, **labels: Any) -> None:
+        """Add labels only known once the timed block has run (e.g. cache hit or miss)."""
+        self.labels.update(labels)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.labels['outcome'] = 'ok' if exc_type is None else 'error'
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+    """In-process counters and latency histograms, exported as Prometheus text or JSON.
+
+    Metrics are created on first use and keyed by name plus labels; keep label values to small
+    fixed sets (call class, method, outcome), never ids or emails. Every update takes one lock,
+    so instrumenting a call costs a few microseconds.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.counts[position] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def timer(self, name: str, **labels: Any) -> _Timer:
+        """with metrics.timer('backend_request_seconds', method='PUT'): ..."""
+        return _Timer(self, name, labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        """Decorator form of timer() for a whole function."""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Timer(self, name, dict(labels)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def export_json(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        'labels': dict(key),
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': dict(zip([*map(str, self.buckets), '+Inf'], histogram.counts)),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {'counters': counters, 'histograms': histograms}
+
+    def export_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip([*map(str, self.buckets), '+Inf'], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', bound))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def label(self, **labels: Any) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullMetrics:
+    """Stand-in used when METRICS_ENABLED is false: same interface, records nothing."""
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        pass
+
+    def timer(self, name: str, **labels: Any) -> _NullTimer:
+        return _NULL_TIMER
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        return lambda func: func
+
+    def reset(self) -> None:
+        pass
+
+    def export_json(self) -> Dict[str, Any]:
+        return {'counters': {}, 'histograms': {}}
+
+    def export_prometheus(self) -> str:
+        return ''
+
+
+metrics = MetricsRegistry() if METRICS_ENABLED else NullMetrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = metrics.export_prometheus().encode(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = json.dumps(metrics.export_json()).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics and /metrics.json from a daemon thread (once per process)."""
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+            print(f"Serving metrics on {host}:{_server.server_port}")
+        return _server
+
+
+if METRICS_ENABLED and METRICS_PORT:
+    start_metrics_server()
@@ -0,0 +1,114 @@
+from typing import Dict, List, Optional, Sequence
+
+# A name counts as a repeat when levenshtein(a, b) / max(len(a), len(b)) < NAME_MATCH_THRESHOLD
+NAME_MATCH_THRESHOLD = 0.05
+
+
+def max_allowed_distance(longest_length: int, threshold: float = NAME_MATCH_THRESHOLD) -> int:
+    """Largest integer distance d with d / longest_length < threshold (-1 when nothing passes)."""
+    if longest_length <= 0:
+        return -1
+    limit = threshold * longest_length
+    distance = int(limit)
+    if distance >= limit:
+        distance -= 1
+    return distance
+
+
+class NamePattern:
+    """A name compiled once for bit-parallel (Myers/Hyyrö) edit distance against many candidates.
+
+    Each candidate costs O(len(candidate)) big-int operations instead of the O(len^2) Python DP,
+    and scoring stops as soon as the distance provably exceeds the allowed bound.
+    """
+
+    def __init__(self, name: str):
+        self.text = name.lower()
+        self.length = len(self.text)
+        self._mask = (1 << self.length) - 1
+        self._high = 1 << (self.length - 1) if self.length else 0
+        peq: Dict[str, int] = {}
+        for i, char in enumerate(self.text):
+            peq[char] = peq.get(char, 0) | (1 << i)
+        self._peq = peq
+
+    def distance(self, other: str, max_distance: Optional[int] = None) -> Optional[int]:
+        """Edit distance to other (already lowercased), or None if it exceeds max_distance."""
+        m = self.length
+        n = len(other)
+        if max_distance is not None and abs(m - n) > max_distance:
+            return None
+        if m == 0:
+            return n if max_distance is None or n <= max_distance else None
+
+        mask = self._mask
+        high = self._high
+        peq = self._peq
+        pv = mask
+        mv = 0
+        score = m
+        remaining = n
+        for char in other:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+            remaining -= 1
+            # Each remaining column can lower the final score by at most one
+            if max_distance is not None and score - remaining > max_distance:
+                return None
+        return score
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: Optional[int] = None) -> Optional[int]:
+    """Levenshtein distance between s1 and s2, or None if it is larger than max_distance."""
+    return NamePattern(s1).distance(s2, max_distance)
+
+
+def name_distances(
+    name: str,
+    candidates: Sequence[str],
+    threshold: float = NAME_MATCH_THRESHOLD,
+) -> List[Optional[int]]:
+    """Score one name against a batch of candidate names.
+
+    Returns, per candidate, the case-insensitive edit distance when it is within the fractional
+    threshold (relative to the longer name) and None otherwise. Candidates whose length alone
+    rules them out never reach the distance kernel.
+    """
+    pattern = NamePattern(name)
+    name_length = len(name)
+    results: List[Optional[int]] = []
+    for candidate in candidates:
+        if not candidate:
+            results.append(None)
+            continue
+        max_distance = max_allowed_distance(max(name_length, len(candidate)), threshold)
+        if max_distance < 0 or abs(name_length - len(candidate)) > max_distance:
+            results.append(None)
+            continue
+        results.append(pattern.distance(candidate.lower(), max_distance))
+    return results
+
+
+def match_names(
+    name: str,
+    candidates: Sequence[str],
+    threshold: float = NAME_MATCH_THRESHOLD,
+) -> List[int]:
+    """Indices of the candidates whose names are within the fractional edit-distance threshold."""
+    if not name:
+        return []
+    return [
+        i for i, distance in enumerate(name_distances(name, candidates, threshold))
+        if distance is not None
+    ]
@@ -0,0 +1,195 @@
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from .records import as_plain, json_default
+from .token_counting import count_tokens, truncate_to_tokens
+
+# Set to false to embed whole records as before (e.g. to compare answer quality)
+PROMPT_COMPACTION_ENABLED = os.getenv('PROMPT_COMPACTION_ENABLED', 'true').lower() == 'true'
+PROMPT_TOKEN_MODEL = os.getenv('PROMPT_TOKEN_MODEL', 'gpt-4o')
+# The legacy block is rendered and counted for the before/after report on every prompt when
+# true, otherwise on this fraction of them (rendering top_ten the old way costs ~50k tokens)
+PROMPT_SIZE_REPORT_ENABLED = os.getenv('PROMPT_SIZE_REPORT_ENABLED', 'false').lower() == 'true'
+PROMPT_SIZE_REPORT_SAMPLE_RATE = float(os.getenv('PROMPT_SIZE_REPORT_SAMPLE_RATE', '0.01'))
+# Descriptions are never cut below this many tokens while fitting a budget
+PROMPT_MIN_DESCRIPTION_TOKENS = int(os.getenv('PROMPT_MIN_DESCRIPTION_TOKENS', '24'))
+
+# Per template: the meta-expert and job fields its question depends on. Ids stay only where the
+# model has to answer with one; links, pictures, phone numbers and bookkeeping ids are dropped.
+TEMPLATE_FIELDS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    'expert_tags': (
+        ('name', 'profession', 'company', 'description', 'geography', 'jobs'),
+        ('role', 'company', 'industry', 'description', 'startDate', 'endDate', 'isEducation'),
+    ),
+    'find_father': (
+        ('id', 'name', 'profession', 'company', 'geography', 'email', 'linkedInLink', 'jobs'),
+        ('role', 'company', 'startDate', 'endDate', 'isEducation'),
+    ),
+    'top_ten': (
+        ('id', 'name', 'profession', 'company', 'description', 'geography', 'jobs'),
+        ('role', 'company', 'industry', 'seniorityLevel', 'startDate', 'endDate'),
+    ),
+}
+# Token budget of each data block embedded in a template (the fixed instructions come on top)
+TEMPLATE_TOKEN_BUDGETS: Dict[str, int] = {
+    'expert_tags': int(os.getenv('PROMPT_BUDGET_EXPERT_TAGS', '1500')),
+    'find_father': int(os.getenv('PROMPT_BUDGET_FIND_FATHER', '3000')),
+    'top_ten': int(os.getenv('PROMPT_BUDGET_TOP_TEN', '12000')),
+}
+_DATE_FIELDS = frozenset({'startDate', 'endDate'})
+
+
+def _present(value: Any) -> bool:
+    return value not in (None, '', [], {})
+
+
+def _compact_value(field: str, value: Any) -> Any:
+    # Job dates are month-granular; "2019-02" says the same as "2019-02-01T00:00:00Z"
+    if field in _DATE_FIELDS and isinstance(value, str):
+        return value[:7]
+    return value
+
+
+def project(record: Any, fields: Sequence[str], job_fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """The given fields of a meta expert (and of each of its jobs), skipping empty values."""
+    projected = {}
+    for field in fields:
+        value = record.get(field)
+        if field == 'jobs' and value:
+            value = [
+                {key: _compact_value(key, job.get(key)) for key in job_fields if _present(job.get(key))}
+                for job in value
+            ]
+        if _present(value):
+            projected[field] = value
+    return projected
+
+
+def render(value: Any) -> str:
+    """Compact JSON: no indentation or spaces, non-ASCII kept as is."""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=json_default)
+
+
+def _descriptions(data: Any) -> Iterable[Tuple[Dict[str, Any], str]]:
+    """(container, key) of every description in projected data, nested jobs included."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _descriptions(item)
+    elif isinstance(data, dict):
+        if isinstance(data.get('description'), str):
+            yield data, 'description'
+        for job in data.get('jobs') or ():
+            yield from _descriptions(job)
+
+
+def fit_to_budget(data: Any, budget: int, model: str = PROMPT_TOKEN_MODEL) -> Tuple[str, int]:
+    """Render data within budget tokens by shortening descriptions; returns (text, tokens).
+
+    The longest descriptions are cut first: the per-description cap halves until the rendering
+    fits or reaches PROMPT_MIN_DESCRIPTION_TOKENS, after which descriptions are dropped. Names,
+    companies, roles and dates are never touched, so a rendering can still exceed the budget.
+    """
+    text = render(data)
+    tokens = count_tokens(text, model)
+    if tokens <= budget:
+        return text, tokens
+    slots = list(_descriptions(data))
+    originals = [container[key] for container, key in slots]
+    lengths = [count_tokens(value, model) for value in originals]
+    cap = max(lengths, default=0)
+    while tokens > budget and cap > PROMPT_MIN_DESCRIPTION_TOKENS:
+        cap = max(cap // 2, PROMPT_MIN_DESCRIPTION_TOKENS)
+        for (container, key), original, length in zip(slots, originals, lengths):
+            if length > cap:
+                container[key] = truncate_to_tokens(original, cap, model)
+        text = render(data)
+        tokens = count_tokens(text, model)
+    if tokens > budget:
+        for container, key in slots:
+            container.pop(key, None)
+        text = render(data)
+        tokens = count_tokens(text, model)
+    return text, tokens
+
+
+class PromptSizeReport:
+    """Per-template token counts of the embedded data, before and after compaction.
+
+    Every prompt counts towards prompts, tokens_after and over_budget; the legacy size is only
+    known for measured prompts, so saved_ratio compares those alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'prompts': 0, 'tokens_after': 0, 'over_budget': 0, 'measured': 0,
+                     'tokens_before': 0, 'measured_tokens_after': 0}
+        )
+
+    def record(self, template: str, after: int, over_budget: bool, before: Optional[int] = None) -> None:
+        with self._lock:
+            totals = self._totals[template]
+            totals['prompts'] += 1
+            totals['tokens_after'] += after
+            totals['over_budget'] += int(over_budget)
+            if before is not None:
+                totals['measured'] += 1
+                totals['tokens_before'] += before
+                totals['measured_tokens_after'] += after
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stats = {}
+            for template, totals in self._totals.items():
+                saved = totals['tokens_before'] - totals['measured_tokens_after']
+                stats[template] = dict(
+                    totals,
+                    saved_ratio=saved / totals['tokens_before'] if totals['tokens_before'] else 0.0,
+                )
+            return stats
+
+    def print_report(self) -> None:
+        for template, stats in sorted(self.get_stats().items()):
+            print(
+                f"{template}: {stats['prompts']} prompts, {stats['tokens_after']} data tokens, "
+                f"{stats['over_budget']} over budget; {stats['measured']} measured: "
+                f"{stats['tokens_before']} -> {stats['measured_tokens_after']} ({stats['saved_ratio']:.0%} saved)"
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+prompt_size_report = PromptSizeReport()
+
+
+def compact_block(template: str, value: Any, legacy: Callable[[], str]) -> str:
+    """The data block of a template: projected and budgeted, or legacy() when compaction is off.
+
+    value is one meta expert or a list of them; legacy renders what the template embedded
+    before. It is only called when compaction is off or the prompt is measured for the report.
+    """
+    if not PROMPT_COMPACTION_ENABLED:
+        return legacy()
+    fields, job_fields = TEMPLATE_FIELDS[template]
+    plain = as_plain(value)
+    if isinstance(plain, list):
+        data: Any = [project(item, fields, job_fields) if isinstance(item, dict) else item for item in plain]
+    else:
+        data = project(plain, fields, job_fields)
+    budget = TEMPLATE_TOKEN_BUDGETS[template]
+    text, tokens = fit_to_budget(data, budget)
+    before = None
+    if PROMPT_SIZE_REPORT_ENABLED or random.random() < PROMPT_SIZE_REPORT_SAMPLE_RATE:
+        before = count_tokens(legacy(), PROMPT_TOKEN_MODEL)
+    prompt_size_report.record(template, tokens, tokens > budget, before)
+    return text
+
+
+def get_prompt_stats() -> Dict[str, Dict[str, float]]:
+    return prompt_size_report.get_stats()
@@ -1,5 +1,39 @@
 import json
 
+from .constants import SENIORITY_LEVELS
+from .prompt_compaction import compact_block
+from .records import json_default
+
+SENIORITY_VALUES = "\n".join(f"- {level}" for level in SENIORITY_LEVELS)
+
+# Shapes the callers in tag_expert rely on, checked by wire_codec.parse_llm_json before a reply
+# is accepted or cached. Keys stay optional where the caller already copes with them missing;
+# keys an object does not list may be dropped while decoding, so list every key a caller reads.
+FATHER_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'relevant_expert_id': {'type': ['object', 'null'], 'properties': {'id': {'type': ['string', 'null']}}},
+    },
+}
+EXPERT_TAGS_SCHEMA = {'type': 'object', 'properties': {'tags': {'type': 'array'}}}
+SENIORITY_SCHEMA = {'type': 'object', 'properties': {'seniority': {'type': ['string', 'null']}}}
+BATCH_SENIORITY_SCHEMA = {
+    'type': 'object',
+    'required': ['seniorities'],
+    'properties': {
+        'seniorities': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': ['string', 'integer', 'null']},
+                    'seniority': {'type': ['string', 'null']},
+                },
+            },
+        },
+    },
+}
+
 def get_top_ten_templates(experts: list, profile_type: str):
     message = f"""
 You are an expert network assistant. You have been provided with {len(experts)} experts and a profile type requirement:
@@ -15,7 +49,7 @@ Your task:
 'ids': [list_of_uuids]
 
 Here is the list of experts for evaluation:
-{experts}
+{compact_block('top_ten', experts, lambda: str(experts))}
 """
     return message
 
@@ -43,7 +77,7 @@ For each tag, please return an object with the following structure:
 If any timeframe is mentioned in a different format, please convert it to a yearly rate.
 
 The expert profile is provided below:
-{json.dumps(expert_info, indent=2)}
+{compact_block('expert_tags', expert_info, lambda: json.dumps(expert_info, indent=2, default=json_default))}
 
 Please return the result as a JSON array of tag objects.
 """
@@ -70,10 +104,10 @@ STRICT MATCHING CRITERIA:
 Analyze the meta experts and new expert below using these strict criteria:
 
 Meta Experts:
-{experts}
+{compact_block('find_father', experts, lambda: str(experts))}
 
 New Expert:
-{new_expert}
+{compact_block('find_father', new_expert, lambda: str(new_expert))}
 
 Return ONLY in this exact format:
 {{
@@ -141,15 +175,7 @@ JOB:
 
 
 AVAILABLE VALUES:
-- Owner
-- Partner
-- C-Suite
-- Vice-President
-- Director
-- Manager
-- Senior
-- Entry
-- Trainee
+{SENIORITY_VALUES}
 
 
 Return your response as a JSON object with this structure:
@@ -162,6 +188,37 @@ Return your response as a JSON object with this structure:
     return message
 
 
+def format_seniority_job_line(job_id: str, job: dict) -> str:
+    return f"{job_id}: {json.dumps(job, separators=(',', ':'), default=json_default)}"
+
+
+def get_batch_seniority_template(jobs: dict) -> str:
+    """Seniority prompt for several jobs at once; jobs maps a short id to the job fields to classify."""
+    jobs_block = "\n".join(format_seniority_job_line(job_id, job) for job_id, job in jobs.items())
+    message = f"""
+You are an AI assistant tasked with classifying the seniority of each of the jobs below. For every job, choose the single value from AVAILABLE VALUES that most closely matches the seniority indicated by that job.
+
+
+JOBS (one per line, prefixed by the job id):
+{jobs_block}
+
+
+AVAILABLE VALUES:
+{SENIORITY_VALUES}
+
+
+Return your response as a JSON object with one entry per job id, using this structure:
+
+{{
+  "seniorities": [
+    {{"id": "job id", "seniority": "value"}}
+  ]
+}}
+"""
+
+    return message
+
+
 def get_relevant_job_filters_template(prompt: str, category: str, filters: list) -> str:    
     category_descriptions = {
         "seniority": "seniority levels of positions (e.g., Senior, Director, VP)",
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .dedup_index import normalize_linkedin_url
+from .llm_scheduler import TokenBucket
+from .metrics import metrics
+from .records import Profile, json_default
+from .wire_codec import decode_response, loads, typed_loads
+
+if os.getenv('FLASK_ENV') != 'production':
+    load_dotenv()
+
+PROXYCURL_API_KEY = os.getenv('PROXYCURL_API_KEY')
+PROXYCURL_BASE_URL = os.getenv('PROXYCURL_BASE_URL', 'https://nubela.co/proxycurl').rstrip('/')
+PERSON_ENDPOINT = 'api/v2/linkedin'
+SEARCH_ENDPOINT = 'api/v2/search/person'
+# Endpoints whose successful replies are decoded straight into records (see records.py)
+RECORD_TYPES = {PERSON_ENDPOINT: Profile}
+PROXYCURL_TIMEOUT = float(os.getenv('PROXYCURL_TIMEOUT', '60'))
+PROXYCURL_MAX_CONCURRENCY = int(os.getenv('PROXYCURL_MAX_CONCURRENCY', '8'))
+PROXYCURL_MAX_RETRIES = int(os.getenv('PROXYCURL_MAX_RETRIES', '3'))
+# ProxyCurl's documented per-key limit; requests beyond it wait instead of drawing 429s
+PROXYCURL_RATE_LIMIT_PER_MINUTE = float(os.getenv('PROXYCURL_RATE_LIMIT_PER_MINUTE', '300'))
+PROXYCURL_CACHE_ENABLED = os.getenv('PROXYCURL_CACHE_ENABLED', 'true').lower() == 'true'
+# Cached profiles are personal data, so they live in the user's cache directory, not the cwd
+PROXYCURL_CACHE_PATH = os.getenv('PROXYCURL_CACHE_PATH', os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'proxycurl', 'cache.sqlite3'
+))
+# How old a cached profile may be before it is fetched (and paid for) again
+PROXYCURL_CACHE_TTL_SECONDS = float(os.getenv('PROXYCURL_CACHE_TTL_SECONDS', str(14 * 24 * 3600)))
+# Search results change as people move jobs, so they go stale sooner than profiles
+PROXYCURL_SEARCH_TTL_SECONDS = float(os.getenv('PROXYCURL_SEARCH_TTL_SECONDS', str(24 * 3600)))
+PROXYCURL_CACHE_MEMORY_ENTRIES = int(os.getenv('PROXYCURL_CACHE_MEMORY_ENTRIES', '1024'))
+PROXYCURL_CACHE_DISK_ENTRIES = int(os.getenv('PROXYCURL_CACHE_DISK_ENTRIES', '200000'))
+
+
+class ProxyCurlResponse(NamedTuple):
+    status_code: int
+    data: Any
+    text: str
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+
+def _canonical_value(value: Any) -> str:
+    value = str(value)
+    return (normalize_linkedin_url(value) or value) if 'linkedin.com' in value.lower() else value
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Cache key of a call: the endpoint plus its params, with LinkedIn URLs canonicalized.
+
+    "https://www.linkedin.com/in/jane/" and "linkedin.com/in/jane?trk=x" are the same profile,
+    and param order does not matter.
+    """
+    canonical = sorted((name, _canonical_value(value)) for name, value in params.items() if value is not None)
+    return hashlib.sha256(json.dumps([endpoint.strip('/'), canonical]).encode('utf-8')).hexdigest()
+
+
+class ProxyCurlCache:
+    """ProxyCurl JSON responses in an in-memory LRU backed by an SQLite file.
+
+    Entries carry their fetch time; callers pass the freshness they need (max_age) on lookup,
+    so profiles and search results can share the cache with different lifetimes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = PROXYCURL_CACHE_PATH,
+        max_memory_entries: int = PROXYCURL_CACHE_MEMORY_ENTRIES,
+        max_disk_entries: int = PROXYCURL_CACHE_DISK_ENTRIES,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS proxycurl_cache ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS proxycurl_cache_accessed ON proxycurl_cache(accessed_at)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, created_at: float, response: Any) -> None:
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, max_age: float, decode_as: Any = None) -> Optional[Any]:
+        """The stored response if younger than max_age, decoded into decode_as when given."""
+        decode = loads if decode_as is None else lambda payload: typed_loads(payload, decode_as)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and now - cached[0] < max_age:
+                self._memory.move_to_end(key)
+                return decode(cached[1])
+            db = self._connection()
+            if db is None:
+                return None
+            row = db.execute("SELECT response, created_at FROM proxycurl_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= max_age:
+                return None
+            db.execute("UPDATE proxycurl_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+            self._remember(key, row[1], row[0])
+            return decode(row[0])
+
+    def set(self, key: str, endpoint: str, response: Any) -> None:
+        now = time.time()
+        # Kept serialized so every hit hands out a private copy
+        serialized = json.dumps(response, default=json_default)
+        with self._lock:
+            self._remember(key, now, serialized)
+            db = self._connection()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO proxycurl_cache (key, endpoint, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, serialized, now, now),
+            )
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= 100:
+                self._writes_since_trim = 0
+                db.execute(
+                    "DELETE FROM proxycurl_cache WHERE key IN ("
+                    "SELECT key FROM proxycurl_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM proxycurl_cache")
+                db.commit()
+
+
+def _build_session() -> requests.Session:
+    # GETs are idempotent, so 429 (rate limit) and 5xx responses are retried with backoff
+    retry = Retry(
+        total=PROXYCURL_MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=PROXYCURL_MAX_CONCURRENCY, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class ProxyCurlClient:
+    """Shared ProxyCurl access: one pooled session, a persistent response cache, and coalescing.
+
+    Successful responses are cached under request_key(), so re-adding a known profile within
+    its freshness window costs no API credit. Concurrent calls with the same key share one
+    HTTP request. At most max_concurrency requests are in flight at a time, and requests are
+    started no faster than rate_per_minute.
+    """
+
+    def __init__(
+        self,
+        base_url: str = PROXYCURL_BASE_URL,
+        api_key: Optional[str] = PROXYCURL_API_KEY,
+        cache: Optional[ProxyCurlCache] = None,
+        max_concurrency: int = PROXYCURL_MAX_CONCURRENCY,
+        timeout: float = PROXYCURL_TIMEOUT,
+        rate_per_minute: float = PROXYCURL_RATE_LIMIT_PER_MINUTE,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.cache = cache
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._in_flight_limit = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._bucket = TokenBucket(rate_per_minute)
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'errors': 0}
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = _build_session()
+        return self._session
+
+    def _throttle(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._bucket.wait_time(1, now)
+                if wait <= 0:
+                    self._bucket.consume(1, now)
+                    return
+            time.sleep(wait)
+
+    def _fetch(self, endpoint: str, params: Dict[str, Any]) -> ProxyCurlResponse:
+        headers = {'Authorization': f'Bearer {self.api_key}'}
+        self._throttle()
+        with self._in_flight_limit, metrics.timer('proxycurl_request_seconds', endpoint=endpoint.strip('/')) as timer:
+            response = self._get_session().get(
+                f"{self.base_url}/{endpoint.strip('/')}", params=params, headers=headers, timeout=self.timeout
+            )
+            timer.label(status=response.status_code)
+        with self._lock:
+            self.stats['requests'] += 1
+        # Error bodies keep their plain shape; profiles come out of the decoder as records
+        record_type = RECORD_TYPES.get(endpoint.strip('/')) if response.status_code == 200 else None
+        try:
+            data = decode_response(response, record_type)
+        except ValueError:
+            data = None
+        return ProxyCurlResponse(response.status_code, data, response.text)
+
+    def get(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        max_age: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> ProxyCurlResponse:
+        """GET a ProxyCurl endpoint, from the cache when a fresh enough response is stored.
+
+        max_age defaults to PROXYCURL_CACHE_TTL_SECONDS. Errors are returned (not raised) with
+        their status code, and are never cached.
+        """
+        key = request_key(endpoint, params)
+        max_age = PROXYCURL_CACHE_TTL_SECONDS if max_age is None else max_age
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key, max_age, decode_as=RECORD_TYPES.get(endpoint.strip('/')))
+            if cached is not None:
+                with self._lock:
+                    self.stats['cache_hits'] += 1
+                metrics.increment('proxycurl_cache_total', result='hit')
+                return ProxyCurlResponse(200, cached, '', from_cache=True)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        metrics.increment('proxycurl_cache_total', result='fetched' if owner else 'coalesced')
+        if not owner:
+            return future.result()
+
+        try:
+            response = self._fetch(endpoint, params)
+            if response.ok and self.cache is not None:
+                self.cache.set(key, endpoint, response.data)
+            elif not response.ok:
+                with self._lock:
+                    self.stats['errors'] += 1
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def get_person(self, profile_url: str, extra_params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> ProxyCurlResponse:
+        params = dict(extra_params or {}, linkedin_profile_url=profile_url)
+        return self.get(PERSON_ENDPOINT, params, **kwargs)
+
+    def search_people(self, params: Dict[str, Any], **kwargs: Any) -> ProxyCurlResponse:
+        kwargs.setdefault('max_age', PROXYCURL_SEARCH_TTL_SECONDS)
+        return self.get(SEARCH_ENDPOINT, params, **kwargs)
+
+    def fetch_many(
+        self,
+        endpoint: str,
+        params_list: Iterable[Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[ProxyCurlResponse]:
+        """Run many GETs concurrently (bounded by max_concurrency), results in input order.
+
+        Duplicate requests in the batch, or ones already in flight elsewhere, are sent once.
+        A request that raises (e.g. a connection error) yields a status 0 response.
+        """
+        params_list = list(params_list)
+        if not params_list:
+            return []
+
+        def fetch_one(params: Dict[str, Any]) -> ProxyCurlResponse:
+            try:
+                return self.get(endpoint, params, **kwargs)
+            except requests.RequestException as e:
+                with self._lock:
+                    self.stats['errors'] += 1
+                return ProxyCurlResponse(0, None, str(e))
+
+        with ThreadPoolExecutor(max_workers=min(len(params_list), max_workers or self.max_concurrency)) as pool:
+            return list(pool.map(fetch_one, params_list))
+
+    def fetch_people(self, profile_urls: Iterable[str], extra_params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, ProxyCurlResponse]:
+        """Person profiles for many LinkedIn URLs at once, keyed by the URL as given."""
+        profile_urls = list(profile_urls)
+        params_list = [dict(extra_params or {}, linkedin_profile_url=url) for url in profile_urls]
+        return dict(zip(profile_urls, self.fetch_many(PERSON_ENDPOINT, params_list, **kwargs)))
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+
+proxycurl = ProxyCurlClient(cache=ProxyCurlCache() if PROXYCURL_CACHE_ENABLED else None)
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+QUERY_CACHE_ENABLED = os.getenv('QUERY_CACHE_ENABLED', 'true').lower() == 'true'
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '2048'))
+QUERY_CACHE_MAX_BYTES = int(os.getenv('QUERY_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Timing filters are relative to "now", so even without writes results go stale eventually
+QUERY_CACHE_TTL_SECONDS = float(os.getenv('QUERY_CACHE_TTL_SECONDS', '300'))
+# Rough per-result footprint of a cached result list (the result dict; meta experts are shared)
+_RESULT_ENTRY_BYTES = 250
+_FILTER_FIELDS = ('category', 'value', 'logic', 'timing', 'activeFrom', 'activeTo')
+
+
+def canonical_filter(f: dict) -> Tuple[str, ...]:
+    """A filter reduced to the fields that affect results (no id), with defaults filled in."""
+    values = dict(f, logic=f.get('logic') or 'may_have')
+    return tuple('' if values.get(field) is None else str(values.get(field)) for field in _FILTER_FIELDS)
+
+
+def canonical_filters(filters: Iterable[dict]) -> Tuple[Tuple[str, ...], ...]:
+    """Order-independent form of a filter set: the same filters in any order give the same key."""
+    return tuple(sorted(canonical_filter(f) for f in filters))
+
+
+def estimate_size(value: Any) -> int:
+    if isinstance(value, list):
+        return sys.getsizeof(value) + len(value) * _RESULT_ENTRY_BYTES
+    return sys.getsizeof(value)
+
+
+class QueryResultCache:
+    """LRU cache for filter query results and partial bitmaps, bounded by entries and bytes.
+
+    Entries are tagged with their organization so invalidate_org() can drop all of an
+    organization's results when one of its meta experts (or their tags) changes. Sizes are
+    estimates; the byte budget is what keeps a few huge unfiltered result lists from pushing
+    out many small ones.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        max_bytes: int = QUERY_CACHE_MAX_BYTES,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int, float, Any]]' = OrderedDict()
+        self._keys_by_org: Dict[Any, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, organization_id: Any = None) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds, organization_id)
+            self._keys_by_org.setdefault(organization_id, set()).add(key)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _, organization_id = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._keys_by_org.get(organization_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_org[organization_id]
+
+    def invalidate_org(self, organization_id: Any) -> int:
+        """Drop every cached result and partial of one organization; returns how many."""
+        with self._lock:
+            keys = list(self._keys_by_org.get(organization_id, ()))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_org.clear()
+            self._bytes = 0
+
+    def scope(self, organization_id: Any, token: Hashable) -> 'CacheScope':
+        return CacheScope(self, organization_id, token)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class CacheScope:
+    """Keys namespaced by organization and index state, for partial results inside a query.
+
+    token identifies the exact index contents (see MetaExpertQueryIndex.cache_token), so
+    bitmaps over its ordinals are never reused against a different index.
+    """
+
+    def __init__(self, cache: QueryResultCache, organization_id: Any, token: Hashable):
+        self.cache = cache
+        self.organization_id = organization_id
+        self.token = token
+
+    def get(self, key: Hashable) -> Any:
+        return self.cache.get(('partial', self.organization_id, self.token, key))
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.cache.set(('partial', self.organization_id, self.token, key), value, self.organization_id)
+
+
+query_cache: Optional[QueryResultCache] = QueryResultCache() if QUERY_CACHE_ENABLED else None
+
+
+def invalidate_org_queries(organization_id: Any) -> None:
+    if query_cache is not None:
+        query_cache.invalidate_org(organization_id)
@@ -0,0 +1,620 @@
+import base64
+import bisect
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .job_intervals import FILTER_TIMINGS, OPEN_END, OPEN_START, JobIntervalIndex, job_bounds, timing_end_range, to_epoch
+from .locations import LocationRangeIndex, gazetteer, resolve_expert_location, resolve_job_location
+from .query_cache import CacheScope, canonical_filters, query_cache
+from .records import json_default
+from .roster_cache import get_meta_experts_roster
+from .vector_index import index_meta_experts, score_meta_experts
+
+# MetaExpertFilter.category -> Job field, as in the frontend's matchesJobBasedCategory
+JOB_FIELD_BY_CATEGORY = {
+    'company': 'company',
+    'role': 'role',
+    'seniority': 'seniorityLevel',
+    'location': 'location',
+    'industry': 'industry',
+}
+FILTER_LOGICS = ('must_have', 'cant_have', 'may_have')
+QUERY_PAGE_SIZE = int(os.getenv('QUERY_PAGE_SIZE', '50'))
+
+
+def bitmap_ordinals(bitmap: int) -> np.ndarray:
+    """Positions of the set bits of a Python-int bitmap, ascending."""
+    if bitmap <= 0:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+def ordinals_bitmap(ordinals: Iterable[int]) -> int:
+    """Inverse of bitmap_ordinals, without the quadratic cost of OR-ing bits one at a time."""
+    if not isinstance(ordinals, np.ndarray):
+        ordinals = np.fromiter(ordinals, dtype=np.int64)
+    if not len(ordinals):
+        return 0
+    bits = np.zeros(int(ordinals.max()) + 1, dtype=np.uint8)
+    bits[ordinals] = 1
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def _rank_key(result: Dict[str, Any]) -> Tuple[int, float, str]:
+    """Sort key of a ranked result: most may_have hits, then semantic score, then id."""
+    return -result['mayHaveMatches'], -(result['score'] or 0.0), str(result['metaExpert'].get('id'))
+
+
+def encode_cursor(rank_key: Tuple[int, float, str]) -> str:
+    """Opaque resume token for the result with this rank key (the last one already sent)."""
+    may, score, expert_id = rank_key
+    return base64.urlsafe_b64encode(json.dumps([-may, -score, expert_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, float, str]:
+    try:
+        may, score, expert_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return -int(may), -float(score), str(expert_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _normalize_filters(filters: Iterable[dict]) -> List[dict]:
+    normalized = []
+    for f in filters:
+        category = f.get('category')
+        if category not in JOB_FIELD_BY_CATEGORY or f.get('value') in (None, ''):
+            continue
+        logic = f.get('logic') or 'may_have'
+        if logic not in FILTER_LOGICS:
+            raise ValueError(f"Unknown filter logic: {logic}")
+        timing = f.get('timing') or None
+        if timing is not None and timing not in FILTER_TIMINGS:
+            raise ValueError(f"Unknown filter timing: {timing}")
+        # Optional "held during" window (ISO dates), the README's start-date filter
+        window = None
+        if f.get('activeFrom') or f.get('activeTo'):
+            window = (to_epoch(f.get('activeFrom')), to_epoch(f.get('activeTo')))
+        normalized.append({'category': category, 'value': f['value'], 'logic': logic, 'timing': timing, 'window': window})
+    return normalized
+
+
+class MetaExpertQueryIndex:
+    """Inverted index from (category, job value) to a bitmap of meta experts.
+
+    Meta experts get dense ordinals and each posting is a Python int used as a bitset, so a
+    filter set is evaluated with big-integer AND / AND-NOT / OR instead of a scan over every
+    expert's jobs. Timing and date-window qualified filters use the posting's sorted job
+    intervals (job_intervals), so they cost binary searches rather than date parsing. Semantics
+    follow the frontend filter (FilterResultsPage): within a category every must_have needs a
+    matching job, no cant_have may match, and may_have filters only restrict when they are the
+    category's only filters; categories are ANDed together. Location filters are hierarchical
+    (see locations.py): a region matches every job or home location inside it, in addition to
+    literal job.location equality.
+    """
+
+    def __init__(self, source_version: Any = None):
+        self.source_version = source_version
+        # Bumped on every upsert/remove so cached bitmaps over old ordinals are never reused
+        self.mutations = 0
+        self._lock = threading.RLock()
+        self._ordinal_of: Dict[Any, int] = {}
+        self._experts: List[Optional[dict]] = []
+        self._free: List[int] = []
+        self._live = 0
+        self._postings: Dict[Tuple[str, Any], int] = defaultdict(int)
+        self._intervals = JobIntervalIndex()
+        self._keys_of: Dict[int, List[Tuple[str, Any]]] = {}
+        # (start, end) epochs of each located entry per ordinal (the expert's home location is
+        # open-ended), indexed by gazetteer position so a region filter is one range scan
+        self._located: Dict[int, List[Tuple[int, int]]] = {}
+        self._locations = LocationRangeIndex()
+        # Ids in sorted order and each ordinal's rank among them, for id tie-breaks in paging
+        self._sorted_ids: List[str] = []
+        self._id_rank = np.empty(0, dtype=np.int64)
+        self._ranked_at = None
+
+    def __len__(self) -> int:
+        return len(self._ordinal_of)
+
+    def add_many(self, experts: Iterable[dict]) -> None:
+        """Index many meta experts; into an empty index this is a bulk build.
+
+        The bulk build collects the ordinals of each posting and turns them into a bitmap once,
+        instead of OR-ing one bit at a time into ever larger ints (quadratic in the roster size).
+        """
+        with self._lock:
+            if self._ordinal_of:
+                for expert in experts:
+                    self.upsert(expert)
+                return
+            # Last write of each id wins, in the position of its first occurrence (as with upsert)
+            unique = list({expert['id']: expert for expert in experts if expert.get('id') is not None}.values())
+            if not unique:
+                return
+            self.mutations += 1
+            start = len(self._experts)
+            self._experts.extend([None] * len(unique))
+            members: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
+            jobs = []
+            for ordinal, expert in enumerate(unique, start):
+                for key in self._link(expert, ordinal, jobs):
+                    members[key].append(ordinal)
+            self._intervals.add_many(jobs)
+            for key, ordinals in members.items():
+                self._postings[key] |= ordinals_bitmap(ordinals)
+            self._live |= ((1 << len(unique)) - 1) << start
+
+    def upsert(self, expert: dict) -> None:
+        expert_id = expert.get('id')
+        if expert_id is None:
+            return
+        with self._lock:
+            self.remove(expert_id)
+            self.mutations += 1
+            ordinal = self._free.pop() if self._free else len(self._experts)
+            if ordinal == len(self._experts):
+                self._experts.append(None)
+            bit = 1 << ordinal
+            self._live |= bit
+            jobs = []
+            for key in self._link(expert, ordinal, jobs):
+                self._postings[key] |= bit
+            self._intervals.add_many(jobs)
+
+    def _link(self, expert: dict, ordinal: int, jobs: list) -> List[Tuple[str, Any]]:
+        """Place an expert at ordinal and index its locations.
+
+        Returns its posting keys and appends its (key, ordinal, bounds) job intervals to jobs;
+        setting the posting bits and adding the intervals is left to the caller.
+        """
+        self._experts[ordinal] = expert
+        self._ordinal_of[expert['id']] = ordinal
+        keys = set()
+        located = [(expert.get('locationId') or resolve_expert_location(expert), (OPEN_START, OPEN_END))]
+        for job in expert.get('jobs') or []:
+            bounds = job_bounds(job)
+            located.append((resolve_job_location(job), bounds))
+            for category, field in JOB_FIELD_BY_CATEGORY.items():
+                value = job.get(field)
+                if value in (None, ''):
+                    continue
+                key = (category, value)
+                jobs.append((key, ordinal, bounds))
+                keys.add(key)
+        keys = self._keys_of[ordinal] = list(keys)
+        located = [(node, bounds) for node, bounds in located if node is not None]
+        self._located[ordinal] = [bounds for _, bounds in located]
+        for position, (node, _) in enumerate(located):
+            self._locations.add((ordinal, position), node)
+        return keys
+
+    def remove(self, expert_id: Any) -> bool:
+        with self._lock:
+            ordinal = self._ordinal_of.pop(expert_id, None)
+            if ordinal is None:
+                return False
+            self.mutations += 1
+            mask = ~(1 << ordinal)
+            for key in self._keys_of.pop(ordinal, ()):
+                self._postings[key] &= mask
+                self._intervals.discard(key, ordinal)
+                if not self._postings[key]:
+                    del self._postings[key]
+            for position in range(len(self._located.pop(ordinal, ()))):
+                self._locations.discard((ordinal, position))
+            self._live &= mask
+            self._experts[ordinal] = None
+            self._free.append(ordinal)
+            return True
+
+    def cache_token(self) -> Tuple[Any, int, int]:
+        """Identifies the index contents (and gazetteer) that cached results were computed on."""
+        return self.source_version, self.mutations, gazetteer.version
+
+    def values(self, category: str) -> List[Any]:
+        """Distinct values indexed for a category (what the frontend offers as filter options)."""
+        with self._lock:
+            return sorted((value for cat, value in self._postings if cat == category), key=str)
+
+    def _matching(self, f: dict, now: datetime, within: int) -> int:
+        """Experts among within having a job that matches one filter (value, timing and window)."""
+        region = self._matching_region(f, now, within) if f['category'] == 'location' else 0
+        key = (f['category'], f['value'])
+        posting = self._postings.get(key, 0) & within
+        if posting and (f['timing'] or f['window']):
+            # Timing and window must hold for the same job, so both go to one interval lookup
+            end_range = timing_end_range(f['timing'], now) if f['timing'] else None
+            posting &= ordinals_bitmap(self._intervals.matching(key, end_range=end_range, window=f['window']))
+        return posting | region
+
+    def _matching_region(self, f: dict, now: datetime, within: int) -> int:
+        """Experts located inside the filter's place (e.g. "United States" covers every US city).
+
+        The expert's home location counts as a current, open-ended entry; job locations follow
+        the filter timing and window like any other job match.
+        """
+        node = f['value'] if f['value'] in gazetteer else gazetteer.resolve_text(f['value'])
+        if node is None:
+            return 0
+        entries = self._locations.within(node)
+        if not entries:
+            return 0
+        ordinals = np.fromiter((ordinal for ordinal, _ in entries), dtype=np.int64, count=len(entries))
+        inside = ordinals_bitmap(ordinals) & within
+        if not inside or (not f['timing'] and not f['window']):
+            return inside
+        bounds = np.array([self._located[ordinal][position] for ordinal, position in entries], dtype=np.int64)
+        keep = np.ones(len(entries), dtype=bool)
+        if f['timing']:
+            low, high = timing_end_range(f['timing'], now)
+            if low is not None:
+                keep &= bounds[:, 1] >= low
+            if high is not None:
+                keep &= bounds[:, 1] < high
+        if f['window']:
+            window_start, window_end = f['window']
+            if window_start is not None:
+                keep &= bounds[:, 1] >= window_start
+            if window_end is not None:
+                keep &= bounds[:, 0] <= window_end
+        return ordinals_bitmap(ordinals[keep]) & inside
+
+    def evaluate(
+        self, filters: Iterable[dict], now: Optional[datetime] = None, partials: Optional[CacheScope] = None
+    ) -> Tuple[int, Dict[int, int]]:
+        """Bitmap of meta experts passing the filters, plus may_have hit counts per ordinal.
+
+        With partials (a query_cache scope for this index), the candidate bitmap after each
+        prefix of the time-independent must/cant clauses is cached, so queries sharing those
+        clauses resume from the longest cached prefix instead of re-intersecting postings.
+        """
+        filters = _normalize_filters(filters)
+        now = now or datetime.now(timezone.utc)
+        by_category: Dict[str, List[dict]] = defaultdict(list)
+        for f in filters:
+            by_category[f['category']].append(f)
+        must, cant, may, restricting = [], [], [], []
+        for category_filters in by_category.values():
+            category_must = [f for f in category_filters if f['logic'] == 'must_have']
+            category_cant = [f for f in category_filters if f['logic'] == 'cant_have']
+            category_may = [f for f in category_filters if f['logic'] == 'may_have']
+            must.extend(category_must)
+            cant.extend(category_cant)
+            may.extend(category_may)
+            if category_may and not category_must and not category_cant:
+                restricting.append(category_may)
+
+        # Clauses without timing or window don't depend on "now"; they are applied first, in
+        # canonical order, so their running intersection is a reusable prefix
+        literal = sorted(
+            (f for f in must + cant if f['timing'] is None and f['window'] is None),
+            key=lambda f: (f['logic'] != 'must_have', f['category'], str(f['value'])),
+        )
+        steps = [(f['logic'], f['category'], f['value']) for f in literal]
+        timed_must = [f for f in must if f['timing'] is not None or f['window'] is not None]
+        timed_cant = [f for f in cant if f['timing'] is not None or f['window'] is not None]
+
+        with self._lock:
+            candidates, start = self._live, 0
+            if partials is not None:
+                for length in range(len(steps), 0, -1):
+                    cached = partials.get(tuple(steps[:length]))
+                    if cached is not None:
+                        candidates, start = cached, length
+                        break
+            for position in range(start, len(literal)):
+                f = literal[position]
+                if f['logic'] == 'must_have':
+                    candidates = self._matching(f, now, candidates)
+                else:
+                    candidates &= ~self._matching(f, now, candidates)
+                if partials is not None:
+                    partials.set(tuple(steps[:position + 1]), candidates)
+                if not candidates:
+                    return 0, {}
+
+            # The rest are conjunctions too, so apply the cheap ones first: plain postings
+            # before region lookups, smallest postings first
+            def cost(f):
+                return f['category'] == 'location', bin(self._postings.get((f['category'], f['value']), 0)).count('1')
+
+            for f in sorted(timed_must, key=cost):
+                candidates = self._matching(f, now, candidates)
+                if not candidates:
+                    return 0, {}
+            for f in sorted(timed_cant, key=cost):
+                candidates &= ~self._matching(f, now, candidates)
+            for group in restricting:
+                union = 0
+                for f in group:
+                    union |= self._matching(f, now, candidates)
+                candidates &= union
+
+            may_ordinals = [bitmap_ordinals(self._matching(f, now, candidates)) for f in may]
+        may_ordinals, may_counts = np.unique(np.concatenate(may_ordinals or [np.empty(0, dtype=np.int64)]), return_counts=True)
+        return candidates, dict(zip(may_ordinals.tolist(), may_counts.tolist()))
+
+    def query(
+        self,
+        filters: Iterable[dict],
+        organization_id: Any = None,
+        text: Optional[str] = None,
+        limit: Optional[int] = None,
+        now: Optional[datetime] = None,
+        partials: Optional[CacheScope] = None,
+    ) -> List[Dict[str, Any]]:
+        """Meta experts passing the literal filters, best first.
+
+        Survivors are ranked by how many may_have filters they hit, then, when text is given,
+        by semantic similarity of their tags and jobs (vector_index) computed only over the
+        survivors, then by index order.
+        """
+        candidates, may_hits = self.evaluate(filters, now, partials)
+        with self._lock:
+            ordinals = bitmap_ordinals(candidates).tolist()
+            experts = [self._experts[ordinal] for ordinal in ordinals]
+        semantic: Dict[Any, float] = {}
+        if text and experts:
+            semantic = score_meta_experts(
+                organization_id, text, meta_expert_ids=[expert.get('id') for expert in experts], k=max(1000, 20 * len(experts))
+            )
+        results = [
+            {
+                'metaExpert': expert,
+                'mayHaveMatches': may_hits.get(ordinal, 0),
+                'score': semantic.get(expert.get('id'), 0.0) if text else None,
+            }
+            for ordinal, expert in zip(ordinals, experts)
+        ]
+        results.sort(key=_rank_key)
+        return results[:limit] if limit is not None else results
+
+    def _id_ranks(self) -> Tuple[List[str], np.ndarray]:
+        """Sorted ids and the rank of each ordinal's id, rebuilt after the index changed."""
+        with self._lock:
+            if self._ranked_at != self.mutations:
+                ranked = sorted((str(expert.get('id')), ordinal) for ordinal, expert in enumerate(self._experts) if expert is not None)
+                self._id_rank = np.full(len(self._experts), -1, dtype=np.int64)
+                self._id_rank[[ordinal for _, ordinal in ranked]] = np.arange(len(ranked))
+                self._sorted_ids = [expert_id for expert_id, _ in ranked]
+                self._ranked_at = self.mutations
+            return self._sorted_ids, self._id_rank
+
+    def iter_pages(
+        self,
+        filters: Iterable[dict],
+        organization_id: Any = None,
+        text: Optional[str] = None,
+        page_size: int = QUERY_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        now: Optional[datetime] = None,
+        partials: Optional[CacheScope] = None,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Lazily yield (page, next_cursor) in the same order as query(), starting after cursor.
+
+        Filters and semantic scores are evaluated once into arrays; each page is then the
+        page_size best survivors ranked after the previous page, picked with a partition over
+        the remaining ones rather than a full sort, and only the page's results are built, so
+        the first page does not wait for the rest to be ranked. next_cursor is None on the last
+        page. Cursors hold the rank key of the last result sent, so they stay valid across
+        requests and roster changes.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        candidates, may_hits = self.evaluate(filters, now, partials)
+        sorted_ids, id_rank = self._id_ranks()
+        with self._lock:
+            ordinals = bitmap_ordinals(candidates)
+            # A suspended stream must keep serving the experts it ranked, even if ordinals get reused
+            snapshot = list(self._experts)
+        experts = [snapshot[ordinal] for ordinal in ordinals.tolist()] if text else None
+        mays = np.zeros(len(ordinals), dtype=np.int64)
+        if may_hits:
+            hit = np.fromiter(may_hits.keys(), dtype=np.int64, count=len(may_hits))
+            mays[np.searchsorted(ordinals, hit)] = np.fromiter(may_hits.values(), dtype=np.int64, count=len(may_hits))
+        scores = np.zeros(len(ordinals), dtype=np.float64)
+        if text and experts:
+            semantic = score_meta_experts(
+                organization_id, text, meta_expert_ids=[expert.get('id') for expert in experts], k=max(1000, 20 * len(experts))
+            )
+            scores = np.array([float(semantic.get(expert.get('id'), 0.0)) for expert in experts], dtype=np.float64)
+        # One float per survivor that orders like (mayHaveMatches, score): scores lie in [-1, 1]
+        strength = mays * 4 + scores
+        ranks = id_rank[ordinals]
+
+        after = decode_cursor(cursor) if cursor else None
+        while True:
+            if after is None:
+                remaining = np.arange(len(ordinals))
+            else:
+                # Weaker than the cursor, or equally strong with a later id
+                bound = -after[0] * 4 + -after[1]
+                after_rank = bisect.bisect_right(sorted_ids, after[2]) - 1
+                remaining = np.flatnonzero((strength < bound) | ((strength == bound) & (ranks > after_rank)))
+            if not len(remaining):
+                return
+            if len(remaining) > page_size:
+                # Everything at least as strong as the page_size-th strongest, ties included
+                threshold = np.partition(strength[remaining], len(remaining) - page_size)[len(remaining) - page_size]
+                best = remaining[strength[remaining] >= threshold]
+            else:
+                best = remaining
+            best = best[np.lexsort((ranks[best], -strength[best]))][:page_size]
+            page = [
+                {
+                    'metaExpert': snapshot[ordinal],
+                    'mayHaveMatches': int(mays[position]),
+                    'score': float(scores[position]) if text else None,
+                }
+                for position, ordinal in zip(best.tolist(), ordinals[best].tolist())
+            ]
+            after = _rank_key(page[-1])
+            yield page, (encode_cursor(after) if len(remaining) > len(best) else None)
+            if len(remaining) == len(best):
+                return
+
+
+_org_query_indexes: Dict[Any, MetaExpertQueryIndex] = {}
+_org_query_indexes_lock = threading.Lock()
+# Per-organization build locks and the writes made during a build, as in dedup_index
+_org_query_build_locks: Dict[Any, threading.Lock] = {}
+_org_query_pending_writes: Dict[Any, List[dict]] = {}
+# Rosters are embedded off the query path, one organization at a time
+_roster_embedder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='roster-embedding')
+_roster_embeddings: Dict[Any, Future] = {}
+
+
+def get_org_query_index(organization_id: Any, roster: List[dict], source_version: int) -> MetaExpertQueryIndex:
+    """Return the organization's query index, rebuilding it when its roster content changed.
+
+    The build runs under a lock of its own organization only; an index built from a newer
+    version than the caller's is kept (versions only grow, see roster_cache.RosterSnapshot).
+    """
+    with _org_query_indexes_lock:
+        index = _org_query_indexes.get(organization_id)
+        if index is not None and index.source_version >= source_version:
+            return index
+        build_lock = _org_query_build_locks.setdefault(organization_id, threading.Lock())
+
+    with build_lock:
+        with _org_query_indexes_lock:
+            index = _org_query_indexes.get(organization_id)
+            if index is not None and index.source_version >= source_version:
+                return index
+            _org_query_pending_writes[organization_id] = []
+        index = MetaExpertQueryIndex(source_version=source_version)
+        experts = [expert for expert in roster if expert.get('organization_id') == organization_id]
+        try:
+            index.add_many(experts)
+        except Exception:
+            with _org_query_indexes_lock:
+                del _org_query_pending_writes[organization_id]
+            raise
+        with _org_query_indexes_lock:
+            for expert in _org_query_pending_writes.pop(organization_id):
+                index.upsert(expert)
+            _org_query_indexes[organization_id] = index
+    _embed_roster_in_background(organization_id, experts)
+    return index
+
+
+def _embed_roster_in_background(organization_id: Any, experts: List[dict]) -> None:
+    """Embed the tags and jobs of roster experts the vector index has not seen yet.
+
+    Writes keep the vector index current after that. Until the job finishes, semantic scores
+    only cover the experts embedded so far.
+    """
+    def embed():
+        try:
+            index_meta_experts(organization_id, experts, only_missing=True)
+        except Exception as e:
+            print(f"Embedding the roster of organization {organization_id} failed: {e}")
+
+    with _org_query_indexes_lock:
+        _roster_embeddings[organization_id] = _roster_embedder.submit(embed)
+
+
+def wait_for_roster_embeddings(organization_id: Any, timeout: Optional[float] = None) -> None:
+    """Block until the organization's last background roster embedding has finished."""
+    with _org_query_indexes_lock:
+        job = _roster_embeddings.get(organization_id)
+    if job is not None:
+        job.result(timeout=timeout)
+
+
+def upsert_in_org_query_index(organization_id: Any, expert: dict) -> None:
+    with _org_query_indexes_lock:
+        pending = _org_query_pending_writes.get(organization_id)
+        if pending is not None:
+            pending.append(expert)
+        index = _org_query_indexes.get(organization_id)
+    if index is not None:
+        index.upsert(expert)
+
+
+def clear_org_query_indexes() -> None:
+    with _org_query_indexes_lock:
+        _org_query_indexes.clear()
+
+
+def find_meta_experts(
+    user_email: str,
+    organization_id: Any,
+    filters: Iterable[dict],
+    text: Optional[str] = None,
+    limit: Optional[int] = None,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    """Run a frontend filter set (MetaExpertFilter JSON) against an organization's roster.
+
+    Full result lists are cached (query_cache) under the canonical filter set, so the same
+    filters in another order, with other ids or another limit, are served from the cache
+    until the organization's roster changes or the entry expires.
+    """
+    roster = get_meta_experts_roster(user_email)
+    index = get_org_query_index(organization_id, roster.experts, roster.version_of(organization_id))
+    filters = list(filters)
+    if not use_cache or query_cache is None:
+        return index.query(filters, organization_id=organization_id, text=text, limit=limit)
+    token = index.cache_token()
+    key = ('result', organization_id, token, canonical_filters(filters), text or '')
+    results = query_cache.get(key)
+    if results is None:
+        results = index.query(filters, organization_id=organization_id, text=text, partials=query_cache.scope(organization_id, token))
+        query_cache.set(key, results, organization_id)
+    return results[:limit] if limit is not None else list(results)
+
+
+def iter_meta_expert_pages(
+    user_email: str,
+    organization_id: Any,
+    filters: Iterable[dict],
+    text: Optional[str] = None,
+    page_size: int = QUERY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """Ranked results of a filter set one page at a time (see MetaExpertQueryIndex.iter_pages)."""
+    roster = get_meta_experts_roster(user_email)
+    index = get_org_query_index(organization_id, roster.experts, roster.version_of(organization_id))
+    partials = query_cache.scope(organization_id, index.cache_token()) if query_cache is not None else None
+    yield from index.iter_pages(
+        list(filters), organization_id=organization_id, text=text, page_size=page_size, cursor=cursor, partials=partials
+    )
+
+
+def stream_meta_experts_ndjson(
+    user_email: str,
+    organization_id: Any,
+    filters: Iterable[dict],
+    text: Optional[str] = None,
+    page_size: int = QUERY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Body of a chunked application/x-ndjson response: one line per result, best first.
+
+    Each page is emitted as soon as it is selected, and the last line is {"cursor": ...} to
+    resume from (null when there is nothing left). Any WSGI/ASGI streaming response can
+    wrap it, e.g. StreamingResponse(stream_meta_experts_ndjson(...), media_type='application/x-ndjson').
+    """
+    sent = 0
+    next_cursor = None
+    for page, next_cursor in iter_meta_expert_pages(user_email, organization_id, filters, text, page_size, cursor):
+        if limit is not None and sent + len(page) > limit:
+            # Cut mid-page: resume right after the last result actually sent
+            page = page[:limit - sent]
+            next_cursor = encode_cursor(_rank_key(page[-1])) if page else cursor
+        sent += len(page)
+        yield ''.join(json.dumps(result, default=json_default) + '\n' for result in page).encode()
+        if limit is not None and sent >= limit:
+            break
+    yield (json.dumps({'cursor': next_cursor}) + '\n').encode()
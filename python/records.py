@@ -0,0 +1,226 @@
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Marks a field that was absent from the source dict (as opposed to present with None),
+# so to_dict() gives back exactly the keys it was built from.
+_MISSING = object()
+
+
+def intern_value(value: Any) -> Any:
+    """Share one string object per distinct categorical value (company, industry, ...)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(MutableMapping):
+    """Dict-compatible record with __slots__ storage for a fixed set of camelCase keys.
+
+    A plain dict pays for a hash table and a pointer per key on every instance; a record keeps
+    one slot per known field and interns the categorical ones, so a large roster shares a single
+    copy of each company or seniority string. Keys outside FIELDS go to a per-record overflow
+    dict (None until used), so to_dict(from_dict(d)) == d for any input, key order aside.
+    Records read and write like dicts (get, [], in, items, dict(record)) and can be passed
+    wherever the pipeline expects one; convert with to_dict()/as_plain() before JSON encoding.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: frozenset = frozenset()
+    # Fields holding lists of nested records, as {field: record class}
+    NESTED: Dict[str, type] = {}
+    _FIELD_SET: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, data: Optional[dict] = None, **fields: Any):
+        self._extra: Optional[Dict[str, Any]] = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Record':
+        # Inlined __setitem__: this runs once per roster entry and job on every full roster load
+        record = cls.__new__(cls)
+        record._extra = None
+        fields, interned = cls._FIELD_SET, cls.INTERNED
+        for key, value in data.items():
+            if key in fields:
+                setattr(record, key, sys.intern(value) if key in interned and type(value) is str else value)
+            else:
+                if record._extra is None:
+                    record._extra = {}
+                record._extra[key] = value
+        for field, record_class in cls.NESTED.items():
+            items = getattr(record, field, None)
+            if isinstance(items, list):
+                setattr(record, field, [record_class.from_dict(item) if isinstance(item, dict) else item for item in items])
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: as_plain(value) for key, value in self.items()}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._FIELD_SET:
+            setattr(self, key, intern_value(value) if key in self.INTERNED else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._FIELD_SET:
+            if getattr(self, key, _MISSING) is _MISSING:
+                raise KeyError(key)
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._FIELD_SET:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def copy(self) -> 'Record':
+        return type(self)(self)
+
+    def __repr__(self) -> str:
+        # Reads like the equivalent dict in prompts and logs (keys in FIELDS order, then extras)
+        return repr(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            # Slot by slot, without building either dict; nested records recurse the same way
+            if (self._extra or None) != (other._extra or None):
+                return False
+            return all(getattr(self, field, _MISSING) == getattr(other, field, _MISSING) for field in self.FIELDS)
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == as_plain(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+
+class Tag(Record):
+    FIELDS = ('id', 'tag', 'metaExpertId')
+    __slots__ = FIELDS
+    INTERNED = frozenset({'tag'})
+
+
+class Job(Record):
+    FIELDS = (
+        'id', 'role', 'company', 'projectId', 'industry', 'description', 'location', 'locationId',
+        'isEducation', 'startDate', 'endDate', 'expertId', 'metaExpertId', 'seniorityLevel',
+    )
+    __slots__ = FIELDS
+    # Dates are month-granular ProxyCurl dates, so they repeat as much as the categories do
+    INTERNED = frozenset({
+        'role', 'company', 'projectId', 'industry', 'location', 'locationId', 'seniorityLevel', 'startDate', 'endDate',
+    })
+
+
+class MetaExpert(Record):
+    FIELDS = (
+        'id', 'name', 'organizationID', 'profession', 'company', 'description', 'geography',
+        'locationId', 'linkedInLink', 'linkedinlink', 'fraudFlag', 'profilePictureLink', 'email',
+        'phone', 'strikes', 'linkedInCreationDate', 'linkedInConnectionCount', 'jobs', 'tags',
+    )
+    __slots__ = FIELDS
+    INTERNED = frozenset({'organizationID', 'profession', 'company', 'geography', 'locationId'})
+    NESTED = {'jobs': Job, 'tags': Tag}
+
+
+class Experience(Record):
+    FIELDS = (
+        'starts_at', 'ends_at', 'company', 'company_linkedin_profile_url', 'company_facebook_profile_url',
+        'title', 'description', 'location', 'logo_url',
+    )
+    __slots__ = FIELDS
+    INTERNED = frozenset({'company', 'company_linkedin_profile_url', 'title', 'location', 'logo_url'})
+
+
+class Education(Record):
+    FIELDS = (
+        'starts_at', 'ends_at', 'field_of_study', 'degree_name', 'school', 'school_linkedin_profile_url',
+        'school_facebook_profile_url', 'description', 'logo_url', 'grade', 'activities_and_societies',
+    )
+    __slots__ = FIELDS
+    INTERNED = frozenset({'field_of_study', 'degree_name', 'school', 'school_linkedin_profile_url', 'logo_url'})
+
+
+class Profile(Record):
+    """A ProxyCurl person profile (api/v2/linkedin)."""
+
+    FIELDS = (
+        'public_identifier', 'profile_pic_url', 'background_cover_image_url', 'first_name', 'last_name',
+        'full_name', 'follower_count', 'connections', 'occupation', 'headline', 'summary', 'country',
+        'country_full_name', 'city', 'state', 'industry', 'experiences', 'education', 'languages', 'skills',
+        'personal_emails', 'personal_numbers', 'inferred_salary', 'gender', 'birth_date', 'extra',
+        'github_profile_id', 'facebook_profile_id', 'twitter_profile_id',
+    )
+    __slots__ = FIELDS
+    INTERNED = frozenset({'country', 'country_full_name', 'city', 'state', 'industry'})
+    NESTED = {'experiences': Experience, 'education': Education}
+
+
+def as_plain(value: Any) -> Any:
+    """Recursively turn records (inside dicts and lists too) back into plain dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: as_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [as_plain(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default= hook: records become dicts, anything else its str()."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    return str(value)
+
+
+def compact_meta_experts(experts: List[dict]) -> List[MetaExpert]:
+    return [expert if isinstance(expert, MetaExpert) else MetaExpert.from_dict(expert) for expert in experts]
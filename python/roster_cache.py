@@ -0,0 +1,267 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypedDict
+
+from .backend_interaction import get_from_backend
+from .dedup_index import set_organization_key
+from .metrics import metrics
+from .records import MetaExpert
+
+ROSTER_CACHE_TTL_SECONDS = float(os.getenv('ROSTER_CACHE_TTL_SECONDS', '300'))
+ROSTER_CACHE_MAX_ENTRIES = int(os.getenv('ROSTER_CACHE_MAX_ENTRIES', '64'))
+# When enabled, expired rosters are refreshed with meta-experts/{email}?updatedSince=... instead
+# of downloading the whole roster again. Requires backend support for the query parameter.
+ROSTER_DELTA_SYNC = os.getenv('ROSTER_DELTA_SYNC', 'false').lower() == 'true'
+# Keep cached rosters as __slots__ MetaExpert/Job/Tag records (see records.py) instead of the
+# decoded JSON dicts; they read like dicts but take a fraction of the memory on large rosters.
+# Set to false to cache the plain dicts, e.g. for code that needs isinstance(expert, dict).
+ROSTER_COMPACT_RECORDS = os.getenv('ROSTER_COMPACT_RECORDS', 'true').lower() == 'true'
+
+_versions = itertools.count(1)
+
+
+class RosterPayload(TypedDict, total=False):
+    """meta-experts/{email} reply with its experts decoded straight into compact records."""
+
+    metaExperts: List[MetaExpert]
+    deletedIds: List[Any]
+
+
+def _fetch_roster(path: str) -> dict:
+    return get_from_backend(path=path, decode_as=RosterPayload if ROSTER_COMPACT_RECORDS else None)
+
+
+def _stored(expert: dict) -> dict:
+    if ROSTER_COMPACT_RECORDS and not isinstance(expert, MetaExpert):
+        return MetaExpert.from_dict(expert)
+    return expert
+
+
+def _expert_key(expert: dict) -> Any:
+    return expert.get('id') or id(expert)
+
+
+class RosterSnapshot(NamedTuple):
+    experts: List[dict]
+    # organization_id -> content version this roster was fetched at. An organization's version
+    # changes only when a fetch or delta sync brings content for it that differs from what the
+    # cache held (writes callers made themselves do not count), and versions only grow, so derived
+    # per-organization structures can keep an index built from a newer version than the caller's.
+    versions: Dict[Any, int]
+
+    def version_of(self, organization_id: Any) -> int:
+        return self.versions.get(organization_id, 0)
+
+
+class _OrgContent:
+    """The latest known meta experts of one organization, shared by every user's roster."""
+
+    __slots__ = ('version', 'experts')
+
+    def __init__(self, experts: Dict[Any, dict]):
+        self.version = next(_versions)
+        self.experts = experts
+
+
+class _RosterEntry:
+    __slots__ = ('experts', 'orgs', 'versions', 'fetched_at', 'synced_since', '_list')
+
+    def __init__(self, experts: List[dict], versions: Dict[Any, int], synced_since: str):
+        self.experts: Dict[Any, dict] = OrderedDict((_expert_key(expert), expert) for expert in experts)
+        self.orgs = {expert.get('organization_id') for expert in experts}
+        self.versions = versions
+        self.fetched_at = time.monotonic()
+        self.synced_since = synced_since
+        self._list: Optional[List[dict]] = None
+
+    def as_list(self) -> List[dict]:
+        if self._list is None:
+            self._list = list(self.experts.values())
+        return self._list
+
+    def upsert(self, expert: dict) -> None:
+        self.experts[_expert_key(expert)] = expert
+        self.orgs.add(expert.get('organization_id'))
+        self._list = None
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RosterCache:
+    """In-process cache of each user's meta-experts roster.
+
+    Entries expire after ttl_seconds and the least recently used user is evicted once
+    max_entries is exceeded. Writes tag_expert already makes to the backend are applied to the
+    cached roster in place, so back-to-back tagging does not re-download it. Content is also
+    tracked per organization across users (see RosterSnapshot.versions): a refetch that
+    returns what the cache already holds reuses the held records and keeps their version.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = ROSTER_CACHE_TTL_SECONDS,
+        max_entries: int = ROSTER_CACHE_MAX_ENTRIES,
+        delta_sync: bool = ROSTER_DELTA_SYNC,
+        fetch: Callable[[str], dict] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.delta_sync = delta_sync
+        self._fetch = fetch or _fetch_roster
+        self._entries: 'OrderedDict[str, _RosterEntry]' = OrderedDict()
+        self._orgs: Dict[Any, _OrgContent] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.delta_refreshes = 0
+
+    def get_roster(self, user_email: str) -> RosterSnapshot:
+        with metrics.timer('roster_fetch_seconds') as timer:
+            return self._get_roster(user_email, timer)
+
+    def _snapshot(self, entry: _RosterEntry) -> RosterSnapshot:
+        return RosterSnapshot(entry.as_list(), dict(entry.versions))
+
+    def _get_roster(self, user_email: str, timer) -> RosterSnapshot:
+        with self._lock:
+            entry = self._entries.get(user_email)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.ttl_seconds:
+                self._entries.move_to_end(user_email)
+                self.hits += 1
+                timer.label(result='hit')
+                return self._snapshot(entry)
+            self.misses += 1
+
+        # Network calls happen outside the lock so one slow roster does not block other users
+        if entry is not None and self.delta_sync:
+            try:
+                snapshot = self._refresh_delta(user_email, entry)
+                timer.label(result='delta')
+                return snapshot
+            except Exception as e:
+                print(f"Delta roster refresh failed, fetching full roster: {e}")
+
+        timer.label(result='full')
+        synced_since = _utc_now_iso()
+        response = self._fetch(f'meta-experts/{user_email}') or {}
+        experts, versions = self._merge_full(response.get('metaExperts', []))
+        entry = _RosterEntry(experts, versions, synced_since)
+        with self._lock:
+            self._entries[user_email] = entry
+            self._entries.move_to_end(user_email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._forget_unused_orgs()
+            return self._snapshot(entry)
+
+    def _merge_full(self, fetched: List[dict]) -> Tuple[List[dict], Dict[Any, int]]:
+        """Reconcile a full roster with the known organization contents.
+
+        Returns the experts to store and the version of each of their organizations.
+
+        Organizations whose experts are unchanged keep their version and the records already
+        held (so users of one organization share them); the others get a new version.
+        """
+        stored = [_stored(expert) for expert in fetched]
+        by_org: Dict[Any, Dict[Any, dict]] = {}
+        for expert in stored:
+            by_org.setdefault(expert.get('organization_id'), {})[_expert_key(expert)] = expert
+        with self._lock:
+            known = {org: self._orgs.get(org) for org in by_org}
+        # Compared outside the lock: equal rosters are the common case and cost a full walk
+        unchanged = {org for org, experts in by_org.items() if known[org] is not None and known[org].experts == experts}
+        versions = {}
+        with self._lock:
+            for org, experts in by_org.items():
+                current = self._orgs.get(org)
+                if org in unchanged and current is known[org]:
+                    by_org[org] = current.experts
+                else:
+                    current = self._orgs[org] = _OrgContent(experts)
+                versions[org] = current.version
+        held = {key: expert for experts in by_org.values() for key, expert in experts.items()}
+        return [held[_expert_key(expert)] for expert in stored], versions
+
+    def _forget_unused_orgs(self) -> None:
+        used = set().union(*(entry.orgs for entry in self._entries.values()))
+        for org in [org for org in self._orgs if org not in used]:
+            del self._orgs[org]
+
+    def _refresh_delta(self, user_email: str, entry: _RosterEntry) -> RosterSnapshot:
+        synced_since = _utc_now_iso()
+        response = self._fetch(f'meta-experts/{user_email}?updatedSince={entry.synced_since}')
+        if not isinstance(response, dict) or 'metaExperts' not in response:
+            raise ValueError("unexpected delta response")
+        with self._lock:
+            changed = set()
+            for expert in response.get('metaExperts', []):
+                expert = _stored(expert)
+                key = _expert_key(expert)
+                org = expert.get('organization_id')
+                if entry.experts.get(key) != expert:
+                    changed.add(org)
+                entry.upsert(expert)
+                self._org_content(org).experts[key] = expert
+            for expert_id in response.get('deletedIds', []):
+                removed = entry.experts.pop(expert_id, None)
+                if removed is not None:
+                    org = removed.get('organization_id')
+                    self._org_content(org).experts.pop(expert_id, None)
+                    changed.add(org)
+                    entry._list = None
+            for org in changed:
+                self._orgs[org].version = next(_versions)
+            for org in entry.orgs:
+                if org in self._orgs:
+                    entry.versions[org] = self._orgs[org].version
+            entry.fetched_at = time.monotonic()
+            entry.synced_since = synced_since
+            self.delta_refreshes += 1
+            self._entries[user_email] = entry
+            self._entries.move_to_end(user_email)
+            return self._snapshot(entry)
+
+    def _org_content(self, org: Any) -> _OrgContent:
+        content = self._orgs.get(org)
+        if content is None:
+            content = self._orgs[org] = _OrgContent({})
+        return content
+
+    def upsert(self, user_email: str, expert: dict) -> None:
+        """Apply a meta expert that was just created or updated in the backend.
+
+        The organization's version is left as is: the caller updates the derived indexes itself.
+        """
+        expert = _stored(expert)
+        with self._lock:
+            entry = self._entries.get(user_email)
+            if entry is not None:
+                entry.upsert(expert)
+            content = self._orgs.get(expert.get('organization_id'))
+            if content is not None:
+                content.experts[_expert_key(expert)] = expert
+
+    def invalidate(self, user_email: Optional[str] = None) -> None:
+        with self._lock:
+            if user_email is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_email, None)
+            self._forget_unused_orgs()
+
+
+roster_cache = RosterCache()
+
+
+def get_meta_experts_roster(user_email: str) -> RosterSnapshot:
+    return roster_cache.get_roster(user_email)
+
+
+def record_meta_expert_write(user_email: str, expert: dict, organization_id: Any = None) -> None:
+    roster_cache.upsert(user_email, set_organization_key(expert, organization_id))
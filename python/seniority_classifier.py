@@ -0,0 +1,229 @@
+import re
+import threading
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from .constants import SENIORITY_LEVELS
+
+SENIORITY_CONFIDENCE_THRESHOLD = 0.75
+# Confidence given to a rule match the rest of the title contradicts, so it goes to the LLM
+AMBIGUOUS_CONFIDENCE = 0.5
+
+# (label, confidence, pattern), checked in order against the title's head phrase (see
+# _head_phrase); the first match wins. Roles that carry a seniority wherever they sit in the
+# head ("Student Success Manager") come first; Owner, C-Suite abbreviations and trainee words
+# only count as the head noun itself, so "Product Owner" and "CEO Office Coordinator" do not
+# match them. "staff" and "lead" are seniority only in front of an individual-contributor role.
+_RULES: List[Tuple[str, float, str]] = [
+    ("Vice-President", 0.95, r"\b(vice[\s-]*president|s?vp|evp|avp)\b"),
+    ("Director", 0.9, r"\b(director|directeur|directora?)\b"),
+    ("Director", 0.8, r"^head$"),
+    ("Manager", 0.85, r"\b(manager|supervisor|team lead|team leader|gerente)\b"),
+    ("Partner", 0.9, r"^((managing|senior|general|equity|founding|salaried)\s+)?partner$"),
+    ("Owner", 0.85, r"^((business|sole|company)\s+)?(co[\s-]?)?(owner|founder|proprietor)\b|^self[\s-]employed\b"),
+    ("C-Suite", 0.95, r"^c[eotfmior]o\b(?!\s+\w)|\bchief\b.*\bofficer\b"),
+    ("C-Suite", 0.85, r"^(president|chairman|chairwoman|chairperson)\b"),
+    ("Trainee", 0.9, r"^(apprentice|trainee|working student)\b|\b(intern|internship|trainee|apprentice|student)$"),
+    ("Senior", 0.85, r"\b(senior|sr\.?|principal)\b"
+                    r"|\b(staff|lead)\s+(engineer|designer|developer|scientist|architect|consultant|researcher|analyst)\b"),
+    ("Trainee", 0.75, r"\b(graduate|fellow|research assistant|teaching assistant)\b"),
+    ("Entry", 0.8, r"\b(junior|jr\.?|entry[\s-]level|associate|assistant|coordinator)\b"),
+    ("Entry", 0.6, r"\b(analyst|specialist|representative|engineer|developer|consultant)\b"),
+]
+_COMPILED_RULES = [(label, confidence, re.compile(pattern, re.IGNORECASE)) for label, confidence, pattern in _RULES]
+
+# Labels a role word in the head decides on its own, whatever else the title mentions
+_HEAD_LABELS = frozenset({"Vice-President", "Director", "Manager", "Partner"})
+# Keywords that name a seniority by themselves; found anywhere in the title they contradict a
+# different label from the head ("CEO Office Coordinator", "President of Student Council")
+_CONFLICTS: List[Tuple[str, FrozenSet[str], re.Pattern]] = [
+    ("C-Suite", frozenset({"Senior", "Entry", "Trainee"}),
+     re.compile(r"\b(c[eotfmior]o|chief|president|chairman)\b", re.IGNORECASE)),
+    ("Owner", frozenset({"Senior", "Entry", "Trainee"}), re.compile(r"\b(owner|founder|proprietor)\b", re.IGNORECASE)),
+    ("Trainee", frozenset({"C-Suite", "Owner", "Senior", "Entry"}),
+     re.compile(r"\b(intern|internship|trainee|apprentice|student)\b", re.IGNORECASE)),
+]
+# The first of several titles ("Partner, Deloitte", "CTO | Advisor", "Analyst at Acme")
+_SEGMENT_SEPARATOR = re.compile(r"\s*(?:,|\||/|\s[-\u2013\u2014]\s|\s@\s|\sat\s)\s*", re.IGNORECASE)
+# The complement of the head ("Director of Student Affairs", "Head of Marketing")
+_COMPLEMENT = re.compile(r"\s+(?:of|for|to|in|on)\s+", re.IGNORECASE)
+
+
+def _head_phrase(title: str) -> str:
+    """The part of a title that names the role: its first segment, without any complement."""
+    segment = _SEGMENT_SEPARATOR.split(title.strip(), maxsplit=1)[0]
+    return _COMPLEMENT.split(segment, maxsplit=1)[0].strip()
+
+
+class SeniorityClassifier:
+    """Local title -> seniority classifier that runs before the LLM.
+
+    Titles matched with confidence at or above threshold are labelled locally; the rest are
+    escalated to the LLM. An optional model callable (title -> (label, confidence)) is consulted
+    when no rule matches, e.g. a small trained classifier.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SENIORITY_CONFIDENCE_THRESHOLD,
+        model: Optional[Callable[[str], Tuple[Optional[str], float]]] = None,
+    ):
+        self.threshold = threshold
+        self.model = model
+        self._lock = threading.Lock()
+        self.classified = 0
+        self.bypassed = 0
+
+    def predict(self, title: Optional[str]) -> Tuple[Optional[str], float]:
+        """Best label and confidence for a job title; (None, 0.0) when nothing matches."""
+        if not title:
+            return None, 0.0
+        head = _head_phrase(title)
+        for label, confidence, pattern in _COMPILED_RULES:
+            if pattern.search(head):
+                if label not in _HEAD_LABELS and any(
+                    other != label and label in contradicts and keywords.search(title)
+                    for other, contradicts, keywords in _CONFLICTS
+                ):
+                    confidence = min(confidence, AMBIGUOUS_CONFIDENCE)
+                return label, confidence
+        if self.model is not None:
+            label, confidence = self.model(title)
+            if label in SENIORITY_LEVELS:
+                return label, confidence
+        return None, 0.0
+
+    def classify_job(self, job: dict) -> Optional[str]:
+        """Label for a job if the local stage is confident enough, otherwise None (escalate)."""
+        label, confidence = (None, 0.0) if job.get('isEducation') else self.predict(job.get('role'))
+        confident = label is not None and confidence >= self.threshold
+        with self._lock:
+            self.classified += 1
+            if confident:
+                self.bypassed += 1
+        return label if confident else None
+
+    def bypass_rate(self) -> float:
+        """Fraction of jobs seen so far that were labelled without the LLM."""
+        with self._lock:
+            return self._bypass_rate()
+
+    def _bypass_rate(self) -> float:
+        return self.bypassed / self.classified if self.classified else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'classified': self.classified,
+                'bypassed': self.bypassed,
+                'escalated': self.classified - self.bypassed,
+                'bypass_rate': self._bypass_rate(),
+            }
+
+
+seniority_classifier = SeniorityClassifier()
+
+
+# Hand-labelled titles used to track the local classifier's accuracy as rules change
+SENIORITY_BENCHMARK: List[Tuple[str, str]] = [
+    ("Owner", "Owner"),
+    ("Founder", "Owner"),
+    ("Co-Founder & CEO", "Owner"),
+    ("Business Owner", "Owner"),
+    ("Self-employed Consultant", "Owner"),
+    ("Managing Partner", "Partner"),
+    ("Partner", "Partner"),
+    ("Senior Partner", "Partner"),
+    ("Equity Partner", "Partner"),
+    ("General Partner", "Partner"),
+    ("CEO", "C-Suite"),
+    ("Chief Executive Officer", "C-Suite"),
+    ("CFO", "C-Suite"),
+    ("Chief Technology Officer", "C-Suite"),
+    ("Chief Marketing Officer", "C-Suite"),
+    ("COO", "C-Suite"),
+    ("President", "C-Suite"),
+    ("Chairman of the Board", "C-Suite"),
+    ("VP Sales", "Vice-President"),
+    ("Vice President, Engineering", "Vice-President"),
+    ("Senior Vice President of Operations", "Vice-President"),
+    ("SVP Finance", "Vice-President"),
+    ("EVP, Strategy", "Vice-President"),
+    ("Director of Engineering", "Director"),
+    ("Senior Director, Product", "Director"),
+    ("Managing Director", "Director"),
+    ("Head of Marketing", "Director"),
+    ("Director of Partnerships", "Director"),
+    ("Engineering Manager", "Manager"),
+    ("Senior Manager, Supply Chain", "Manager"),
+    ("Product Manager", "Manager"),
+    ("Operations Supervisor", "Manager"),
+    ("Team Lead, Customer Support", "Manager"),
+    ("Partner Manager", "Manager"),
+    ("Senior Software Engineer", "Senior"),
+    ("Sr. Data Scientist", "Senior"),
+    ("Principal Consultant", "Senior"),
+    ("Staff Engineer", "Senior"),
+    ("Lead Designer", "Senior"),
+    ("Senior Associate", "Senior"),
+    ("Junior Developer", "Entry"),
+    ("Associate", "Entry"),
+    ("Analyst", "Entry"),
+    ("Marketing Coordinator", "Entry"),
+    ("Sales Representative", "Entry"),
+    ("Software Engineer", "Entry"),
+    ("Executive Assistant", "Entry"),
+    ("Research Analyst", "Entry"),
+    ("Software Engineering Intern", "Trainee"),
+    ("Summer Intern", "Trainee"),
+    ("Management Trainee", "Trainee"),
+    ("Apprentice Electrician", "Trainee"),
+    ("Graduate Student", "Trainee"),
+    ("Teaching Assistant", "Trainee"),
+    ("Internal Auditor", "Entry"),
+    ("Board Member", "C-Suite"),
+    ("Consultant", "Entry"),
+    ("Account Executive", "Entry"),
+    # Role words used as modifiers; these must not take the modifier's label
+    ("Product Owner", "Senior"),
+    ("Director of Student Affairs", "Director"),
+    ("Student Success Manager", "Manager"),
+    ("Internship Program Manager", "Manager"),
+    ("President of Student Council", "Trainee"),
+    ("Founder Relations Manager", "Manager"),
+    ("CEO Office Coordinator", "Entry"),
+    ("Chief of Staff", "Director"),
+    ("Staff Accountant", "Entry"),
+    ("Lead Generation Specialist", "Entry"),
+    ("Partner Marketing Lead", "Senior"),
+    ("Intern Coordinator", "Entry"),
+    ("Student Ambassador", "Trainee"),
+    ("President & CEO", "C-Suite"),
+    ("Partner, Deloitte", "Partner"),
+    ("Data Scientist at Google", "Entry"),
+]
+
+
+def evaluate_seniority_classifier(
+    classifier: Optional[SeniorityClassifier] = None,
+    benchmark: List[Tuple[str, str]] = SENIORITY_BENCHMARK,
+) -> Dict[str, float]:
+    """Coverage (share of titles handled locally) and accuracy on the labelled benchmark set."""
+    classifier = classifier or SeniorityClassifier()
+    covered = correct = 0
+    misses = []
+    for title, expected in benchmark:
+        label, confidence = classifier.predict(title)
+        if label is None or confidence < classifier.threshold:
+            continue
+        covered += 1
+        if label == expected:
+            correct += 1
+        else:
+            misses.append((title, expected, label))
+    for title, expected, label in misses:
+        print(f"seniority benchmark miss: {title!r} expected {expected}, got {label}")
+    return {
+        'titles': len(benchmark),
+        'coverage': covered / len(benchmark) if benchmark else 0.0,
+        'accuracy': correct / covered if covered else 0.0,
+    }
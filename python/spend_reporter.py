@@ -0,0 +1,143 @@
+import atexit
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pytz
+
+from .constants import constants
+from .backend_interaction import BackendBatch, BackendBatchError
+
+SPEND_PER_1K_TOKENS = 0.00250
+SPEND_FLUSH_SIZE = int(os.getenv('SPEND_FLUSH_SIZE', '50'))
+SPEND_FLUSH_INTERVAL_SECONDS = float(os.getenv('SPEND_FLUSH_INTERVAL_SECONDS', '5'))
+# Records kept for retry when the backend is unreachable or rejects a batch; older ones are dropped beyond this
+SPEND_MAX_BUFFERED = int(os.getenv('SPEND_MAX_BUFFERED', '10000'))
+
+
+def post_spend_records(records: List[dict]) -> None:
+    """POST each record to /spend on its own, as the endpoint expects, over the pooled session.
+
+    Raises BackendBatchError listing (path, record) for the POSTs that failed.
+    """
+    # Room for every record, so they all go out in the one flush below
+    batch = BackendBatch(max_items=len(records) + 1)
+    for record in records:
+        batch.add('spend', record)
+    batch.flush()
+
+
+class SpendReporter:
+    """Buffers LLM spend records and posts them to the backend from a worker thread.
+
+    record() only appends to an in-memory buffer, so LLM calls no longer wait on a spend POST.
+    The worker flushes when flush_size records are pending or flush_interval seconds have
+    passed, and close() (registered at exit) flushes whatever is left. A flush still POSTs one
+    record per request (see post_spend_records); only records whose POST failed are retried.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = SPEND_FLUSH_SIZE,
+        flush_interval: float = SPEND_FLUSH_INTERVAL_SECONDS,
+        send: Optional[Callable[[List[dict]], object]] = None,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._send = send or post_spend_records
+        self._buffer: List[dict] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'spend': 0.0}
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='spend-reporter', daemon=True)
+            self._worker.start()
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int) -> dict:
+        tokens_used = (prompt_tokens or 0) + (completion_tokens or 0)
+        spend = {
+            "id": str(uuid.uuid4()),
+            "transactionDate": datetime.now(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "model": model,
+            "spend": tokens_used * SPEND_PER_1K_TOKENS / 1000,
+            "promptTokens": prompt_tokens or 0,
+            "completionTokens": completion_tokens or 0,
+        }
+        spend['sourceEmailId'] = constants.get('SOURCING_ID')
+        spend['testId'] = constants.get('TEST_ID')
+
+        with self._condition:
+            totals = self._totals[model]
+            totals['requests'] += 1
+            totals['prompt_tokens'] += spend['promptTokens']
+            totals['completion_tokens'] += spend['completionTokens']
+            totals['spend'] += spend['spend']
+            self._buffer.append(spend)
+            if len(self._buffer) >= self.flush_size:
+                self._condition.notify()
+            if not self._closed:
+                self._ensure_worker()
+        return spend
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._closed and len(self._buffer) < self.flush_size:
+                    self._condition.wait(timeout=self.flush_interval)
+                if self._closed:
+                    # close() sends the remainder from its own thread
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        """Send every buffered record now; returns how many were sent."""
+        with self._flush_lock:
+            with self._condition:
+                records, self._buffer = self._buffer, []
+            if not records:
+                return 0
+            try:
+                self._send(records)
+                return len(records)
+            except Exception as e:
+                failed = [record for _, record in e.failed] if isinstance(e, BackendBatchError) else records
+                print(f"Error sending {len(failed)}/{len(records)} spend records, will retry: {e}")
+                with self._condition:
+                    self._buffer = (failed + self._buffer)[-SPEND_MAX_BUFFERED:]
+                return len(records) - len(failed)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate spend and token counts per model since process start."""
+        with self._condition:
+            return {model: dict(values) for model, values in self._totals.items()}
+
+    def total_spend(self) -> float:
+        with self._condition:
+            return sum(values['spend'] for values in self._totals.values())
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._buffer)
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout=timeout)
+        self.flush()
+
+
+spend_reporter = SpendReporter()
+atexit.register(spend_reporter.close)
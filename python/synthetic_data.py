@@ -0,0 +1,286 @@
+"""Synthetic meta-expert rosters for benchmarks and load tests.
+
+Modeled on the frontend fixtures (frontend/src/utils/sample_data/sampleMetaExpertsData.ts):
+the same name, company, seniority and education pools and job history shape, but deterministic
+per seed and scalable to any roster size. On top of the fixtures it plants the cases dedup has
+to handle: near-duplicate names, emails shared by two records and copied job histories.
+"""
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+FIRST_NAMES = [
+    "James", "Emma", "Michael", "Olivia", "William", "Sophia", "Alexander", "Isabella", "Daniel",
+    "Ava", "David", "Mia", "Joseph", "Charlotte", "Matthew", "Amelia", "Andrew", "Harper",
+    "Benjamin", "Evelyn", "Samuel", "Abigail", "Christopher", "Emily", "John", "Elizabeth",
+    "Lucas", "Sofia", "Henry", "Avery", "Sebastian", "Ella", "Jack", "Scarlett", "Owen",
+    "Victoria", "Dylan", "Madison", "Luke", "Luna", "Gabriel", "Grace", "Anthony", "Chloe",
+    "Isaac", "Penelope", "Julian", "Layla", "Levi", "Riley", "Aaron", "Zoey", "Oliver", "Nora",
+    "Thomas", "Lily", "Ryan", "Eleanor", "Nathan", "Hannah", "Charles", "Lillian", "Caleb",
+    "Addison", "Austin", "Aubrey", "Adam", "Ellie", "Ian", "Stella", "Jonathan", "Natalie", "Zoe",
+    "Connor", "Leah", "Joshua", "Hazel", "Justin", "Violet", "Robert", "Aurora", "Nicholas",
+    "Savannah", "Jordan", "Audrey", "Brandon", "Brooklyn", "Christian", "Bella", "Kevin",
+    "Claire", "Brian", "Lucy", "Jose", "Anna", "Jason", "Caroline", "Timothy", "Nova", "Sean",
+    "Genesis", "Kennedy", "Eric", "Sarah", "Stephen", "Aaliyah", "Tyler", "Alice", "Jeffrey",
+    "Madelyn", "Marcus", "Eva",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+    "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+    "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez",
+    "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King", "Wright",
+    "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green", "Adams", "Nelson", "Baker", "Hall",
+    "Rivera", "Campbell", "Mitchell", "Carter", "Roberts", "Chen", "Phillips", "Evans", "Turner",
+    "Diaz", "Parker", "Cruz", "Edwards", "Collins", "Stewart", "Morris", "Morales", "Murphy",
+    "Cook", "Rogers", "Ortiz", "Morgan", "Cooper", "Peterson", "Bailey", "Reed", "Kelly",
+    "Howard", "Ramos", "Kim", "Cox", "Ward", "Richardson", "Watson", "Brooks", "Chavez", "Wood",
+    "James", "Bennett", "Gray", "Mendoza", "Ruiz", "Hughes", "Price", "Alvarez", "Castillo",
+    "Sanders", "Patel", "Myers", "Long", "Ross", "Foster", "Jimenez", "Powell", "Jenkins",
+]
+COMPANIES = ["McKinsey", "BCG", "Bain", "Deloitte", "KPMG"]
+SENIORITIES = ["Senior", "Principal", "Director", "Partner", "Managing Director"]
+FUNCTIONAL_EXPERTISE = ["Strategy", "Operations", "Digital Transformation", "Finance", "Supply Chain"]
+TECHNICAL_SKILLS = ["Data Analytics", "Machine Learning", "Cloud Architecture", "Process Optimization", "Risk Management"]
+INDUSTRIES = ["Technology", "Healthcare", "Financial Services", "Manufacturing", "Energy", "Retail", "Media"]
+JOB_LOCATIONS = ["New York", "San Francisco", "London", "Tokyo", "Berlin", "Singapore", "Sydney"]
+LOCATIONS = ["New York", "San Francisco", "London", "Chicago", "Boston"]
+DEGREES = ["MBA", "MS Computer Science", "BS Engineering", "PhD Economics", "BS Business Administration"]
+SCHOOLS = ["Harvard Business School", "Stanford University", "MIT", "University of Pennsylvania", "Columbia University"]
+MAJORS = ["Business Administration", "Computer Science", "Engineering", "Economics", "Finance", "Data Science"]
+
+
+class SyntheticRoster(NamedTuple):
+    experts: List[dict]
+    # id of each planted near-duplicate -> id of the record it duplicates
+    duplicate_of: Dict[str, str]
+    # id of each record given another record's email -> id of that record
+    shares_email_with: Dict[str, str]
+
+
+def _iso(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}-01T00:00:00Z"
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _slug(name: str) -> str:
+    return '-'.join(name.lower().split())
+
+
+def near_duplicate_name(name: str, rng: random.Random) -> str:
+    """name with one small edit to its longest part: a dropped, doubled or swapped letter, or
+    different case. Only the case edit stays within identify_repeat_experts' name threshold for
+    typical name lengths; the others exercise candidates that score just outside it.
+    """
+    parts = name.split(' ')
+    j = max(range(len(parts)), key=lambda k: len(parts[k]))
+    word = parts[j]
+    if len(word) < 3:
+        return name.upper()
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(('drop', 'double', 'swap', 'case'))
+    if edit == 'drop':
+        word = word[:i] + word[i + 1:]
+    elif edit == 'double':
+        word = word[:i] + word[i] + word[i:]
+    elif edit == 'swap':
+        word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    else:
+        word = word.upper()
+    parts[j] = word
+    return ' '.join(parts)
+
+
+def generate_jobs(meta_expert_id: str, rng: random.Random, now_year: int, num_jobs: Optional[int] = None) -> List[dict]:
+    """Work history (most recent first, the first one current) plus 1-2 education entries."""
+    jobs = []
+    year = now_year
+    for i in range(num_jobs if num_jobs is not None else rng.randint(2, 4)):
+        duration = rng.randint(1, 4)
+        seniority = rng.choice(SENIORITIES)
+        location = rng.choice(JOB_LOCATIONS)
+        jobs.append({
+            'id': _id(rng),
+            'role': f"{seniority} {rng.choice(FUNCTIONAL_EXPERTISE)}",
+            'company': rng.choice(COMPANIES),
+            'projectId': None,
+            'industry': rng.choice(INDUSTRIES),
+            'description': None,
+            'location': location,
+            'isEducation': False,
+            'startDate': _iso(year - duration, rng.randint(1, 12)),
+            'endDate': None if i == 0 else _iso(year, rng.randint(1, 12)),
+            'expertId': None,
+            'metaExpertId': meta_expert_id,
+            'seniorityLevel': seniority,
+        })
+        year -= duration
+    year = now_year - 10
+    for i in range(rng.randint(1, 2)):
+        duration = 2 if i == 0 else 4
+        degree = 'MBA' if i == 0 else rng.choice(DEGREES)
+        jobs.append({
+            'id': _id(rng),
+            'role': f"{degree} in {rng.choice(MAJORS)}",
+            'company': rng.choice(SCHOOLS),
+            'projectId': None,
+            'industry': None,
+            'description': None,
+            'location': rng.choice(LOCATIONS),
+            'isEducation': True,
+            'startDate': _iso(year - duration, rng.randint(1, 12)),
+            'endDate': _iso(year, rng.randint(1, 12)),
+            'expertId': None,
+            'metaExpertId': meta_expert_id,
+        })
+        year -= duration + rng.randint(0, 1)
+    return jobs
+
+
+def generate_meta_expert(index: int, rng: random.Random, organization_id: str = 'org-1', now_year: Optional[int] = None) -> dict:
+    """One meta-expert record shaped like the backend's, with jobs and tags."""
+    now_year = now_year or datetime.now(timezone.utc).year
+    meta_expert_id = _id(rng)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f"{first} {last}"
+    jobs = generate_jobs(meta_expert_id, rng, now_year)
+    current = jobs[0]
+    seniority = current['seniorityLevel']
+    expertise, skill = rng.choice(FUNCTIONAL_EXPERTISE), rng.choice(TECHNICAL_SKILLS)
+    location = rng.choice(LOCATIONS)
+    return {
+        'id': meta_expert_id,
+        'name': name,
+        'organizationID': organization_id,
+        'profession': seniority,
+        'company': current['company'],
+        'description': (
+            f"{seniority} professional with expertise in {current['industry']}. Currently at "
+            f"{current['company']} focusing on {expertise} and {skill}."
+        ),
+        'geography': location,
+        'locationId': None,
+        'linkedInLink': f"https://www.linkedin.com/in/{_slug(name)}-{index}",
+        'fraudFlag': False,
+        'profilePictureLink': "https://www.gravatar.com/avatar/00000000000000000000000000000000?d=mp&f=y",
+        'email': f"{first.lower()}.{last.lower()}{index}@example.com",
+        'phone': f"+1{index + 1:010d}",
+        'strikes': 0,
+        'linkedInCreationDate': _iso(2010 + rng.randint(0, 12), 1),
+        'linkedInConnectionCount': rng.randint(3000, 7000),
+        'jobs': jobs,
+        'tags': [
+            {'id': _id(rng), 'tag': tag, 'metaExpertId': meta_expert_id}
+            for tag in dict.fromkeys([expertise, skill, current['industry'], rng.choice(TECHNICAL_SKILLS)])
+        ],
+    }
+
+
+def generate_roster(
+    size: int,
+    seed: int = 0,
+    duplicate_rate: float = 0.05,
+    shared_email_rate: float = 0.02,
+    organization_id: str = 'org-1',
+    now_year: Optional[int] = None,
+) -> SyntheticRoster:
+    """size meta experts; about duplicate_rate of them near-duplicates of earlier ones.
+
+    A near-duplicate has a one-edit variant of the original's name, no LinkedIn link and a copy
+    of its job history (new ids), like an expert sourced twice through different channels.
+    Independently, about shared_email_rate of the records reuse an earlier record's email.
+    """
+    rng = random.Random(seed)
+    now_year = now_year or datetime.now(timezone.utc).year
+    experts: List[dict] = []
+    duplicate_of: Dict[str, str] = {}
+    shares_email_with: Dict[str, str] = {}
+    for index in range(size):
+        expert = generate_meta_expert(index, rng, organization_id, now_year)
+        if experts and rng.random() < duplicate_rate:
+            original = rng.choice(experts)
+            expert['name'] = near_duplicate_name(original['name'], rng)
+            expert['linkedInLink'] = None
+            expert['jobs'] = [dict(job, id=_id(rng), metaExpertId=expert['id']) for job in original['jobs']]
+            duplicate_of[expert['id']] = original['id']
+        if experts and rng.random() < shared_email_rate:
+            other = rng.choice(experts)
+            expert['email'] = other['email']
+            shares_email_with[expert['id']] = other['id']
+        experts.append(expert)
+    return SyntheticRoster(experts, duplicate_of, shares_email_with)
+
+
+def incoming_expert(meta_expert: dict, rng: random.Random, organization_id: str = 'org-1', match: str = 'name') -> dict:
+    """A newly sourced expert (as make_expert_from_linkedin builds it) for dedup against a roster.
+
+    match chooses what identifies it: 'linkedin' (same link), 'email' (same email, new link),
+    'name' (near-duplicate name only) or 'none' (a person not in the roster). Like a profile
+    from make_expert_from_linkedin it has no organization_id, so dedup scopes it the same way.
+    """
+    index = rng.randrange(10**9)
+    name = meta_expert['name']
+    expert = {
+        'id': _id(rng),
+        'name': name,
+        'organizationId': organization_id,
+        'profession': meta_expert.get('profession'),
+        'company': meta_expert.get('company'),
+        'geography': meta_expert.get('geography'),
+        'linkedInLink': f"https://www.linkedin.com/in/{_slug(name)}-new-{index}",
+        'email': None,
+        'jobs': [dict(job, id=_id(rng), metaExpertId=None) for job in meta_expert.get('jobs') or []],
+    }
+    if match == 'linkedin':
+        expert['linkedInLink'] = meta_expert.get('linkedInLink')
+    elif match == 'email':
+        expert['email'] = meta_expert.get('email')
+    elif match == 'name':
+        expert['name'] = near_duplicate_name(name, rng)
+    elif match == 'none':
+        expert['name'] = f"{rng.choice(FIRST_NAMES)} Synthetic{index}"
+    else:
+        raise ValueError(f"Unknown match kind: {match}")
+    return expert
+
+
+def proxycurl_profile(rng: random.Random, now_year: Optional[int] = None, num_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """A ProxyCurl person profile as fetch_linkedin_profile returns it, for normalization."""
+    now_year = now_year or datetime.now(timezone.utc).year
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    experiences = []
+    year = now_year
+    for i in range(num_jobs if num_jobs is not None else rng.randint(2, 6)):
+        duration = rng.randint(1, 4)
+        experiences.append({
+            'title': f"{rng.choice(SENIORITIES)} {rng.choice(FUNCTIONAL_EXPERTISE)}",
+            'company': rng.choice(COMPANIES),
+            'description': f"Led {rng.choice(FUNCTIONAL_EXPERTISE).lower()} engagements for {rng.choice(INDUSTRIES).lower()} clients.",
+            'location': f"{rng.choice(JOB_LOCATIONS)}",
+            'starts_at': {'year': year - duration, 'month': rng.randint(1, 12), 'day': 1},
+            'ends_at': None if i == 0 else {'year': year, 'month': rng.randint(1, 12), 'day': 1},
+        })
+        year -= duration
+    current = experiences[0]
+    return {
+        'full_name': f"{first} {last}",
+        'occupation': f"{current['title']} at {current['company']}",
+        'headline': f"{current['title']} | {rng.choice(TECHNICAL_SKILLS)}",
+        'city': rng.choice(LOCATIONS),
+        'state': None,
+        'country': 'US',
+        'country_full_name': 'United States of America',
+        'connections': rng.randint(30, 500),
+        'profile_pic_url': 'https://media.licdn.com/dms/image/synthetic',
+        'experiences': experiences,
+        'education': [{
+            'school': rng.choice(SCHOOLS),
+            'degree_name': rng.choice(DEGREES),
+            'field_of_study': rng.choice(MAJORS),
+            'starts_at': {'year': now_year - 14, 'month': 9, 'day': 1},
+            'ends_at': {'year': now_year - 12, 'month': 6, 'day': 1},
+        }],
+    }
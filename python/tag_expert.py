@@ -1,14 +1,25 @@
 import uuid
 import traceback
-from .constants import constants
-from .backend_interaction import get_from_backend, update_in_backend, send_to_backend
-from .prompts_for_rag_tool import get_father_prompt_template, get_expert_tags_template, get_seniority_template
+from .constants import constants, SENIORITY_LEVELS
+from .backend_interaction import update_in_backend, send_to_backend
+from .prompts_for_rag_tool import get_father_prompt_template, get_expert_tags_template, get_seniority_template, get_batch_seniority_template, format_seniority_job_line
+from .prompts_for_rag_tool import FATHER_SCHEMA, EXPERT_TAGS_SCHEMA, SENIORITY_SCHEMA, BATCH_SENIORITY_SCHEMA
 from .llm_requests import get_llm_responses_parallel
+from .llm_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BULK
+from .metrics import metrics
+from .dedup_index import get_org_index, upsert_in_org_index
+from .query_engine import upsert_in_org_query_index
+from .query_cache import invalidate_org_queries
+from .roster_cache import get_meta_experts_roster, record_meta_expert_write
+from .name_matching import match_names
+from .token_counting import count_tokens
+from .seniority_classifier import seniority_classifier
+from .vector_index import index_meta_experts
+from .proxycurl_client import PERSON_ENDPOINT, proxycurl
 from dotenv import load_dotenv
 import os
-import requests
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 if os.getenv('FLASK_ENV') != 'production':
     load_dotenv()
@@ -16,143 +27,171 @@ if os.getenv('FLASK_ENV') != 'production':
 find_meta_expert_model = constants['FIND_META_EXPERT_MODEL']
 job_details_model = constants['JOB_DETAILS_MODEL']
 expert_tags_model = constants.get('EXPERT_TAGS_MODEL', job_details_model)  # Fallback to job_details_model if not defined
-PROXYCURL_API_KEY = os.getenv('PROXYCURL_API_KEY')
-PROXYCURL_ENDPOINT = "https://nubela.co/proxycurl/api/v2/linkedin"
+# Jobs are classified for seniority several per prompt, packed up to this many prompt tokens
+SENIORITY_BATCHING = os.getenv('SENIORITY_BATCHING', 'true').lower() == 'true'
+SENIORITY_BATCH_TOKEN_BUDGET = int(os.getenv('SENIORITY_BATCH_TOKEN_BUDGET', '2500'))
+SENIORITY_BATCH_MAX_JOBS = int(os.getenv('SENIORITY_BATCH_MAX_JOBS', '25'))
+SENIORITY_JOB_FIELDS = ('role', 'company', 'industry', 'description', 'isEducation')
 
 
 def tag_expert(user_email: str, new_expert: dict) -> dict:
+    meta_expert, action = plan_meta_expert(user_email, new_expert)
+    meta_expert, jobs, tags = enrich_meta_expert(meta_expert, new_expert, action)
+    write_meta_expert(user_email, meta_expert, new_expert, action, jobs, tags)
+    return meta_expert, action == 'create'
+
+
+@metrics.timed('tag_expert_stage_seconds', stage='plan')
+def plan_meta_expert(user_email: str, new_expert: dict) -> Tuple[dict, str]:
+    """Dedup step of tag_expert: find or build the meta expert new_expert belongs to.
+
+    Returns (meta_expert, action) where action is 'create' (a new record, not yet written),
+    'update' (an existing record missing its LinkedIn link, to take new_expert's job history)
+    or 'none' (an existing record left as is).
+    """
     matched_expert = identify_repeat_experts(user_email, new_expert)
-    
+
     if matched_expert is not None:
-        is_new_meta_expert = False
         # A matching expert was found.
-        if not matched_expert.get('linkedinlink') and new_expert.get('linkedinlink'):
-            # Scenario 2: linkedinlink is missing in the existing meta expert.
-            print("Updating existing expert's linkedinlink and job history with new expert data.")
-            matched_expert['linkedinlink'] = new_expert['linkedinlink']
-            matched_expert['jobs'] = new_expert.get('jobs', [])
-            matched_expert = further_processing(matched_expert)
-            update_in_backend(data=matched_expert, path=f"meta-expert/{user_email}")
-    else:
-        is_new_meta_expert = True
-        # Scenario 1: No matching expert was found.
-        print("No matching expert found. Generating new meta expert record.")
-        new_meta_expert = {
-            'id': str(uuid.uuid4()),
-            'name': new_expert.get('name', ''),
-            'organizationID': new_expert.get('organizationId'),  # Note the ID casing difference
-            'profession': new_expert.get('profession', 'Missing Job'),
-            'company': new_expert.get('company', 'Missing Company'),
-            'description': new_expert.get('description'),
-            'geography': new_expert.get('geography', ''),
-            'linkedInLink': new_expert.get('linkedInLink'),
-            'fraudFlag': new_expert.get('fraudFlag', False),
-            'profilePictureLink': new_expert.get('profilePictureLink'),
-            'email': new_expert.get('email'),
-            'phone': new_expert.get('phone', ''),
-            'strikes': new_expert.get('strikes', 0),
-            'linkedInCreationDate': new_expert.get('linkedInCreationDate'),
-            'linkedInConnectionCount': new_expert.get('linkedInConnectionCount'),
-        }
+        return plan_for_match(matched_expert, new_expert)
+
+    # Scenario 1: No matching expert was found.
+    print("No matching expert found. Generating new meta expert record.")
+    new_meta_expert = {
+        'id': str(uuid.uuid4()),
+        'name': new_expert.get('name', ''),
+        'organizationID': new_expert.get('organizationId'),  # Note the ID casing difference
+        'profession': new_expert.get('profession', 'Missing Job'),
+        'company': new_expert.get('company', 'Missing Company'),
+        'description': new_expert.get('description'),
+        'geography': new_expert.get('geography', ''),
+        'locationId': new_expert.get('locationId'),
+        'linkedInLink': new_expert.get('linkedInLink'),
+        'fraudFlag': new_expert.get('fraudFlag', False),
+        'profilePictureLink': new_expert.get('profilePictureLink'),
+        'email': new_expert.get('email'),
+        'phone': new_expert.get('phone', ''),
+        'strikes': new_expert.get('strikes', 0),
+        'linkedInCreationDate': new_expert.get('linkedInCreationDate'),
+        'linkedInConnectionCount': new_expert.get('linkedInConnectionCount'),
+    }
+    return new_meta_expert, 'create'
+
+
+def plan_for_match(matched_expert: dict, new_expert: dict) -> Tuple[dict, str]:
+    """(meta_expert, action) for a new expert that matched an existing meta expert.
+
+    The meta expert is a copy: the enrich and write steps set fields on it, while the matched
+    record is shared with the roster cache and the dedup index, and read by other threads.
+    """
+    meta_expert = matched_expert.copy()
+    if not meta_expert.get('linkedinlink') and new_expert.get('linkedinlink'):
+        # Scenario 2: linkedinlink is missing in the existing meta expert.
+        return meta_expert, 'update'
+    return meta_expert, 'none'
+
+
+@metrics.timed('tag_expert_stage_seconds', stage='enrich')
+def enrich_meta_expert(meta_expert: dict, new_expert: dict, action: str) -> Tuple[dict, List[dict], List[dict]]:
+    """LLM step of tag_expert: job seniorities and tags. Returns (meta_expert, jobs, tags)."""
+    jobs = meta_expert.get('jobs') or []
+    if action == 'update':
+        print("Updating existing expert's linkedinlink and job history with new expert data.")
+        meta_expert['linkedinlink'] = new_expert['linkedinlink']
+        meta_expert['jobs'] = new_expert.get('jobs', [])
+        meta_expert = further_processing(meta_expert)
+        jobs = meta_expert['jobs'] or []
+    elif action == 'create':
         # Clear expert_id from jobs when creating them for a new meta expert
         jobs = new_expert.get('jobs', []).copy()
-        new_meta_expert['jobs'] = None
-        new_meta_expert = further_processing(new_meta_expert)
-        print("New meta expert:", new_meta_expert)
-        send_to_backend(data=new_meta_expert, path=f"meta-expert/{user_email}")
+        meta_expert['jobs'] = None
+        meta_expert = further_processing(meta_expert)
         for job in jobs:
             job['expertId'] = None
-            job['metaExpertId'] = new_meta_expert['id']
+            job['metaExpertId'] = meta_expert['id']
+    tags = generate_expert_tags(meta_expert)
+    return meta_expert, jobs, tags
+
+
+@metrics.timed('tag_expert_stage_seconds', stage='write')
+def write_meta_expert(user_email: str, meta_expert: dict, new_expert: dict, action: str, jobs: List[dict], tags: List[dict]) -> None:
+    """Backend step of tag_expert: persist the meta expert and its tags, then update the indexes."""
+    organization_id = new_expert.get('organization_id')
+    if action == 'update':
+        update_in_backend(data=meta_expert, path=f"meta-expert/{user_email}")
+        record_meta_expert_write(user_email, meta_expert, organization_id)
+        upsert_in_org_index(organization_id, meta_expert)
+        upsert_in_org_query_index(organization_id, meta_expert)
+        invalidate_org_queries(organization_id)
+    elif action == 'create':
+        print("New meta expert:", meta_expert)
+        send_to_backend(data=meta_expert, path=f"meta-expert/{user_email}")
+        record_meta_expert_write(user_email, meta_expert, organization_id)
+        upsert_in_org_index(organization_id, meta_expert)
+        upsert_in_org_query_index(organization_id, dict(meta_expert, jobs=jobs))
+        invalidate_org_queries(organization_id)
         #send_to_backend(data=jobs, path=f"jobs}")
         print("New meta expert sent to backend")
-        
-        # Wait for the meta expert to be created before sending jobs
-        # This is a critical change - we're now sending jobs separately after the expert is created
-        if new_meta_expert.get('jobs'):
-            print(f"Sending {len(new_meta_expert['jobs'])} jobs for new meta expert {new_meta_expert['id']}")
-            #send_to_backend(data=new_meta_expert['jobs'], path=f"jobs")
-        
-        matched_expert = new_meta_expert
-        
-    tags = generate_expert_tags(matched_expert)
+
     if tags:
-        send_to_backend(data=tags, path=f"meta-expert-tags/{matched_expert.get('id')}")
-        matched_expert['tags'] = tags
-    return matched_expert, is_new_meta_expert
+        send_to_backend(data=tags, path=f"meta-expert-tags/{meta_expert.get('id')}")
+        meta_expert['tags'] = tags
+
+    if action != 'none' or tags:
+        # Replaces the expert's vector rows, dropping the jobs and tags of its previous version
+        index_meta_experts(organization_id, [dict(meta_expert, jobs=jobs, tags=tags or meta_expert.get('tags'))])
+        # Tags and jobs feed the semantic score of cached text queries
+        invalidate_org_queries(organization_id)
 
 
 def identify_repeat_experts(user_email: str, new_expert: dict):
-    existing_meta_experts: dict = get_from_backend(path=f'meta-experts/{user_email}')
-    
-    # Safely get the list of meta experts
-    existing_meta_experts = existing_meta_experts.get('metaExperts', [])
-    
-    # 1. Filter experts by organization id.
-    filtered_experts = [
-        expert for expert in existing_meta_experts 
-        if expert.get('organization_id') == new_expert.get('organization_id')
-    ]
+    # The roster is served from the in-process cache and only re-fetched once it expires; the
+    # fetch has its own metric, so dedup_match_seconds times the matching alone
+    roster = get_meta_experts_roster(user_email)
+    with metrics.timer('dedup_match_seconds') as timer:
+        return _identify_repeat_experts(roster, new_expert, timer)
+
+
+def _identify_repeat_experts(roster, new_expert: dict, timer):
+    # 1. Look up the organization's dedup index (rebuilt only when its roster content changed).
+    organization_id = new_expert.get('organization_id')
+    index = get_org_index(organization_id, roster.experts, roster.version_of(organization_id))
     
     # 2. Check for an exact match on linkedinLink.
-    new_linkedin = new_expert.get('linkedInLink')
-    if new_linkedin:
-        for expert in filtered_experts:
-            if expert.get('linkedInLink') == new_linkedin:
-                print("Identified expert by linkedinLink match")
-                return expert
+    expert = index.find_by_linkedin(new_expert.get('linkedInLink'))
+    if expert is not None:
+        print("Identified expert by linkedinLink match")
+        timer.label(match='linkedin')
+        return expert
     
     # 3. Check for an exact match on email.
-    new_email = new_expert.get('email')
-    if new_email:
-        for expert in filtered_experts:
-            if expert.get('email') == new_email:
-                print("Identified expert by email match")
-                return expert
+    expert = index.find_by_email(new_expert.get('email'))
+    if expert is not None:
+        print("Identified expert by email match")
+        timer.label(match='email')
+        return expert
             
     # 4. Use Levenshtein distance on names.
-    def levenshtein(s1: str, s2: str) -> int:
-        """Compute the Levenshtein distance between two strings."""
-        if len(s1) < len(s2):
-            return levenshtein(s2, s1)
-        if not s2:
-            return len(s1)
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        return previous_row[-1]
-    
     new_name = new_expert.get('name', '')
     if not new_name:
         print("New expert has no name provided; unable to match by name.")
+        timer.label(match='none')
         return None
 
-    # For name matching, gather all whose name is "close" to the new name
-    name_matches = []
-    for expert in filtered_experts:
-        expert_name = expert.get('name', '')
-        if not expert_name:
-            continue
-        
-        distance = levenshtein(new_name.lower(), expert_name.lower())
-        # Use the max length of either name so short/long name mismatches are better handled
-        divisor = max(len(new_name), len(expert_name))
-        fractional_distance = distance / divisor if divisor else 1.0
-        
-        if fractional_distance < 0.05:
-            name_matches.append(expert)
+    # For name matching, only score the experts the n-gram index could not rule out,
+    # in one bounded batch call (distance / longer name length must stay under 0.05)
+    candidates = [expert for expert in index.name_candidates(new_name) if expert.get('name')]
+    matched_indices = match_names(new_name, [expert['name'] for expert in candidates])
+    name_matches = [candidates[i] for i in matched_indices]
     
     if not name_matches:
         print("No experts found with a sufficiently similar name.")
+        timer.label(match='none')
         return None
     
     if len(name_matches) == 1:
         print("Identified expert by name match")
+        timer.label(match='name')
         return name_matches[0]
     
     # If multiple name matches, let the LLM attempt to disambiguate
@@ -160,9 +199,11 @@ def identify_repeat_experts(user_email: str, new_expert: dict):
     selected_expert = find_father(name_matches, new_expert)
     if selected_expert and any(exp.get('id') == selected_expert.get('id') for exp in name_matches):
         print("Identified expert by LLM disambiguation")
+        timer.label(match='llm')
         return selected_expert
     
     print("LLM disambiguation did not return a valid match.")
+    timer.label(match='none')
     return None
 
 
@@ -175,7 +216,11 @@ def find_father(experts: list, new_expert: dict):
     llm_requests = [{
         'message': message,
         'model': find_meta_expert_model,
-        'id': 'find_father'
+        'id': 'find_father',
+        'schema': FATHER_SCHEMA,
+        'label': 'find_father',
+        # Dedup blocks the expert write, so it goes ahead of bulk enrichment traffic
+        'priority': PRIORITY_INTERACTIVE
     }]
     
     responses = get_llm_responses_parallel(llm_requests)
@@ -236,42 +281,130 @@ def further_processing(meta_expert: dict):
         except Exception as e:
             print(f"Error fetching education data: {e}")
 
-    # Process all jobs using parallel LLM requests
+    # Classify seniority for all jobs, several jobs per LLM request
     if jobs:
-        llm_requests = []
-        # Prepare all job processing requests
-        for idx, job in enumerate(jobs):
-            message = get_seniority_template(job=job)
-            llm_requests.append({
-                'message': message,
-                'model': job_details_model,
-                'id': f'job_{idx}'
-            })
-        
-        # Make parallel requests
-        if llm_requests:
-            responses = get_llm_responses_parallel(llm_requests)
-            
-            # Process responses
-            for idx, job in enumerate(jobs):
-                response = next((r for r in responses if r['id'] == f'job_{idx}' and r['status'] == 'success'), None)
-                if response:
-                    job['seniorityLevel'] = response['data'].get('seniority')
-                job['metaExpertId'] = meta_expert.get('id')
-                job['expertId'] = None
+        classify_job_seniorities(jobs)
+        for job in jobs:
+            job['metaExpertId'] = meta_expert.get('id')
+            job['expertId'] = None
 
     meta_expert['jobs'] = jobs
     return meta_expert
 
 
+def classify_job_seniorities(jobs: List[dict]) -> None:
+    """Set job['seniorityLevel'] for every job that can be classified.
+
+    Titles the local classifier is confident about are labelled without the LLM. The rest are
+    packed into batched prompts sized by SENIORITY_BATCH_TOKEN_BUDGET; any job a batch fails to
+    classify is retried on its own with the single-job template.
+    """
+    pending = []
+    for idx, job in enumerate(jobs):
+        label = seniority_classifier.classify_job(job)
+        if label is not None:
+            job['seniorityLevel'] = label
+        else:
+            pending.append(idx)
+    print(f"Classified {len(jobs) - len(pending)}/{len(jobs)} job seniorities locally "
+          f"(overall LLM bypass rate {seniority_classifier.bypass_rate():.0%})")
+    if not pending:
+        return
+
+    if not SENIORITY_BATCHING:
+        _classify_jobs_individually(jobs, pending)
+        return
+
+    batches = _pack_seniority_batches(jobs, pending)
+    llm_requests = [{
+        'message': get_batch_seniority_template({str(idx): _seniority_fields(jobs[idx]) for idx in batch}),
+        'model': job_details_model,
+        'id': f'seniority_batch_{batch_no}',
+        'schema': BATCH_SENIORITY_SCHEMA,
+        'label': 'seniority_batch',
+        'priority': PRIORITY_BULK
+    } for batch_no, batch in enumerate(batches)]
+    responses = {r['id']: r for r in get_llm_responses_parallel(llm_requests)}
+
+    failed = []
+    for batch_no, batch in enumerate(batches):
+        response = responses.get(f'seniority_batch_{batch_no}')
+        labels = {}
+        if response and response['status'] == 'success' and isinstance(response['data'], dict):
+            for item in response['data'].get('seniorities') or []:
+                if isinstance(item, dict) and item.get('seniority') in SENIORITY_LEVELS:
+                    labels[str(item.get('id'))] = item['seniority']
+        for idx in batch:
+            if str(idx) in labels:
+                jobs[idx]['seniorityLevel'] = labels[str(idx)]
+            else:
+                failed.append(idx)
+
+    if failed:
+        print(f"Retrying seniority for {len(failed)}/{len(jobs)} jobs individually")
+        _classify_jobs_individually(jobs, failed)
+
+
+def _seniority_fields(job: dict) -> dict:
+    return {field: job.get(field) for field in SENIORITY_JOB_FIELDS if job.get(field) not in (None, '')}
+
+
+def _pack_seniority_batches(jobs: List[dict], indexes: List[int]) -> List[List[int]]:
+    """Greedily group job indexes so each batch prompt stays within the token budget."""
+    overhead = count_tokens(get_batch_seniority_template({}), job_details_model)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = overhead
+    for idx in indexes:
+        job = jobs[idx]
+        # +1 for the newline separating job lines
+        job_tokens = count_tokens(format_seniority_job_line(str(idx), _seniority_fields(job)), job_details_model) + 1
+        if current and (current_tokens + job_tokens > SENIORITY_BATCH_TOKEN_BUDGET
+                        or len(current) >= SENIORITY_BATCH_MAX_JOBS):
+            batches.append(current)
+            current = []
+            current_tokens = overhead
+        current.append(idx)
+        current_tokens += job_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _classify_jobs_individually(jobs: List[dict], indexes: List[int]) -> None:
+    llm_requests = [{
+        'message': get_seniority_template(job=jobs[idx]),
+        'model': job_details_model,
+        'id': f'job_{idx}',
+        'schema': SENIORITY_SCHEMA,
+        'label': 'seniority',
+        'priority': PRIORITY_BULK
+    } for idx in indexes]
+    responses = {r['id']: r for r in get_llm_responses_parallel(llm_requests)}
+    for idx in indexes:
+        response = responses.get(f'job_{idx}')
+        if response and response['status'] == 'success':
+            jobs[idx]['seniorityLevel'] = response['data'].get('seniority')
+
+
 def process_job(job: dict, meta_expert: dict):
+    label = seniority_classifier.classify_job(job)
+    if label is not None:
+        job['seniorityLevel'] = label
+        job['metaExpertId'] = meta_expert.get('id')
+        job['expertId'] = None
+        return job
+
     message = get_seniority_template(job=job)
     
     # Using parallel request for job processing
     llm_requests = [{
         'message': message,
         'model': job_details_model,
-        'id': 'job_seniority'
+        'id': 'job_seniority',
+        'schema': SENIORITY_SCHEMA,
+        'label': 'seniority',
+        'priority': PRIORITY_BULK
     }]
     
     responses = get_llm_responses_parallel(llm_requests)
@@ -291,15 +424,13 @@ def fetch_education(linkedin_url: str, meta_expert: dict) -> List[Dict[str, Any]
     Returns a list of education entries formatted as jobs.
     """
     try:
-        headers = {'Authorization': f'Bearer {PROXYCURL_API_KEY}'}
-        params = {'url': linkedin_url}
-        response = requests.get(PROXYCURL_ENDPOINT, headers=headers, params=params)
+        response = proxycurl.get(PERSON_ENDPOINT, {'url': linkedin_url})
         
-        if response.status_code != 200:
+        if not response.ok:
             print(f"ProxyCurl API error: {response.status_code}")
             return []
         
-        data = response.json()
+        data = response.data
         education_data = data.get('education', [])
         
         education_jobs = []
@@ -371,7 +502,9 @@ def generate_expert_tags(expert_info: dict) -> List[Dict[str, Any]]:
     llm_requests = [{
         'message': message,
         'model': expert_tags_model,
-        'id': 'expert_tags'
+        'id': 'expert_tags',
+        'schema': EXPERT_TAGS_SCHEMA,
+        'label': 'tags'
     }]
     
     responses = get_llm_responses_parallel(llm_requests)
@@ -0,0 +1,12 @@
+import os
+import sys
+import types
+
+# The modules are the app's utils package and import each other relatively; register this
+# directory as that package so tests import them the way the app does.
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if 'utils' not in sys.modules:
+    package = types.ModuleType('utils')
+    package.__path__ = [PACKAGE_DIR]
+    sys.modules['utils'] = package
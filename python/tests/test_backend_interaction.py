@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import backend_interaction as backend
+
+
+class Recorder(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.calls.append((self.command, self.path, body, self.client_address[1]))
+        status = 500 if self.path.startswith('/fail') else 200
+        payload = json.dumps({'path': self.path, 'body': body}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Recorder)
+    httpd.calls = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(backend, 'BACKEND_URL', f"http://127.0.0.1:{httpd.server_port}")
+    monkeypatch.setattr(backend, '_session', None)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_calls_share_one_keep_alive_connection(server):
+    assert backend.get_session() is backend.get_session()
+    for i in range(5):
+        assert backend.get_from_backend(f"meta-experts/{i}")['path'] == f"/meta-experts/{i}"
+    assert len({port for *_, port in server.calls}) == 1
+
+
+def test_failed_post_raises_and_is_not_replayed(server):
+    with pytest.raises(requests.HTTPError):
+        backend.send_to_backend(path='fail', data={'id': 1})
+    assert [call[:3] for call in server.calls] == [('POST', '/fail', {'id': 1})]
+
+
+def test_batch_posts_every_record_unchanged(server):
+    records = [{'id': i} for i in range(5)]
+    with backend.backend_batch() as batch:
+        for record in records:
+            assert backend.send_to_backend(path='spend', data=record) == {'status': 'queued'}
+        backend.send_to_backend(path='jobs', data=[{'role': 'Engineer'}])
+        assert batch.pending() == 6 and server.calls == []
+    posted = sorted((path, body['id'] if isinstance(body, dict) else body) for _, path, body, _ in server.calls)
+    assert posted == [('/jobs', [{'role': 'Engineer'}])] + [('/spend', i) for i in range(5)]
+
+
+def test_batch_flushes_when_a_path_fills_up(server):
+    batch = backend.BackendBatch(max_items=3)
+    for i in range(4):
+        batch.add('tags', {'id': i})
+    assert len(server.calls) == 3 and batch.pending() == 1
+    assert batch.flush() == {'tags': [{'path': '/tags', 'body': {'id': 3}}]}
+
+
+def test_batch_reports_the_posts_that_failed(server):
+    batch = backend.BackendBatch()
+    batch.add('spend', {'id': 1})
+    batch.add('fail', {'id': 2})
+    batch.add('spend', {'id': 3})
+    with pytest.raises(backend.BackendBatchError) as error:
+        batch.flush()
+    assert error.value.failed == [('fail', {'id': 2})]
+    assert sorted(body['id'] for _, path, body, _ in server.calls if path == '/spend') == [1, 3]
@@ -0,0 +1,128 @@
+import json
+import random
+import threading
+import time
+
+import pytest
+
+from utils import backend_interaction, bulk_ingest, dedup_index, query_engine, roster_cache, synthetic_data, tag_expert
+from utils.bulk_ingest import BulkIngest, IngestCheckpoint
+
+ORG = 'org-1'
+
+
+class StubBackend:
+    """In-memory backend behind backend_interaction._request; POST expert/... fails while down."""
+
+    def __init__(self):
+        self.meta_experts = {}
+        self.experts = []
+        self.tags = []
+        self.down_after = None
+        self.lock = threading.Lock()
+
+    def __call__(self, method, path, data=None, decode_as=None):
+        with self.lock:
+            if path.startswith('meta-experts/'):
+                return {'metaExperts': [dict(expert) for expert in self.meta_experts.values()]}
+            if path.startswith('meta-expert/'):
+                self.meta_experts[data['id']] = dict(data, organization_id=ORG)
+            elif path.startswith('expert/'):
+                if self.down_after is not None and len(self.experts) >= self.down_after:
+                    raise backend_interaction.requests.ConnectionError('backend unreachable')
+                self.experts.append(data)
+            elif path.startswith('meta-expert-tags/'):
+                self.tags.extend(data)
+            return {}
+
+
+def llm(requests):
+    time.sleep(0.01)  # keeps writes behind dedup, so later duplicates hit unwritten records
+    replies = []
+    for request in requests:
+        if request['label'] == 'tags':
+            data = {'tags': ['strategy']}
+        elif request['label'] == 'seniority_batch':
+            data = {'seniorities': []}
+        else:
+            data = {'seniority': 'Manager'}
+        replies.append({'id': request['id'], 'status': 'success', 'data': data})
+    return replies
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    stub = StubBackend()
+    monkeypatch.setattr(backend_interaction, '_request', stub)
+    monkeypatch.setattr(tag_expert, 'get_llm_responses_parallel', llm)
+    # Every lookup refetches the roster, so the org indexes are rebuilt throughout the run
+    monkeypatch.setattr(roster_cache, 'roster_cache', roster_cache.RosterCache(ttl_seconds=0))
+    dedup_index.clear_org_indexes()
+    query_engine.clear_org_query_indexes()
+    yield stub
+    dedup_index.clear_org_indexes()
+    query_engine.clear_org_query_indexes()
+
+
+def profiles(count):
+    rng = random.Random(11)
+    result = {}
+    for i in range(count):
+        profile = synthetic_data.proxycurl_profile(rng, num_jobs=2)
+        profile['full_name'] = f"Person{i:02d} Distinctname{'x' * i}"
+        result[f"https://www.linkedin.com/in/person-{i}"] = profile
+    return result
+
+
+def ingest(tmp_path, urls, by_url):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return by_url.get(url.replace('https://linkedin.com/', 'https://www.linkedin.com/').rstrip('/'))
+
+    run = BulkIngest('user@example.com', organization_id=ORG, checkpoint_path=str(tmp_path / 'checkpoint.jsonl'),
+                     fetch_profile=fetch, workers={'fetch': 2, 'normalize': 1, 'enrich': 3, 'write': 2},
+                     resolve_pictures=False)
+    return run.run(urls), fetched
+
+
+def test_resumes_after_an_interruption_without_duplicates(backend, tmp_path):
+    by_url = profiles(8)
+    urls = list(by_url)
+    # The same people again under other spellings of their URLs, and a URL that is not LinkedIn
+    duplicates = [url.replace('https://www.', 'https://') + '/' for url in urls[:3]]
+    backend.down_after = 4
+    first, _ = ingest(tmp_path, urls + duplicates + ['https://example.com/nobody'], by_url)
+    assert first['invalid'] == 1 and first['done'] == 4 and first['failed'] == 7
+    checkpoint = IngestCheckpoint(str(tmp_path / 'checkpoint.jsonl'))
+    finished = [url for url in urls + duplicates if checkpoint.is_done(url)]
+    checkpoint.close()
+
+    # A crash mid-write leaves a torn last line; the checkpoint still loads and appends after it
+    with open(tmp_path / 'checkpoint.jsonl', 'a') as f:
+        f.write('{"url": "https://www.linkedin.com/in/per')
+    backend.down_after = None
+    second, fetched = ingest(tmp_path, urls + duplicates + ['https://example.com/nobody'], by_url)
+    # Only what had not finished is fetched again, including every spelling of a finished URL
+    assert second['skipped'] == len(finished) + 1 and second['failed'] == 0
+    assert second['done'] == len(fetched) == len(urls + duplicates) - len(finished)
+
+    # One meta expert per person, however many times and under whichever URL they were ingested
+    names = sorted(expert['name'] for expert in backend.meta_experts.values())
+    assert names == sorted(profile['full_name'] for profile in by_url.values())
+    checkpoint = IngestCheckpoint(str(tmp_path / 'checkpoint.jsonl'))
+    assert all(checkpoint.is_done(url) for url in urls + duplicates)
+    checkpoint.close()
+
+
+def test_matched_roster_records_are_not_mutated(backend, tmp_path):
+    by_url = profiles(2)
+    ingest(tmp_path, list(by_url), by_url)
+    held = roster_cache.get_meta_experts_roster('user@example.com').experts
+    before = json.dumps(held, sort_keys=True, default=str)
+    # Re-ingesting matches the existing records ('none'/'update' paths)
+    (tmp_path / 'checkpoint.jsonl').unlink()
+    summary, _ = ingest(tmp_path, list(by_url), by_url)
+    assert summary['done'] == 2 and len(backend.meta_experts) == 2
+    assert json.dumps(held, sort_keys=True, default=str) == before
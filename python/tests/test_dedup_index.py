@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from utils import dedup_index as di
+from utils.dedup_index import MetaExpertIndex, normalize_linkedin_url
+
+
+@pytest.fixture(autouse=True)
+def clean_indexes():
+    di.clear_org_indexes()
+    yield
+    di.clear_org_indexes()
+
+
+def expert(expert_id, name, org='o1', **fields):
+    return dict(id=expert_id, name=name, organization_id=org, **fields)
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.linkedin.com/in/jane-doe/',
+    'http://linkedin.com/in/Jane-Doe?trk=abc',
+    'linkedin.com/in/jane-doe#about',
+    'https://m.linkedin.com/in/jane-doe',
+])
+def test_linkedin_urls_normalize_to_one_key(url):
+    assert normalize_linkedin_url(url) == 'linkedin.com/in/jane-doe'
+
+
+def test_exact_lookups_return_the_first_expert_in_roster_order():
+    index = MetaExpertIndex()
+    index.add_many([
+        expert('1', 'Jane Doe', linkedInLink='https://linkedin.com/in/jane', email='Jane@X.com'),
+        expert('2', 'Jane D', linkedInLink='linkedin.com/in/jane/', email='jane@x.com'),
+    ])
+    assert index.find_by_linkedin('https://www.linkedin.com/in/jane?x=1')['id'] == '1'
+    assert index.find_by_email(' JANE@x.com ')['id'] == '1'
+    index.remove('1')
+    assert index.find_by_linkedin('linkedin.com/in/jane')['id'] == '2'
+
+
+def test_upsert_rekeys_changed_fields():
+    index = MetaExpertIndex()
+    index.upsert(expert('1', 'Jane Doe', email='old@x.com'))
+    index.upsert(expert('1', 'Jane Doe', email='new@x.com'))
+    assert index.find_by_email('old@x.com') is None
+    assert index.find_by_email('new@x.com')['id'] == '1'
+    assert len(index) == 1
+
+
+def test_name_candidates_are_a_superset_of_close_names():
+    # 27 characters: the 5% threshold allows a single edit
+    names = [
+        'Alexandria Montgomery-Smith', 'Alexandrea Montgomery-Smith', 'Alexandria Montgomery-Smyth',
+        'Alexandra Montgomery', 'Maria Garcia',
+    ]
+    index = MetaExpertIndex()
+    index.add_many(expert(str(i), name) for i, name in enumerate(names))
+    candidates = [e['name'] for e in index.name_candidates('Alexandria Montgomery-Smith')]
+    assert candidates == names[:3]
+    assert [e['name'] for e in index.name_candidates('maria garcia')] == ['Maria Garcia']
+
+
+def test_org_index_is_reused_until_a_newer_version():
+    roster = [expert('1', 'A'), expert('2', 'B', org='o2')]
+    index = di.get_org_index('o1', roster, 3)
+    assert len(index) == 1
+    assert di.get_org_index('o1', roster, 3) is index
+    # A roster fetched before the index was built does not roll it back
+    assert di.get_org_index('o1', [], 2) is index
+    rebuilt = di.get_org_index('o1', roster + [expert('3', 'C')], 4)
+    assert rebuilt is not index and len(rebuilt) == 2
+
+
+def test_writes_reach_the_built_index():
+    index = di.get_org_index('o1', [expert('1', 'A')], 1)
+    written = {'id': '2', 'name': 'B', 'email': 'b@x.com'}
+    di.upsert_in_org_index('o1', written)
+    assert written['organization_id'] == 'o1'
+    assert index.find_by_email('b@x.com') is written
+    di.remove_from_org_index('o1', '1')
+    assert len(index) == 1
+
+
+def test_writes_during_a_rebuild_are_replayed_onto_the_new_index():
+    di.get_org_index('o1', [expert('1', 'A')], 1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_roster():
+        started.set()
+        release.wait(5)
+        yield expert('1', 'A')
+        yield expert('2', 'B')
+
+    result = {}
+    builder = threading.Thread(target=lambda: result.setdefault('index', di.get_org_index('o1', slow_roster(), 2)))
+    builder.start()
+    started.wait(5)
+    di.upsert_in_org_index('o1', expert('3', 'C', email='c@x.com'))
+    di.remove_from_org_index('o1', '2')
+    release.set()
+    builder.join(5)
+    index = result['index']
+    assert index.find_by_email('c@x.com')['id'] == '3'
+    assert sorted(e['id'] for e in index.name_candidates('B')) == []
+    assert len(index) == 2
+
+
+def test_concurrent_callers_share_one_build_and_do_not_block_other_orgs():
+    builds = []
+    release = threading.Event()
+
+    def roster(org):
+        builds.append(org)
+        if org == 'slow':
+            release.wait(5)
+        yield expert('1', 'A', org=org)
+
+    threads = [threading.Thread(target=di.get_org_index, args=('slow', roster('slow'), 1)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Another organization builds while 'slow' is still in progress
+    assert len(di.get_org_index('fast', roster('fast'), 1)) == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert builds.count('slow') == 1
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.job_intervals import JobIntervalIndex, job_bounds, job_matches_timing, timing_end_range
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DAY = 86400
+
+
+def ended(days_ago: float) -> dict:
+    end = datetime.fromtimestamp(NOW.timestamp() - days_ago * DAY, timezone.utc)
+    return {'startDate': '2000-01-01', 'endDate': end.isoformat()}
+
+
+@pytest.mark.parametrize('job, timing, expected', [
+    ({'startDate': '2020-01-01'}, 'current', True),
+    ({}, 'current', True),
+    (ended(-10), 'current', True),  # ends in the future
+    (ended(10), 'current', False),
+    ({'startDate': '2020-01-01'}, '1_2_years', False),  # open-ended jobs are never in a year bucket
+    (ended(365), '1_2_years', False),  # exactly one year: (1, 2] excludes it
+    (ended(366), '1_2_years', True),
+    (ended(730), '1_2_years', True),  # exactly two years is still inside
+    (ended(731), '1_2_years', False),
+    (ended(731), '2_3_years', True),
+    (ended(1100), '3_4_years', True),
+    (ended(1461), '3_4_years', False),
+    (ended(1461), '4_plus_years', True),
+    (ended(10), None, True),
+])
+def test_job_matches_timing(job, timing, expected):
+    assert job_matches_timing(job, timing, NOW) is expected
+
+
+def test_unknown_timing_is_rejected():
+    with pytest.raises(ValueError):
+        timing_end_range('5_years', NOW)
+
+
+def test_index_agrees_with_per_job_timing():
+    jobs = [ended(days) for days in (-10, 10, 365, 366, 730, 731, 1100, 1461, 5000)] + [{'startDate': '2020-01-01'}]
+    index = JobIntervalIndex()
+    for owner, job in enumerate(jobs):
+        index.add('key', owner, job_bounds(job))
+    for timing in ('current', '1_2_years', '2_3_years', '3_4_years', '4_plus_years'):
+        expected = [owner for owner, job in enumerate(jobs) if job_matches_timing(job, timing, NOW)]
+        assert sorted(index.matching_timing('key', timing, NOW).tolist()) == expected, timing
+
+
+@pytest.mark.parametrize('window, expected', [
+    (('2019-01-01', '2019-12-31'), [0]),
+    (('2021-06-01', '2021-06-30'), [1, 2]),
+    (('2022-06-01', None), [2]),
+    ((None, '2018-01-01'), []),
+    ((None, None), [0, 1, 2]),
+])
+def test_active_during_window(window, expected):
+    index = JobIntervalIndex()
+    index.add('key', 0, job_bounds({'startDate': '2018-06-01', 'endDate': '2020-01-01'}))
+    index.add('key', 1, job_bounds({'startDate': '2021-01-01', 'endDate': '2022-01-01'}))
+    index.add('key', 2, job_bounds({'startDate': '2021-03-01'}))
+    start, end = (job_bounds({'startDate': value})[0] if value else None for value in window)
+    assert sorted(index.active_during('key', start, end).tolist()) == expected
+
+
+def test_discarded_owner_is_not_returned():
+    index = JobIntervalIndex()
+    index.add('key', 0, job_bounds({}))
+    index.add('key', 1, job_bounds({}))
+    index.discard('key', 0)
+    assert index.matching_timing('key', 'current', NOW).tolist() == [1]
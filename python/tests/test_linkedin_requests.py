@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from utils import linkedin_requests
+from utils.linkedin_requests import SearchQuota, find_experts_and_create_profiles, iter_relevant_experts
+
+PAGE = 3
+
+
+class StubSearch:
+    """Pages of PAGE results per company x role query, numbered so tests can see the order."""
+
+    def __init__(self, pages=2, delay=0.05):
+        self.pages = pages
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, params):
+        company = params.get('current_company_linkedin_profile_url') or params.get('company')
+        role = params.get('current_role_title') or params.get('role')
+        page = int(params.get('page', 0))
+        with self.lock:
+            self.calls.append((company, role, page))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        results = [{'linkedin_profile_url': f'https://www.linkedin.com/in/{company}-{role}-{page}-{i}'}
+                   for i in range(PAGE)]
+        next_page = None
+        if page + 1 < self.pages:
+            next_page = f'https://proxycurl.test/search?company={company}&role={role}&page={page + 1}'
+        return results, next_page
+
+
+@pytest.fixture
+def search(monkeypatch):
+    stub = StubSearch()
+    monkeypatch.setattr(linkedin_requests, 'search_page', stub)
+    return stub
+
+
+def enricher(monkeypatch, fails=()):
+    enriched = []
+    lock = threading.Lock()
+
+    def make_expert(profile_url, user_email, tag):
+        time.sleep(0.02)
+        with lock:
+            enriched.append(profile_url)
+        if any(profile_url.endswith(suffix) for suffix in fails):
+            return None
+        return {'name': profile_url.rsplit('/', 1)[1]}, []
+
+    monkeypatch.setattr(linkedin_requests, 'make_expert_from_linkedin', make_expert)
+    return enriched
+
+
+def test_queries_run_concurrently_and_every_page_is_yielded_once(search):
+    yielded = list(iter_relevant_experts(['a', 'b'], ['ceo', 'cto'], True, page_size=PAGE, max_workers=4))
+    assert search.peak > 1
+    assert len(search.calls) == 4 * 2
+    urls = [result['linkedin_profile_url'] for _, _, result in yielded]
+    assert len(urls) == len(set(urls)) == 4 * 2 * PAGE
+
+
+def test_next_pages_are_not_fetched_once_the_quota_is_met(search, monkeypatch):
+    enricher(monkeypatch)
+    experts = find_experts_and_create_profiles('user@example.com', ['a', 'b'], True, roles=['ceo'],
+                                               page_size=PAGE, max_experts=4, max_experts_per_company=2,
+                                               enrich_experts=True)
+    assert len(experts) == 4
+    assert sorted(search.calls) == [('a', 'ceo', 0), ('b', 'ceo', 0)]
+    names = [expert['name'] for expert in experts]
+    assert sum(name.startswith('a-') for name in names) == 2
+
+
+def test_a_failed_enrichment_frees_its_slot_for_the_rest_of_the_page(search, monkeypatch):
+    # The first two results of company a's first page cannot be enriched
+    enriched = enricher(monkeypatch, fails=('a-ceo-0-0', 'a-ceo-0-1'))
+    experts = find_experts_and_create_profiles('user@example.com', ['a'], True, roles=['ceo'],
+                                               page_size=PAGE, max_experts=2, max_experts_per_company=2,
+                                               enrich_experts=True)
+    assert [expert['name'] for expert in experts] == ['a-ceo-0-2', 'a-ceo-1-0']
+    assert len(enriched) == 4
+    assert sorted(search.calls) == [('a', 'ceo', 0), ('a', 'ceo', 1)]
+
+
+def test_without_enrichment_nothing_is_searched(search):
+    assert find_experts_and_create_profiles('user@example.com', ['a'], True, roles=['ceo']) == []
+    assert search.calls == []
+
+
+def test_quota_waits_for_in_flight_claims():
+    quota = SearchQuota(max_total=1, max_per_company=1)
+    assert quota.claim('a') and not quota.has_room('a')
+    answers = []
+    waiter = threading.Thread(target=lambda: answers.append(quota.wait_for_room('a')))
+    waiter.start()
+    time.sleep(0.05)
+    assert answers == []
+    quota.settle('a', False)
+    waiter.join(1)
+    assert answers == [True]
+
+    assert quota.claim('a')
+    waiter = threading.Thread(target=lambda: answers.append(quota.wait_for_room('a')))
+    waiter.start()
+    quota.settle('a', True)
+    waiter.join(1)
+    assert answers == [True, False] and quota.is_full()
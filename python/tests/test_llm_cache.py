@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import pytest
+
+from utils import llm_cache as cache_module
+from utils.llm_cache import LLMResponseCache, prompt_key
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'llm' / 'cache.sqlite3')
+
+
+@pytest.mark.skipif('LLM_CACHE_PATH' in os.environ, reason="path overridden")
+def test_default_path_is_in_the_user_cache_directory():
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    assert cache_module.LLM_CACHE_PATH == os.path.join(base, 'llm', 'cache.sqlite3')
+
+
+def test_prompts_differing_only_in_whitespace_share_a_key():
+    assert prompt_key('gpt', 'Tag  this\n   expert ') == prompt_key('gpt', 'Tag this expert')
+    assert prompt_key('gpt', 'Tag this expert') != prompt_key('other', 'Tag this expert')
+
+
+def test_memory_then_disk_hits(path):
+    cache = LLMResponseCache(path=path)
+    assert cache.get('m', 'prompt') is None
+    cache.set('m', 'prompt', {'tags': ['a']})
+    assert cache.get('m', 'prompt') == {'tags': ['a']}
+    # A new process only has the disk tier
+    fresh = LLMResponseCache(path=path)
+    assert fresh.get('m', 'prompt') == {'tags': ['a']}
+    assert fresh.get_stats()['disk_hits'] == 1
+    assert cache.hit_rate() == 0.5
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+
+def test_callers_cannot_corrupt_cached_responses(path):
+    cache = LLMResponseCache(path=path)
+    response = {'tags': ['a']}
+    cache.set('m', 'p', response)
+    response['tags'].append('mutated')
+    cache.get('m', 'p')['tags'].append('mutated')
+    assert cache.get('m', 'p') == {'tags': ['a']}
+
+
+def test_expired_entries_are_ignored(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    cache = LLMResponseCache(path=path, ttl_seconds=60)
+    cache.set('m', 'p', 1)
+    now[0] += 61
+    assert cache.get('m', 'p') is None
+    assert LLMResponseCache(path=path, ttl_seconds=60).get('m', 'p') is None
+
+
+def test_memory_tier_is_bounded(path):
+    cache = LLMResponseCache(path=path, max_memory_entries=2)
+    for i in range(3):
+        cache.set('m', str(i), i)
+    stats = cache.get_stats()
+    assert stats['memory_entries'] == 2 and stats['evictions'] == 1
+    assert cache.get('m', '0') == 0  # still on disk
+
+
+def test_async_lookup_and_nowait_write(path):
+    cache = LLMResponseCache(path=path)
+
+    async def roundtrip():
+        cache.set_nowait('m', 'p', [1, 2])
+        return await cache.get_async('m', 'p'), await cache.get_async('m', 'missing')
+
+    assert asyncio.run(roundtrip()) == ([1, 2], None)
+
+
+def test_memory_only_cache():
+    cache = LLMResponseCache(path=None)
+    cache.set('m', 'p', 'reply')
+    assert cache.get('m', 'p') == 'reply'
+    assert cache.get('m', 'other') is None
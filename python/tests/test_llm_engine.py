@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.llm_engine import LLMEngine
+
+
+@pytest.fixture
+def engine():
+    engine = LLMEngine()
+    yield engine
+    engine.close()
+
+
+def test_coroutines_from_many_threads_share_one_loop(engine):
+    loops, results = set(), []
+
+    async def work(i):
+        loops.add(asyncio.get_running_loop())
+        await asyncio.sleep(0.01)
+        return i * 2
+
+    threads = [threading.Thread(target=lambda i=i: results.append(engine.run(work(i)))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sorted(results) == [i * 2 for i in range(8)]
+    assert loops == {engine.loop}
+
+
+def test_submit_returns_a_future(engine):
+    async def answer():
+        return 42
+
+    assert engine.submit(answer()).result(timeout=5) == 42
+
+
+def test_run_from_the_loop_itself_is_refused(engine):
+    async def nested():
+        coro = asyncio.sleep(0)
+        try:
+            engine.run(coro)
+        finally:
+            coro.close()
+
+    with pytest.raises(RuntimeError, match='await the coroutine'):
+        engine.run(nested())
+
+
+def test_close_stops_the_loop_and_a_new_one_starts_on_demand(engine):
+    first = engine.loop
+    engine.close()
+    assert not first.is_running()
+
+    async def answer():
+        return 'again'
+
+    assert engine.run(answer()) == 'again'
+    assert engine.loop is not first
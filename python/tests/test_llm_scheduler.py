@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from utils import llm_scheduler
+from utils.llm_scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, LLMScheduler, TokenBucket
+
+LIMITS = {'m': {'rpm': 600, 'tpm': 60_000}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm_scheduler.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_token_bucket_refills_continuously_up_to_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(60, clock[0])
+    assert bucket.wait_time(1, clock[0]) == pytest.approx(1.0)
+    assert bucket.wait_time(1, clock[0] + 1) == 0.0
+    assert bucket.wait_time(1000, clock[0] + 3600) == 0.0  # capped at one minute's worth
+    bucket.pause(5, clock[0] + 3600)
+    assert bucket.wait_time(1, clock[0] + 3600) == pytest.approx(6.0)
+
+
+def test_concurrency_limit_and_priority_order():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, rate_limits=LIMITS, headroom=1.0)
+        order = []
+
+        async def call(name, priority):
+            async with scheduler.slot('m', 10, priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(call('first', PRIORITY_BULK))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(call('bulk', PRIORITY_BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call('interactive', PRIORITY_INTERACTIVE))
+        await asyncio.gather(first, bulk, interactive)
+        return order, scheduler.get_stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ['first', 'interactive', 'bulk']
+    assert stats['granted'] == 3 and stats['waited'] == 2 and stats['in_flight'] == 0
+
+
+def test_token_budget_makes_requests_wait_and_usage_settles_it(clock):
+    async def scenario():
+        scheduler = LLMScheduler(rate_limits={'m': {'rpm': 1000, 'tpm': 1000}}, headroom=1.0)
+        async with scheduler.slot('m', 900) as usage:
+            usage['tokens'] = 300  # 600 reserved tokens go back to the bucket
+        await asyncio.wait_for(scheduler.acquire('m', 600), 1)
+        second = asyncio.create_task(scheduler.acquire('m', 600))
+        await asyncio.sleep(0)
+        blocked = not second.done()
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        return blocked, scheduler.get_stats()
+
+    blocked, stats = asyncio.run(scenario())
+    assert blocked
+    assert stats['queued'] == 0 and stats['in_flight'] == 1
+
+
+def test_rate_limited_model_is_paused_without_blocking_others(clock):
+    async def scenario():
+        scheduler = LLMScheduler(rate_limits={'a': LIMITS['m'], 'b': LIMITS['m']}, headroom=1.0)
+        scheduler.report_rate_limited('a', retry_after=30)
+        paused = asyncio.create_task(scheduler.acquire('a', 10, PRIORITY_INTERACTIVE))
+        await asyncio.wait_for(scheduler.acquire('b', 10, PRIORITY_BULK), 1)
+        await asyncio.sleep(0)
+        result = paused.done()
+        paused.cancel()
+        return result, scheduler.stats['rate_limited']
+
+    assert asyncio.run(scenario()) == (False, 1)
@@ -0,0 +1,71 @@
+import pytest
+
+from utils.locations import ROOT_ID, Gazetteer, LocationRangeIndex, gazetteer
+
+
+def small_gazetteer() -> Gazetteer:
+    places = Gazetteer()
+    places.add('continent:na', 'North America', 'continent', ROOT_ID)
+    places.add('country:us', 'United States', 'country', 'continent:na', ['USA'])
+    places.add('state:us-tx', 'Texas', 'state', 'country:us', ['TX'])
+    places.add('city:us-tx-austin', 'Austin', 'city', 'state:us-tx')
+    places.add('state:us-ga', 'Georgia', 'state', 'country:us', ['GA'])
+    places.add('continent:eu', 'Europe', 'continent', ROOT_ID)
+    places.add('country:ge', 'Georgia', 'country', 'continent:eu')
+    return places
+
+
+@pytest.mark.parametrize('node, ancestor, expected', [
+    ('city:us-tx-austin', 'state:us-tx', True),
+    ('city:us-tx-austin', 'country:us', True),
+    ('city:us-tx-austin', ROOT_ID, True),
+    ('state:us-tx', 'state:us-tx', True),
+    ('state:us-tx', 'city:us-tx-austin', False),
+    ('state:us-ga', 'state:us-tx', False),
+    ('country:ge', 'continent:na', False),
+])
+def test_is_within_matches_ancestor_chain(node, ancestor, expected):
+    places = small_gazetteer()
+    assert places.is_within(node, ancestor) is expected
+    assert (ancestor in places.ancestors(node)) is expected
+
+
+def test_spans_nest_and_are_recomputed_after_adds():
+    places = small_gazetteer()
+    assert places.span(ROOT_ID) == (0, len(places))
+    places.add('city:us-tx-dallas', 'Dallas', 'city', 'state:us-tx')
+    low, high = places.span('state:us-tx')
+    assert low < places.position('city:us-tx-dallas') < high
+    assert places.is_within('city:us-tx-dallas', 'continent:na')
+
+
+def test_region_index_returns_everything_inside_a_node():
+    places = small_gazetteer()
+    index = LocationRangeIndex(places)
+    for item, node in [('a', 'city:us-tx-austin'), ('b', 'state:us-ga'), ('c', 'country:ge'), ('d', None)]:
+        index.add(item, node)
+    assert sorted(index.within('country:us')) == ['a', 'b']
+    assert sorted(index.within(ROOT_ID)) == ['a', 'b', 'c']
+    index.discard('a')
+    assert index.within('state:us-tx') == []
+    places.add('city:us-ga-atlanta', 'Atlanta', 'city', 'state:us-ga')
+    index.add('e', 'city:us-ga-atlanta')
+    assert sorted(index.within('state:us-ga')) == ['b', 'e']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Austin, Texas, United States', 'city:us-tx-austin'),
+    ('Austin, TX', 'city:us-tx-austin'),
+    ('Georgia, United States', 'state:us-ga'),
+    ('Georgia', 'country:ge'),  # ambiguous alone: the broadest reading wins
+    ('Atlantis', None),
+])
+def test_resolve_text(text, expected):
+    assert small_gazetteer().resolve_text(text) == expected
+
+
+def test_default_gazetteer_places_cities_inside_their_country():
+    austin = gazetteer.resolve_text('Austin, Texas, United States')
+    us = gazetteer.resolve(country='United States')
+    assert austin is not None and us is not None
+    assert gazetteer.is_within(austin, us)
@@ -0,0 +1,84 @@
+import json
+import os
+import socket
+import urllib.request
+
+import pytest
+
+from utils import metrics as metrics_module
+from utils.metrics import MetricsRegistry, NullMetrics, start_metrics_server
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(buckets=(0.1, 1.0))
+
+
+def test_counters_and_histograms_export_as_json(registry):
+    registry.increment('llm_cache_total', call='tags', result='hit')
+    registry.increment('llm_cache_total', 2, result='hit', call='tags')
+    registry.observe('backend_request_seconds', 0.05, method='GET')
+    registry.observe('backend_request_seconds', 5, method='GET')
+    exported = registry.export_json()
+    assert exported['counters']['llm_cache_total'] == [{'labels': {'call': 'tags', 'result': 'hit'}, 'value': 3}]
+    (histogram,) = exported['histograms']['backend_request_seconds']
+    assert histogram['count'] == 2 and histogram['sum'] == pytest.approx(5.05)
+    assert histogram['buckets'] == {'0.1': 1, '1.0': 0, '+Inf': 1}
+
+
+def test_prometheus_buckets_are_cumulative_and_labels_escaped(registry):
+    registry.observe('backend_request_seconds', 0.05, path='a"b')
+    registry.observe('backend_request_seconds', 0.5, path='a"b')
+    text = registry.export_prometheus()
+    assert '# TYPE backend_request_seconds histogram' in text
+    assert 'backend_request_seconds_bucket{path="a\\"b",le="0.1"} 1' in text
+    assert 'backend_request_seconds_bucket{path="a\\"b",le="+Inf"} 2' in text
+    assert 'backend_request_seconds_count{path="a\\"b"} 2' in text
+
+
+def test_timers_label_the_outcome(registry):
+    with registry.timer('roster_fetch_seconds') as timer:
+        timer.label(result='hit')
+    with pytest.raises(RuntimeError):
+        with registry.timer('roster_fetch_seconds'):
+            raise RuntimeError("backend down")
+
+    @registry.timed('tag_expert_stage_seconds', stage='plan')
+    def plan():
+        return 'planned'
+
+    assert plan() == 'planned'
+    labels = [series['labels'] for series in registry.export_json()['histograms']['roster_fetch_seconds']]
+    assert labels == [{'outcome': 'ok', 'result': 'hit'}, {'outcome': 'error'}]
+    stage = registry.export_json()['histograms']['tag_expert_stage_seconds'][0]['labels']
+    assert stage == {'outcome': 'ok', 'stage': 'plan'}
+
+
+def test_null_metrics_record_nothing():
+    null = NullMetrics()
+    null.increment('llm_cache_total', result='hit')
+    with null.timer('roster_fetch_seconds') as timer:
+        timer.label(result='hit')
+    assert null.export_json() == {'counters': {}, 'histograms': {}}
+
+
+@pytest.mark.skipif('METRICS_HOST' in os.environ, reason="host overridden")
+def test_server_listens_on_loopback_by_default(monkeypatch):
+    assert metrics_module.METRICS_HOST == '127.0.0.1'
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr(metrics_module, '_server', None)
+    monkeypatch.setattr(metrics_module, 'metrics', MetricsRegistry())
+    metrics_module.metrics.increment('llm_cache_total', result='miss')
+    server = start_metrics_server(port)
+    try:
+        assert server.server_address[0] == '127.0.0.1'
+        assert start_metrics_server(port) is server
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics.json', timeout=5) as response:
+            assert json.load(response)['counters']['llm_cache_total'][0]['value'] == 1
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            assert b'llm_cache_total{result="miss"} 1' in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,49 @@
+import pytest
+
+from utils.name_matching import bounded_levenshtein, match_names, max_allowed_distance
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize('a, b', [
+    ('', ''),
+    ('', 'abc'),
+    ('abc', ''),
+    ('kitten', 'sitting'),
+    ('flaw', 'lawn'),
+    ('jonathan smith', 'jonathon smyth'),
+    ('a' * 70, 'a' * 69 + 'b'),  # pattern longer than a machine word
+    ('maría garcía', 'maria garcia'),
+])
+def test_myers_kernel_matches_dynamic_programming(a, b):
+    assert bounded_levenshtein(a, b) == levenshtein(a, b)
+
+
+@pytest.mark.parametrize('a, b, bound, expected', [
+    ('kitten', 'sitting', 3, 3),
+    ('kitten', 'sitting', 2, None),
+    ('abc', 'abcdef', 2, None),  # the length gap alone exceeds the bound
+    ('same', 'same', 0, 0),
+])
+def test_bounded_distance(a, b, bound, expected):
+    assert bounded_levenshtein(a, b, bound) == expected
+
+
+@pytest.mark.parametrize('length, expected', [(0, -1), (19, 0), (20, 0), (21, 1), (40, 1), (41, 2)])
+def test_max_allowed_distance_is_strictly_below_threshold(length, expected):
+    assert max_allowed_distance(length) == expected
+
+
+def test_match_names_is_case_insensitive_and_relative_to_length():
+    candidates = ['JOHN SMITH', 'John Smyth', 'Alexandra Catherine Montgomery-Smithe', 'Alexandra Catherine Montgomery-Smith', '']
+    assert match_names('john smith', candidates) == [0]
+    assert match_names('Alexandra Catherine Montgomery-Smith', candidates) == [2, 3]
+    assert match_names('', candidates) == []
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from utils import prompt_compaction
+from utils.prompt_compaction import PromptSizeReport, compact_block, fit_to_budget, project, render
+from utils.records import MetaExpert
+from utils.token_counting import count_tokens
+
+EXPERT = {
+    'id': 'm1',
+    'name': 'Zoë Lee',
+    'profession': 'Engineer',
+    'company': 'Acme',
+    'description': '',
+    'profilePictureLink': 'https://media.licdn.com/x',
+    'phone': '+1 555',
+    'jobs': [
+        {'id': 'j1', 'role': 'CTO', 'company': 'Acme', 'startDate': '2019-02-01T00:00:00Z', 'endDate': None,
+         'description': 'Built the platform. ' * 40, 'expertId': 'e1'},
+        {'id': 'j2', 'role': 'Engineer', 'company': 'Initech', 'startDate': '2015-06-01T00:00:00Z',
+         'endDate': '2019-01-01T00:00:00Z', 'description': 'Wrote services.'},
+    ],
+}
+
+
+@pytest.fixture
+def report(monkeypatch):
+    fresh = PromptSizeReport()
+    monkeypatch.setattr(prompt_compaction, 'prompt_size_report', fresh)
+    monkeypatch.setattr(prompt_compaction, 'PROMPT_SIZE_REPORT_ENABLED', True)
+    return fresh
+
+
+def test_project_keeps_listed_non_empty_fields_and_month_dates():
+    projected = project(EXPERT, ('id', 'name', 'description', 'jobs'), ('role', 'startDate', 'endDate'))
+    assert projected == {
+        'id': 'm1',
+        'name': 'Zoë Lee',
+        'jobs': [{'role': 'CTO', 'startDate': '2019-02'}, {'role': 'Engineer', 'startDate': '2015-06', 'endDate': '2019-01'}],
+    }
+    assert render(projected).startswith('{"id":"m1","name":"Zoë Lee"')
+
+
+def test_data_within_budget_is_rendered_untouched():
+    data = project(EXPERT, ('name', 'jobs'), ('role', 'description'))
+    text, tokens = fit_to_budget(data, 10_000)
+    assert json.loads(text) == data and tokens == count_tokens(text)
+
+
+def test_longest_descriptions_are_cut_first():
+    data = project(EXPERT, ('name', 'jobs'), ('role', 'description'))
+    full = count_tokens(render(data))
+    text, tokens = fit_to_budget(data, full // 2)
+    jobs = json.loads(text)['jobs']
+    assert tokens <= full // 2
+    assert len(jobs[0]['description']) < len(EXPERT['jobs'][0]['description'])
+    assert jobs[1]['description'] == 'Wrote services.'
+    assert [job['role'] for job in jobs] == ['CTO', 'Engineer']
+
+
+def test_descriptions_are_dropped_when_cutting_is_not_enough():
+    data = project(EXPERT, ('name', 'jobs'), ('role', 'description'))
+    text, tokens = fit_to_budget(data, 1)
+    assert json.loads(text) == {'name': 'Zoë Lee', 'jobs': [{'role': 'CTO'}, {'role': 'Engineer'}]}
+    assert tokens > 1  # names and roles are never cut, so the budget can still be exceeded
+
+
+def test_compact_block_projects_per_template_and_reports_sizes(report):
+    legacy_calls = []
+
+    def legacy():
+        legacy_calls.append(1)
+        return str(EXPERT)
+
+    text = compact_block('expert_tags', MetaExpert.from_dict(EXPERT), legacy)
+    data = json.loads(text)
+    assert set(data) == {'name', 'profession', 'company', 'jobs'}
+    assert 'id' not in data['jobs'][0] and 'expertId' not in data['jobs'][0]
+    compact_block('top_ten', [EXPERT, EXPERT], legacy)
+    stats = report.get_stats()
+    assert stats['expert_tags']['prompts'] == 1 and stats['top_ten']['prompts'] == 1
+    assert len(legacy_calls) == 2
+    assert 0 < stats['expert_tags']['saved_ratio'] < 1
+    assert stats['expert_tags']['tokens_after'] == count_tokens(text)
+
+
+def test_legacy_rendering_when_compaction_is_off(report, monkeypatch):
+    monkeypatch.setattr(prompt_compaction, 'PROMPT_COMPACTION_ENABLED', False)
+    assert compact_block('find_father', EXPERT, lambda: 'legacy') == 'legacy'
+    assert report.get_stats() == {}
+
+
+def test_legacy_is_not_rendered_unless_sampled(report, monkeypatch):
+    monkeypatch.setattr(prompt_compaction, 'PROMPT_SIZE_REPORT_ENABLED', False)
+    monkeypatch.setattr(prompt_compaction, 'PROMPT_SIZE_REPORT_SAMPLE_RATE', 0.0)
+
+    def legacy():
+        raise AssertionError("legacy rendering should be skipped")
+
+    compact_block('find_father', EXPERT, legacy)
+    stats = report.get_stats()['find_father']
+    assert stats['prompts'] == 1 and stats['measured'] == 0 and stats['saved_ratio'] == 0.0
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils import proxycurl_client
+from utils.proxycurl_client import PERSON_ENDPOINT, ProxyCurlCache, ProxyCurlClient, request_key
+from utils.records import Profile
+
+
+class StubResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+
+
+class StubSession:
+    """Answers every GET with the profile URL it was asked for, after a delay."""
+
+    def __init__(self, delay=0.0, status_code=200):
+        self.delay = delay
+        self.status_code = status_code
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self.lock:
+            self.calls.append(dict(params))
+        time.sleep(self.delay)
+        if isinstance(self.status_code, Exception):
+            raise self.status_code
+        return StubResponse(self.status_code, {'url': params.get('linkedin_profile_url')})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ProxyCurlCache(path=str(tmp_path / 'proxycurl' / 'cache.sqlite3'))
+
+
+def client_with(session, cache=None, **kwargs):
+    client = ProxyCurlClient(base_url='https://proxycurl.test', api_key='key', cache=cache,
+                             rate_per_minute=60000, **kwargs)
+    client._session = session
+    return client
+
+
+def test_spellings_of_a_profile_url_share_a_key():
+    key = request_key(PERSON_ENDPOINT, {'linkedin_profile_url': 'https://www.linkedin.com/in/jane/'})
+    assert key == request_key('/' + PERSON_ENDPOINT, {'linkedin_profile_url': 'linkedin.com/in/jane?trk=x'})
+    assert key != request_key(PERSON_ENDPOINT, {'linkedin_profile_url': 'https://www.linkedin.com/in/john'})
+    # Param order and None params do not matter
+    assert request_key('search', {'a': 1, 'b': 2, 'c': None}) == request_key('search', {'b': 2, 'a': 1})
+
+
+def test_concurrent_identical_requests_share_one_call():
+    session = StubSession(delay=0.2)
+    client = client_with(session)
+    results = client.fetch_many(PERSON_ENDPOINT, [{'linkedin_profile_url': 'https://www.linkedin.com/in/jane'}] * 6)
+    assert len(session.calls) == 1
+    assert [r.data for r in results] == [{'url': 'https://www.linkedin.com/in/jane'}] * 6
+    stats = client.get_stats()
+    assert stats['requests'] == 1 and stats['coalesced'] == 5
+
+
+def test_coalesced_callers_see_the_owners_error():
+    session = StubSession(delay=0.2, status_code=proxycurl_client.requests.ConnectionError('down'))
+    client = client_with(session)
+    results = client.fetch_many(PERSON_ENDPOINT, [{'linkedin_profile_url': 'https://www.linkedin.com/in/jane'}] * 3)
+    assert len(session.calls) == 1
+    assert [r.status_code for r in results] == [0, 0, 0]
+    # Nothing is left in flight, so a later call tries again
+    with pytest.raises(proxycurl_client.requests.ConnectionError):
+        client.get_person('https://www.linkedin.com/in/jane')
+    assert len(session.calls) == 2 and not client._in_flight
+
+
+def test_fetch_many_bounds_concurrency():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    class Counting(StubSession):
+        def get(self, *args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return super().get(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+    client = client_with(Counting(delay=0.05), max_concurrency=3)
+    urls = [f'https://www.linkedin.com/in/person-{i}' for i in range(12)]
+    results = client.fetch_people(urls, max_workers=12)
+    assert [results[url].data['url'] for url in urls] == urls
+    assert peak[0] <= 3
+
+
+def test_cached_responses_survive_a_restart(cache):
+    session = StubSession()
+    client = client_with(session, cache=cache)
+    first = client.get_person('https://www.linkedin.com/in/jane/')
+    assert first.ok and not first.from_cache and isinstance(first.data, Profile)
+    # Another spelling of the same profile, in a new process with only the disk tier
+    restarted = client_with(session, cache=ProxyCurlCache(path=cache.path))
+    second = restarted.get_person('linkedin.com/in/jane?trk=x')
+    assert second.from_cache and second.data == first.data and isinstance(second.data, Profile)
+    assert len(session.calls) == 1 and restarted.get_stats()['cache_hits'] == 1
+
+
+def test_stale_and_failed_responses_are_refetched(cache):
+    session = StubSession()
+    client = client_with(session, cache=cache)
+    client.get_person('https://www.linkedin.com/in/jane')
+    assert client.get_person('https://www.linkedin.com/in/jane', max_age=0).from_cache is False
+    assert client.get_person('https://www.linkedin.com/in/jane', use_cache=False).from_cache is False
+    assert len(session.calls) == 3
+
+    session.status_code = 404
+    assert not client.get_person('https://www.linkedin.com/in/john').ok
+    assert not client.get_person('https://www.linkedin.com/in/john').ok
+    assert len(session.calls) == 5 and client.get_stats()['errors'] == 2
+
+
+def test_hits_are_private_copies(cache):
+    cache.set('k', PERSON_ENDPOINT, {'experiences': [{'title': 'CEO'}]})
+    cache.get('k', 60)['experiences'].append({'title': 'CTO'})
+    assert cache.get('k', 60) == {'experiences': [{'title': 'CEO'}]}
+
+
+def test_disk_tier_is_trimmed_to_its_limit(tmp_path):
+    cache = ProxyCurlCache(path=str(tmp_path / 'cache.sqlite3'), max_memory_entries=5, max_disk_entries=50)
+    for i in range(200):
+        cache.set(f'k{i}', PERSON_ENDPOINT, {'i': i})
+    count = cache._connection().execute("SELECT COUNT(*) FROM proxycurl_cache").fetchone()[0]
+    assert count <= 50 + 100
+    assert cache.get('k199', 60) == {'i': 199}
+    assert len(cache._memory) == 5
@@ -0,0 +1,81 @@
+import pytest
+
+from utils import query_cache as qc
+from utils import query_engine
+from utils.query_cache import QueryResultCache, canonical_filters
+from utils.roster_cache import RosterSnapshot
+
+
+def test_filter_sets_differing_in_order_ids_or_defaults_share_a_key():
+    a = [{'id': 1, 'category': 'company', 'value': 'Acme', 'logic': 'must_have'},
+         {'id': 2, 'category': 'role', 'value': 'Engineer'}]
+    b = [{'id': 9, 'category': 'role', 'value': 'Engineer', 'logic': 'may_have'},
+         {'id': 8, 'category': 'company', 'value': 'Acme', 'logic': 'must_have'}]
+    assert canonical_filters(a) == canonical_filters(b)
+    assert canonical_filters(a) != canonical_filters([dict(a[0], timing='current'), a[1]])
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = QueryResultCache(max_entries=2)
+    cache.set('a', [1])
+    cache.set('b', [2])
+    cache.get('a')
+    cache.set('c', [3])
+    assert cache.get('b') is None and cache.get('a') == [1] and cache.get('c') == [3]
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_byte_budget_bounds_the_cache():
+    cache = QueryResultCache(max_bytes=qc.estimate_size([0] * 10) * 2)
+    cache.set('big', [0] * 1000)  # larger than the whole budget: not cached
+    cache.set('a', [0] * 10)
+    cache.set('b', [0] * 10)
+    cache.set('c', [0] * 10)
+    assert cache.get('big') is None and cache.get('a') is None and len(cache) == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(qc.time, 'monotonic', lambda: now[0])
+    cache = QueryResultCache(ttl_seconds=10)
+    cache.set('a', [1])
+    now[0] = 11
+    assert cache.get('a') is None and len(cache) == 0
+
+
+def test_invalidation_is_per_organization():
+    cache = QueryResultCache()
+    cache.set('r1', [1], 'o1')
+    cache.scope('o1', 'token').set('bitmap', 7)
+    cache.set('r2', [2], 'o2')
+    assert cache.scope('o1', 'token').get('bitmap') == 7
+    assert cache.scope('o1', 'other-token').get('bitmap') is None
+    assert cache.invalidate_org('o1') == 2
+    assert cache.get('r1') is None and cache.get('r2') == [2]
+
+
+@pytest.fixture
+def org(monkeypatch):
+    roster = [
+        {'id': 'a', 'organization_id': 'o1', 'jobs': [{'company': 'Acme'}]},
+        {'id': 'b', 'organization_id': 'o1', 'jobs': [{'company': 'Globex'}]},
+    ]
+    monkeypatch.setattr(query_engine, 'get_meta_experts_roster', lambda email: RosterSnapshot(roster, {'o1': 1}))
+    monkeypatch.setattr(query_engine, 'index_meta_experts', lambda *args, **kwargs: 0)
+    monkeypatch.setattr(query_engine, 'query_cache', QueryResultCache())
+    query_engine.clear_org_query_indexes()
+    yield query_engine.query_cache
+    query_engine.clear_org_query_indexes()
+
+
+def test_results_are_cached_until_the_organization_changes(org):
+    filters = [{'category': 'company', 'value': 'Acme', 'logic': 'must_have'}]
+
+    def ids():
+        return [result['metaExpert']['id'] for result in query_engine.find_meta_experts('u', 'o1', filters)]
+
+    assert ids() == ['a']
+    assert ids() == ['a'] and org.hits == 1
+    # A write bumps the index's cache token, so the cached result is not served again
+    query_engine.upsert_in_org_query_index('o1', {'id': 'c', 'organization_id': 'o1', 'jobs': [{'company': 'Acme'}]})
+    assert ids() == ['a', 'c']
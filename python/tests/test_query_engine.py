@@ -0,0 +1,191 @@
+import json
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.query_engine import MetaExpertQueryIndex, decode_cursor
+from utils.roster_cache import RosterSnapshot
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+EXPERTS = [
+    {'id': 'a', 'jobs': [{'company': 'Google', 'role': 'Engineer', 'startDate': '2019-01-01'},
+                         {'company': 'Meta', 'role': 'Manager', 'startDate': '2015-01-01', 'endDate': '2018-06-01'}]},
+    {'id': 'b', 'jobs': [{'company': 'Google', 'role': 'Manager', 'startDate': '2016-01-01', 'endDate': '2023-06-01'}]},
+    {'id': 'c', 'jobs': [{'company': 'Meta', 'role': 'Engineer', 'startDate': '2020-01-01'}]},
+    {'id': 'd', 'jobs': [{'company': 'Amazon', 'role': 'Analyst', 'startDate': '2021-01-01', 'industry': 'Retail'}]},
+]
+
+
+def build_index(experts=EXPERTS) -> MetaExpertQueryIndex:
+    index = MetaExpertQueryIndex()
+    index.add_many(experts)
+    return index
+
+
+def f(category, value, logic='may_have', **extra):
+    return dict(category=category, value=value, logic=logic, **extra)
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ([], ['a', 'b', 'c', 'd']),
+    ([f('company', 'Google', 'must_have')], ['a', 'b']),
+    ([f('company', 'Google', 'must_have'), f('company', 'Meta', 'must_have')], ['a']),
+    ([f('company', 'Google', 'cant_have')], ['c', 'd']),
+    ([f('company', 'Google', 'must_have'), f('role', 'Manager', 'cant_have')], []),
+    # may_have restricts only when it is the category's only kind of filter
+    ([f('company', 'Meta'), f('company', 'Amazon')], ['a', 'c', 'd']),
+    ([f('company', 'Meta'), f('company', 'Google', 'must_have')], ['a', 'b']),
+    # categories are ANDed
+    ([f('company', 'Meta'), f('role', 'Engineer', 'must_have')], ['a', 'c']),
+    # timing and value must hold for the same job
+    ([f('company', 'Google', 'must_have', timing='current')], ['a']),
+    ([f('company', 'Google', 'must_have', timing='1_2_years')], ['b']),
+    ([f('role', 'Manager', 'must_have', timing='current')], []),
+    ([f('role', 'Manager', 'must_have', activeFrom='2017-01-01', activeTo='2017-12-31')], ['a', 'b']),
+    ([f('company', 'Meta', 'cant_have', timing='current')], ['a', 'b', 'd']),
+    # empty values and unknown categories are ignored
+    ([f('company', ''), f('hobby', 'chess', 'must_have')], ['a', 'b', 'c', 'd']),
+])
+def test_filter_semantics(filters, expected):
+    results = build_index().query(filters, now=NOW)
+    assert sorted(result['metaExpert']['id'] for result in results) == expected
+
+
+def test_may_have_hits_rank_first():
+    results = build_index().query([f('company', 'Amazon', 'cant_have'), f('company', 'Meta'), f('company', 'Google')], now=NOW)
+    assert [(result['metaExpert']['id'], result['mayHaveMatches']) for result in results] == [('a', 2), ('b', 1), ('c', 1)]
+
+
+@pytest.mark.parametrize('filters, message', [
+    ([f('company', 'Google', 'should_have')], 'logic'),
+    ([f('company', 'Google', timing='last_week')], 'timing'),
+])
+def test_invalid_filters_are_rejected(filters, message):
+    with pytest.raises(ValueError, match=message):
+        build_index().query(filters, now=NOW)
+
+
+def ids(results):
+    return [result['metaExpert']['id'] for result in results]
+
+
+def test_bulk_build_matches_incremental_upserts():
+    experts = EXPERTS + [dict(EXPERTS[0], jobs=[{'company': 'Amazon', 'role': 'Engineer'}])]
+    bulk = build_index(experts)
+    incremental = MetaExpertQueryIndex()
+    for expert in experts:
+        incremental.upsert(expert)
+    assert len(bulk) == len(incremental) == 4
+    for filters in ([], [f('company', 'Amazon', 'must_have')], [f('company', 'Meta'), f('role', 'Engineer', 'must_have')]):
+        assert ids(bulk.query(filters, now=NOW)) == ids(incremental.query(filters, now=NOW))
+    # Expert a was re-added with only its Amazon job
+    assert ids(bulk.query([f('company', 'Google', 'must_have')], now=NOW)) == ['b']
+
+
+def test_upserts_after_a_bulk_build_reuse_freed_ordinals():
+    index = build_index()
+    index.remove('b')
+    index.upsert({'id': 'e', 'jobs': [{'company': 'Google', 'role': 'Analyst'}]})
+    index.add_many([{'id': 'c', 'jobs': [{'company': 'Google'}]}])
+    assert sorted(ids(index.query([f('company', 'Google', 'must_have')], now=NOW))) == ['a', 'c', 'e']
+
+
+@pytest.fixture
+def org_indexes(monkeypatch):
+    from utils import query_engine
+
+    embedded = []
+    monkeypatch.setattr(query_engine, 'index_meta_experts', lambda org, experts, only_missing: embedded.append(org))
+    query_engine.clear_org_query_indexes()
+    yield query_engine, embedded
+    for organization_id in list(query_engine._roster_embeddings):
+        query_engine.wait_for_roster_embeddings(organization_id, timeout=5)
+    query_engine.clear_org_query_indexes()
+
+
+def test_org_query_index_is_kept_until_a_newer_version(org_indexes):
+    query_engine, _ = org_indexes
+    roster = [dict(expert, organization_id='o1') for expert in EXPERTS]
+    index = query_engine.get_org_query_index('o1', roster, 2)
+    assert len(index) == 4
+    assert query_engine.get_org_query_index('o1', roster[:1], 1) is index
+    assert query_engine.get_org_query_index('o1', roster[:1], 3) is not index
+
+
+def test_roster_embedding_runs_off_the_query_path(monkeypatch, org_indexes):
+    query_engine, _ = org_indexes
+    release = threading.Event()
+    embedded = []
+    monkeypatch.setattr(query_engine, 'index_meta_experts',
+                        lambda org, experts, only_missing: release.wait(5) and embedded.append(len(experts)))
+    index = query_engine.get_org_query_index('o2', [dict(EXPERTS[0], organization_id='o2')], 1)
+    assert len(index) == 1 and embedded == []
+    release.set()
+    query_engine.wait_for_roster_embeddings('o2', timeout=5)
+    assert embedded == [1]
+
+
+def many_experts(count):
+    return [
+        {'id': f"e{i:03d}", 'jobs': [{'company': 'Acme'}] + ([{'role': 'Engineer'}] if i % 3 == 0 else [])}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('count, page_size', [(0, 5), (1, 5), (10, 5), (23, 5), (23, 1), (23, 100)])
+def test_pages_match_query_order(count, page_size):
+    index = build_index(many_experts(count))
+    filters = [f('role', 'Engineer'), f('company', 'Acme', 'must_have')]
+    pages = list(index.iter_pages(filters, page_size=page_size, now=NOW))
+    flattened = [result['metaExpert']['id'] for page, _ in pages for result in page]
+    assert flattened == [result['metaExpert']['id'] for result in index.query(filters, now=NOW)]
+    assert all(cursor is not None for _, cursor in pages[:-1])
+    assert not pages or pages[-1][1] is None
+
+
+def test_cursor_resumes_after_last_sent_result_across_requests():
+    index = build_index(many_experts(12))
+    filters = [f('role', 'Engineer')]
+    expected = [result['metaExpert']['id'] for result in index.query(filters, now=NOW)]
+    seen, cursor = [], None
+    while True:
+        page, cursor = next(index.iter_pages(filters, page_size=4, cursor=cursor, now=NOW))
+        seen.extend(result['metaExpert']['id'] for result in page)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_cursor_survives_roster_changes():
+    index = build_index(many_experts(10))
+    filters = [f('company', 'Acme', 'must_have')]
+    first_page, cursor = next(index.iter_pages(filters, page_size=3, now=NOW))
+    assert [result['metaExpert']['id'] for result in first_page] == ['e000', 'e001', 'e002']
+    index.remove('e003')
+    index.upsert({'id': 'e001a', 'jobs': [{'company': 'Acme'}]})
+    rest = [result['metaExpert']['id'] for page, _ in index.iter_pages(filters, page_size=3, cursor=cursor, now=NOW) for result in page]
+    assert rest == ['e004', 'e005', 'e006', 'e007', 'e008', 'e009']
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_ndjson_stream_cut_mid_page_resumes_after_last_line(monkeypatch, org_indexes):
+    query_engine, _ = org_indexes
+
+    roster = [dict(expert, organization_id='o1') for expert in many_experts(9)]
+    monkeypatch.setattr(query_engine, 'get_meta_experts_roster', lambda email: RosterSnapshot(roster, {'o1': 1}))
+    filters = [f('company', 'Acme', 'must_have')]
+
+    def stream(**kwargs):
+        lines = [json.loads(line) for chunk in query_engine.stream_meta_experts_ndjson('u', 'o1', filters, page_size=4, **kwargs)
+                 for line in chunk.decode().splitlines()]
+        return [line['metaExpert']['id'] for line in lines[:-1]], lines[-1]['cursor']
+
+    first, cursor = stream(limit=6)
+    assert first == [f"e{i:03d}" for i in range(6)]
+    rest, last = stream(cursor=cursor)
+    assert rest == ['e006', 'e007', 'e008'] and last is None
@@ -0,0 +1,62 @@
+import json
+import pickle
+
+import pytest
+
+from utils.records import Job, MetaExpert, Tag, as_plain, compact_meta_experts, json_default
+
+EXPERT = {
+    'id': 'm1',
+    'name': 'Ann Lee',
+    'company': 'Acme',
+    'linkedInLink': None,
+    'organization_id': 'o1',  # not a MetaExpert field, kept as an extra
+    'jobs': [{'id': 'j1', 'role': 'Engineer', 'startDate': '2020-01-01', 'custom': [1, 2]}],
+    'tags': [{'id': 't1', 'tag': 'python', 'metaExpertId': 'm1'}],
+}
+
+
+@pytest.mark.parametrize('record_class, data', [
+    (Tag, {'id': 't1', 'tag': 'python', 'metaExpertId': 'm1'}),
+    (Tag, {'tag': 'python', 'weight': 0.5}),
+    (Job, {'id': 'j1', 'endDate': None, 'isEducation': False}),
+    (Job, {}),
+    (MetaExpert, EXPERT),
+])
+def test_from_dict_round_trips(record_class, data):
+    record = record_class.from_dict(data)
+    assert record.to_dict() == data
+    assert as_plain(record) == data
+    assert record == data
+    assert json.loads(json.dumps(record, default=json_default)) == data
+    assert pickle.loads(pickle.dumps(record)) == data
+
+
+def test_nested_records_and_missing_versus_none():
+    expert = compact_meta_experts([EXPERT])[0]
+    assert isinstance(expert['jobs'][0], Job) and isinstance(expert['tags'][0], Tag)
+    assert 'linkedInLink' in expert and expert['linkedInLink'] is None
+    assert 'email' not in expert and expert.get('email', 'absent') == 'absent'
+    with pytest.raises(KeyError):
+        expert['email']
+
+
+def test_records_behave_like_dicts():
+    job = Job({'role': 'Engineer'}, company='Acme', note='extra')
+    job['role'] = 'Staff Engineer'
+    del job['note']
+    assert dict(job) == {'role': 'Staff Engineer', 'company': 'Acme'}
+    assert job.copy() == job and job.copy() is not job
+    assert len(job) == 2
+
+
+def test_records_of_the_same_type_compare_slot_by_slot():
+    first, second = MetaExpert.from_dict(EXPERT), MetaExpert.from_dict(EXPERT)
+    assert first == second
+    second['jobs'][0]['role'] = 'Manager'
+    assert first != second
+    # An extra key that was added and removed again leaves an empty overflow dict behind
+    job = Job({'role': 'Engineer'}, note='extra')
+    del job['note']
+    assert job == Job({'role': 'Engineer'})
+    assert Job({'role': None}) != Job({})
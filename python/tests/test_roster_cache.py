@@ -0,0 +1,146 @@
+import pytest
+
+from utils import roster_cache as rc
+from utils.records import Job, MetaExpert
+
+
+class FakeBackend:
+    """Serves meta-experts/{email} from per-user lists and records every path fetched."""
+
+    def __init__(self, rosters, deltas=None):
+        self.rosters = rosters
+        self.deltas = deltas or {}
+        self.paths = []
+
+    def __call__(self, path):
+        self.paths.append(path)
+        email, _, query = path[len('meta-experts/'):].partition('?')
+        if query:
+            return self.deltas.get(email, {'metaExperts': [], 'deletedIds': []})
+        return {'metaExperts': [dict(expert) for expert in self.rosters[email]]}
+
+
+def expert(expert_id, org='o1', **fields):
+    return dict(id=expert_id, organization_id=org, name=f"Expert {expert_id}", **fields)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_entries_are_served_until_the_ttl_expires(clock):
+    backend = FakeBackend({'a@x': [expert('1')]})
+    cache = rc.RosterCache(ttl_seconds=60, fetch=backend)
+    first = cache.get_roster('a@x')
+    clock[0] += 59
+    assert cache.get_roster('a@x').experts is first.experts
+    clock[0] += 2
+    cache.get_roster('a@x')
+    assert backend.paths == ['meta-experts/a@x', 'meta-experts/a@x']
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_user_is_evicted(clock):
+    backend = FakeBackend({email: [expert(email, org=email)] for email in ('a', 'b', 'c')})
+    cache = rc.RosterCache(max_entries=2, fetch=backend)
+    cache.get_roster('a')
+    cache.get_roster('b')
+    cache.get_roster('a')
+    cache.get_roster('c')  # evicts b, the least recently used
+    backend.paths.clear()
+    cache.get_roster('a')
+    cache.get_roster('b')
+    assert backend.paths == ['meta-experts/b']
+
+
+@pytest.mark.parametrize('change, bumped', [
+    ('nothing', False),
+    ('field', True),
+    ('added', True),
+    ('removed', True),
+])
+def test_org_version_moves_only_when_content_changes(clock, change, bumped):
+    roster = [expert('1'), expert('2'), expert('3', org='o2')]
+    backend = FakeBackend({'a': roster})
+    cache = rc.RosterCache(ttl_seconds=1, fetch=backend)
+    before = cache.get_roster('a')
+    if change == 'field':
+        roster[0] = expert('1', email='new@x')
+    elif change == 'added':
+        roster.append(expert('4'))
+    elif change == 'removed':
+        del roster[1]
+    clock[0] += 5
+    after = cache.get_roster('a')
+    assert (after.version_of('o1') != before.version_of('o1')) is bumped
+    assert after.version_of('o2') == before.version_of('o2')
+
+
+def test_users_of_one_org_share_its_version_and_records(clock):
+    backend = FakeBackend({'a': [expert('1'), expert('2')], 'b': [expert('2'), expert('1')]})
+    cache = rc.RosterCache(fetch=backend)
+    a, b = cache.get_roster('a'), cache.get_roster('b')
+    assert a.version_of('o1') == b.version_of('o1') != 0
+    assert {id(e) for e in a.experts} == {id(e) for e in b.experts}
+
+
+@pytest.mark.skipif('ROSTER_COMPACT_RECORDS' in rc.os.environ, reason="overridden")
+def test_rosters_are_cached_as_compact_records(clock):
+    cache = rc.RosterCache(fetch=FakeBackend({'a': [expert('1', jobs=[{'role': 'CEO'}])]}))
+    stored = cache.get_roster('a').experts[0]
+    assert isinstance(stored, MetaExpert) and isinstance(stored['jobs'][0], Job)
+    assert stored == expert('1', jobs=[{'role': 'CEO'}])
+
+
+def test_writes_update_the_roster_without_a_new_version(clock):
+    backend = FakeBackend({'a': [expert('1')]})
+    cache = rc.RosterCache(ttl_seconds=1, fetch=backend)
+    before = cache.get_roster('a')
+    cache.upsert('a', expert('2'))
+    written = cache.get_roster('a')
+    assert [e['id'] for e in written.experts] == ['1', '2']
+    assert written.version_of('o1') == before.version_of('o1')
+    # The backend now returns the written expert too: still the same content
+    backend.rosters['a'].append(expert('2'))
+    clock[0] += 5
+    assert cache.get_roster('a').version_of('o1') == before.version_of('o1')
+
+
+def test_delta_sync_merges_updates_and_deletions(clock):
+    backend = FakeBackend(
+        {'a': [expert('1'), expert('2'), expert('3', org='o2')]},
+        {'a': {'metaExperts': [expert('1', email='e@x'), expert('4')], 'deletedIds': ['2']}},
+    )
+    cache = rc.RosterCache(ttl_seconds=1, delta_sync=True, fetch=backend)
+    before = cache.get_roster('a')
+    clock[0] += 5
+    after = cache.get_roster('a')
+    assert backend.paths[-1].startswith('meta-experts/a?updatedSince=')
+    assert [(e['id'], e.get('email')) for e in after.experts] == [('1', 'e@x'), ('3', None), ('4', None)]
+    assert after.version_of('o1') != before.version_of('o1')
+    assert after.version_of('o2') == before.version_of('o2')
+    assert cache.delta_refreshes == 1
+
+
+def test_failed_delta_falls_back_to_a_full_fetch(clock):
+    backend = FakeBackend({'a': [expert('1')]}, {'a': {'unexpected': True}})
+    cache = rc.RosterCache(ttl_seconds=1, delta_sync=True, fetch=backend)
+    cache.get_roster('a')
+    clock[0] += 5
+    assert [e['id'] for e in cache.get_roster('a').experts] == ['1']
+    assert backend.paths[-1] == 'meta-experts/a'
+
+
+def test_a_stale_roster_keeps_the_version_it_was_fetched_at(clock):
+    backend = FakeBackend({'a': [expert('1')], 'b': [expert('1')]})
+    cache = rc.RosterCache(ttl_seconds=10, fetch=backend)
+    first = cache.get_roster('a').version_of('o1')
+    clock[0] += 5
+    backend.rosters['b'] = [expert('1'), expert('2')]
+    newer = cache.get_roster('b').version_of('o1')
+    assert newer > first
+    # a's cached roster does not hold expert 2 yet, so it must not claim the newer version
+    assert cache.get_roster('a').version_of('o1') == first
@@ -0,0 +1,82 @@
+import re
+
+import pytest
+
+from utils import tag_expert
+from utils.seniority_classifier import SeniorityClassifier
+
+JOB_LINE = re.compile(r'^(\d+): \{', re.MULTILINE)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stands in for the LLM: batches label their jobs Manager (except ids in skip), single jobs Entry."""
+    calls = []
+    skip = set()
+
+    def respond(requests):
+        calls.append(requests)
+        responses = []
+        for request in requests:
+            if request['label'] == 'seniority_batch':
+                ids = JOB_LINE.findall(request['message'])
+                data = {'seniorities': [{'id': job_id, 'seniority': 'Manager'} for job_id in ids if job_id not in skip]}
+            else:
+                data = {'seniority': 'Entry'}
+            responses.append({'id': request['id'], 'status': 'success', 'data': data})
+        return responses
+
+    monkeypatch.setattr(tag_expert, 'get_llm_responses_parallel', respond)
+    # Escalate every job to the LLM
+    monkeypatch.setattr(tag_expert, 'seniority_classifier', SeniorityClassifier(threshold=2.0))
+    return calls, skip
+
+
+def jobs(count, description=''):
+    return [{'role': f"Role {i}", 'company': 'Acme', 'description': description} for i in range(count)]
+
+
+def test_jobs_are_classified_several_per_prompt(llm):
+    calls, _ = llm
+    batch = jobs(10)
+    tag_expert.classify_job_seniorities(batch)
+    assert [job['seniorityLevel'] for job in batch] == ['Manager'] * 10
+    assert len(calls) == 1 and len(calls[0]) == 1
+
+
+def test_batches_respect_the_job_and_token_limits(monkeypatch):
+    monkeypatch.setattr(tag_expert, 'SENIORITY_BATCH_MAX_JOBS', 4)
+    assert [len(b) for b in tag_expert._pack_seniority_batches(jobs(10), list(range(10)))] == [4, 4, 2]
+    long_jobs = jobs(6, description='word ' * 300)
+    batches = tag_expert._pack_seniority_batches(long_jobs, list(range(6)))
+    assert len(batches) > 1 and sorted(i for b in batches for i in b) == list(range(6))
+    # A job over the budget on its own still gets a batch
+    monkeypatch.setattr(tag_expert, 'SENIORITY_BATCH_TOKEN_BUDGET', 10)
+    assert tag_expert._pack_seniority_batches(long_jobs[:2], [0, 1]) == [[0], [1]]
+
+
+def test_jobs_missing_from_a_batch_reply_are_retried_individually(llm):
+    calls, skip = llm
+    skip.update({'1', '3'})
+    batch = jobs(5)
+    tag_expert.classify_job_seniorities(batch)
+    assert [job['seniorityLevel'] for job in batch] == ['Manager', 'Entry', 'Manager', 'Entry', 'Manager']
+    assert [request['id'] for request in calls[1]] == ['job_1', 'job_3']
+
+
+def test_batching_can_be_turned_off(llm, monkeypatch):
+    calls, _ = llm
+    monkeypatch.setattr(tag_expert, 'SENIORITY_BATCHING', False)
+    batch = jobs(3)
+    tag_expert.classify_job_seniorities(batch)
+    assert [job['seniorityLevel'] for job in batch] == ['Entry'] * 3
+    assert [request['label'] for request in calls[0]] == ['seniority'] * 3
+
+
+def test_confident_titles_never_reach_the_llm(llm, monkeypatch):
+    calls, _ = llm
+    monkeypatch.setattr(tag_expert, 'seniority_classifier', SeniorityClassifier())
+    batch = [{'role': 'Chief Executive Officer'}, {'role': 'Underwater basket weaver'}]
+    tag_expert.classify_job_seniorities(batch)
+    assert batch[0]['seniorityLevel'] == 'C-Suite'
+    assert [JOB_LINE.findall(request['message']) for request in calls[0]] == [['1']]
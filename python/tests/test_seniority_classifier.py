@@ -0,0 +1,49 @@
+import pytest
+
+from utils.seniority_classifier import (
+    SENIORITY_BENCHMARK,
+    SeniorityClassifier,
+    evaluate_seniority_classifier,
+)
+
+
+def test_benchmark_titles_handled_locally_are_all_correct():
+    result = evaluate_seniority_classifier()
+    assert result['titles'] == len(SENIORITY_BENCHMARK)
+    assert result['accuracy'] == 1.0
+    assert result['coverage'] >= 0.7
+
+
+@pytest.mark.parametrize('title, label', [
+    ('VP of Engineering', 'Vice-President'),
+    ('Chief Financial Officer', 'C-Suite'),
+    ('Director of Sales @ Acme', 'Director'),
+    ('Senior Manager, Strategy', 'Manager'),
+    ('Summer Intern', 'Trainee'),
+])
+def test_confident_titles_skip_the_llm(title, label):
+    assert SeniorityClassifier().classify_job({'role': title}) == label
+
+
+@pytest.mark.parametrize('job', [
+    {'role': 'Software Engineer'},  # below the confidence threshold
+    {'role': 'Underwater basket weaver'},
+    {'role': ''},
+    {'role': 'Director', 'isEducation': True},
+])
+def test_uncertain_jobs_are_escalated(job):
+    assert SeniorityClassifier().classify_job(job) is None
+
+
+def test_model_is_consulted_when_no_rule_matches():
+    classifier = SeniorityClassifier(model=lambda title: ('Manager', 0.9) if 'lead' in title else (None, 0.0))
+    assert classifier.classify_job({'role': 'Team lead'}) == 'Manager'
+    assert classifier.classify_job({'role': 'Underwater basket weaver'}) is None
+
+
+def test_bypass_stats():
+    classifier = SeniorityClassifier()
+    for role in ('VP Sales', 'Underwater basket weaver', 'CEO', 'Something else'):
+        classifier.classify_job({'role': role})
+    assert classifier.get_stats() == {'classified': 4, 'bypassed': 2, 'escalated': 2, 'bypass_rate': 0.5}
+    assert classifier.bypass_rate() == 0.5
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from utils import backend_interaction, llm_requests
+from utils import spend_reporter as spend_module
+from utils.spend_reporter import SpendReporter
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Records every POST made by the backend module; paths listed in reject fail with a 500."""
+    posts = []
+    reject = set()
+    lock = threading.Lock()
+
+    def request(method, path, data=None):
+        with lock:
+            posts.append((method, path, data))
+        if data.get('model') in reject:
+            raise backend_interaction.requests.HTTPError('500 Server Error')
+        return {'id': data['id']}
+
+    monkeypatch.setattr(backend_interaction, '_request', request)
+    return posts, reject
+
+
+def test_each_record_is_posted_on_its_own(backend):
+    posts, _ = backend
+    reporter = SpendReporter(flush_size=100, flush_interval=60)
+    records = [reporter.record('gpt', 100, 20), reporter.record('gpt', 5, 1)]
+    assert reporter.flush() == 2
+    assert sorted(posts, key=lambda post: post[2]['promptTokens']) == [
+        ('POST', 'spend', records[1]),
+        ('POST', 'spend', records[0]),
+    ]
+    assert set(records[0]) == {'id', 'transactionDate', 'model', 'spend', 'promptTokens', 'completionTokens',
+                               'sourceEmailId', 'testId'}
+    assert records[0]['spend'] == pytest.approx(120 * spend_module.SPEND_PER_1K_TOKENS / 1000)
+
+
+def test_only_failed_records_are_retried(backend):
+    posts, reject = backend
+    reporter = SpendReporter(flush_size=100, flush_interval=60)
+    reporter.record('ok', 1, 1)
+    failing = reporter.record('down', 2, 2)
+    reject.add('down')
+    assert reporter.flush() == 1
+    assert reporter.pending() == 1
+    reject.clear()
+    posts.clear()
+    assert reporter.flush() == 1
+    assert posts == [('POST', 'spend', failing)]
+
+
+def test_custom_sender_failure_keeps_every_record():
+    sent = []
+
+    def send(records):
+        if not sent:
+            sent.append(None)
+            raise ConnectionError('backend unreachable')
+        sent.append(list(records))
+
+    reporter = SpendReporter(flush_size=100, flush_interval=60, send=send)
+    reporter.record('gpt', 1, 1)
+    reporter.record('gpt', 1, 1)
+    assert reporter.flush() == 0 and reporter.pending() == 2
+    assert reporter.flush() == 2 and len(sent[1]) == 2
+
+
+def test_worker_flushes_at_flush_size_and_close_sends_the_rest():
+    sent = []
+    flushed = threading.Event()
+
+    def send(records):
+        sent.extend(records)
+        flushed.set()
+
+    reporter = SpendReporter(flush_size=2, flush_interval=60, send=send)
+    reporter.record('gpt', 1, 1)
+    reporter.record('gpt', 1, 1)
+    assert flushed.wait(5)
+    reporter.record('gpt', 1, 1)
+    reporter.close()
+    assert len(sent) == 3 and reporter.pending() == 0
+    assert reporter.totals()['gpt']['requests'] == 3
+
+
+def test_replies_without_usage_record_no_spend(monkeypatch):
+    async def create(**kwargs):
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content='{"ok": true}'))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_requests, 'engine', SimpleNamespace(client=client))
+    recorded = []
+    monkeypatch.setattr(llm_requests.spend_reporter, 'record', lambda *args: recorded.append(args))
+    reply = asyncio.run(llm_requests.get_llm_response_async('prompt', model='gpt-4', use_cache=False))
+    assert reply == {'ok': True} and recorded == []
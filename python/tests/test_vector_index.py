@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from utils import vector_index as vi
+from utils.vector_index import HashingEmbedder, VectorIndex
+
+
+@pytest.fixture(autouse=True)
+def hashing_embedder():
+    vi.set_embedder(HashingEmbedder(dim=64))
+    yield
+    vi.set_embedder(None)
+
+
+def test_hashing_embedder_is_deterministic_and_word_order_tolerant():
+    embedder = HashingEmbedder(dim=64)
+    a, b, c = embedder.embed(['VP Sales', 'Sales VP', 'marine biology'])
+    assert np.allclose(embedder.embed(['VP Sales'])[0], a)
+    assert np.linalg.norm(a) == pytest.approx(1.0)
+    assert a @ b > a @ c
+
+
+def test_search_is_exact_cosine_top_k():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    index = VectorIndex(dim=8, capacity=4)
+    index.upsert_many([str(i) for i in range(50)], vectors, [{'kind': 'job' if i % 2 else 'tag'} for i in range(50)])
+    query = rng.normal(size=8).astype(np.float32)
+    expected = np.argsort(-(vi._unit_rows(vectors) @ (query / np.linalg.norm(query))))[:5]
+    assert [record_id for record_id, _, _ in index.search(query, k=5)[0]] == [str(i) for i in expected]
+    tags_only = index.search(query, k=50, kinds=['tag'])[0]
+    assert len(tags_only) == 25 and all(payload['kind'] == 'tag' for _, _, payload in tags_only)
+
+
+def test_updates_and_removals_keep_the_matrix_dense():
+    index = VectorIndex(dim=2)
+    index.upsert_many(['a', 'b', 'c'], np.eye(3, 2), [{'metaExpertId': 1}, {'metaExpertId': 1}, {'metaExpertId': 2}])
+    index.upsert_many(['a'], np.array([[0.0, 1.0]]), [{'metaExpertId': 2}])
+    assert index.remove('b') and not index.remove('b')
+    assert len(index) == 2 and 'c' in index
+    assert not index.has_owner(1)
+    assert [record_id for record_id, _, _ in index.search(np.array([0.0, 1.0]), k=1, owners=[2])[0]] == ['a']
+    assert index.remove_owner(2) == 2 and len(index) == 0
+
+
+def test_meta_experts_are_searchable_and_reindexing_replaces_their_rows():
+    expert = {
+        'id': 'e1',
+        'tags': [{'id': 't1', 'tag': 'supply chain'}],
+        'jobs': [{'id': 'j1', 'role': 'Logistics Director', 'company': 'Acme'}],
+    }
+    assert vi.index_meta_experts('org', [expert]) == 2
+    hits = vi.search_org('org', 'supply chain logistics', k=5)
+    assert {hit['id'] for hit in hits} == {'t1', 'j1'} and hits[0]['metaExpertId'] == 'e1'
+    # Tags get new ids on every tagging run: the old ones must not pile up
+    retagged = dict(expert, tags=[{'id': 't2', 'tag': 'procurement'}])
+    vi.index_meta_experts('org', [retagged])
+    assert len(vi.get_org_vector_index('org')) == 2
+    assert vi.index_meta_experts('org', [retagged], only_missing=True) == 0
+    scores = vi.score_meta_experts('org', 'procurement')
+    assert set(scores) == {'e1'} and scores['e1'] > 0.9
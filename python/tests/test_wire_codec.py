@@ -0,0 +1,93 @@
+import json
+from typing import List
+
+import pytest
+
+from utils import wire_codec
+from utils.prompts_for_rag_tool import BATCH_SENIORITY_SCHEMA, FATHER_SCHEMA, SENIORITY_SCHEMA
+from utils.records import Job, MetaExpert
+from utils.roster_cache import RosterPayload
+from utils.wire_codec import decode_records, decode_response, loads, parse_llm_json, typed_loads
+
+ROSTER = json.dumps({
+    'metaExperts': [{'id': 'm1', 'name': 'Ann Lee', 'jobs': [{'role': 'CEO', 'note': 'extra'}]}],
+    'deletedIds': ['m2'],
+    'paging': {'next': None},
+}).encode()
+
+
+@pytest.fixture(params=['msgspec', 'json'])
+def codec(request, monkeypatch):
+    """Runs a test with the msgspec fast path and with the standard library fallback."""
+    if request.param == 'json':
+        monkeypatch.setattr(wire_codec, 'CODEC_NAME', 'json')
+        monkeypatch.setattr(wire_codec, '_loads', json.loads)
+    elif wire_codec.msgspec is None:
+        pytest.skip("msgspec is not installed")
+    return request.param
+
+
+class StubResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+def test_auto_picks_msgspec_when_installed():
+    pytest.importorskip('msgspec')
+    assert wire_codec._select_codec('auto')[0] == 'msgspec'
+
+
+@pytest.mark.parametrize('payload', [b'', b'{"a": ', 'not json'])
+def test_bad_payloads_raise_value_error(codec, payload):
+    with pytest.raises(ValueError):
+        loads(payload)
+
+
+def test_rosters_decode_straight_into_records(codec):
+    roster = decode_response(StubResponse(ROSTER), RosterPayload)
+    expert = roster['metaExperts'][0]
+    assert isinstance(expert, MetaExpert) and isinstance(expert['jobs'][0], Job)
+    assert expert == {'id': 'm1', 'name': 'Ann Lee', 'jobs': [{'role': 'CEO', 'note': 'extra'}]}
+    assert roster['deletedIds'] == ['m2'] and 'paging' not in roster
+    assert decode_records(ROSTER, MetaExpert, key='metaExperts') == [expert]
+    assert decode_records(json.loads(ROSTER), MetaExpert, key='metaExperts') == [expert]
+
+
+def test_typed_decoding_rejects_the_wrong_shape(codec):
+    with pytest.raises(ValueError):
+        typed_loads(b'{"metaExperts": [1]}', RosterPayload)
+    with pytest.raises(ValueError):
+        typed_loads(b'{"id": "m1"}', List[MetaExpert])
+
+
+def test_llm_replies_are_validated_while_decoding(codec):
+    assert parse_llm_json('```json\n{"seniority": "CEO"}\n```', SENIORITY_SCHEMA) == {'seniority': 'CEO'}
+    assert parse_llm_json('{"relevant_expert_id": null}', FATHER_SCHEMA) == {'relevant_expert_id': None}
+    reply = '{"seniorities": [{"id": 3, "seniority": "Manager"}, {"id": "4", "seniority": null}]}'
+    assert parse_llm_json(reply, BATCH_SENIORITY_SCHEMA)['seniorities'] == [
+        {'id': 3, 'seniority': 'Manager'}, {'id': '4', 'seniority': None},
+    ]
+    for bad in ('{"seniority": 3}', '["CEO"]', '{"seniority": true}'):
+        with pytest.raises(ValueError):
+            parse_llm_json(bad, SENIORITY_SCHEMA)
+    with pytest.raises(ValueError, match='seniorities'):
+        parse_llm_json('{}', BATCH_SENIORITY_SCHEMA)
+
+
+def test_unlisted_keys_are_dropped_only_by_the_typed_path():
+    pytest.importorskip('msgspec')
+    assert parse_llm_json('{"seniority": "CEO", "why": "title"}', SENIORITY_SCHEMA) == {'seniority': 'CEO'}
+    assert parse_llm_json('{"seniority": "CEO", "why": "title"}') == {'seniority': 'CEO', 'why': 'title'}
+
+
+def test_schemas_msgspec_cannot_express_fall_back_to_validate(monkeypatch):
+    def unsupported(schema, name='Reply'):
+        raise TypeError("unsupported")
+
+    monkeypatch.setattr(wire_codec, 'schema_type', unsupported)
+    schema = {'type': ['object', 'array'], 'properties': {'a': {'type': 'integer'}, 'fallback': {}}}
+    assert wire_codec._schema_decoder(schema) is None
+    assert parse_llm_json('{"a": 1, "b": 2}', schema) == {'a': 1, 'b': 2}
+    assert parse_llm_json('[1]', schema) == [1]
+    with pytest.raises(ValueError, match=r'\$\.a'):
+        parse_llm_json('{"a": "one"}', schema)
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import tiktoken
+
+# A tokenizer that failed to load (tiktoken downloads encodings on first use, which fails on
+# offline hosts) is retried after this long; until then counts use CHARS_PER_TOKEN.
+TOKENIZER_RETRY_SECONDS = float(os.getenv('TOKENIZER_RETRY_SECONDS', '300'))
+CHARS_PER_TOKEN = 4
+
+_encodings: Dict[str, Any] = {}
+_failed_at: Dict[str, float] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding_for(model: str) -> Optional[Any]:
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    with _encodings_lock:
+        encoding = _encodings.get(model)
+        if encoding is not None:
+            return encoding
+        failed_at = _failed_at.get(model)
+        if failed_at is not None and time.monotonic() - failed_at < TOKENIZER_RETRY_SECONDS:
+            return None
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding('o200k_base')
+        except Exception as e:
+            print(f"Could not load the tokenizer for {model}, estimating {CHARS_PER_TOKEN} characters per token: {e}")
+            _failed_at[model] = time.monotonic()
+            return None
+        _encodings[model] = encoding
+        _failed_at.pop(model, None)
+        return encoding
+
+
+def count_tokens(text: str, model: str = 'gpt-4o') -> int:
+    """Number of tokens text occupies in a prompt for model (estimated if no tokenizer loads)."""
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = 'gpt-4o', suffix: str = '…') -> str:
+    """text cut to at most max_tokens tokens (plus suffix when anything was cut)."""
+    if not text:
+        return text
+    encoding = _encoding_for(model)
+    if encoding is None:
+        limit = max(max_tokens, 0) * CHARS_PER_TOKEN
+        return text if len(text) <= limit else text[:limit].rstrip() + suffix
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max(max_tokens, 0)]).rstrip() + suffix
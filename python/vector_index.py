@@ -0,0 +1,388 @@
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '256'))
+# 'hashing' (deterministic, offline) or 'openai'
+EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'hashing')
+OPENAI_EMBEDDING_MODEL = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+# Rows scored per matrix product, bounding the temporary score matrix on large indexes
+SEARCH_CHUNK_ROWS = 262_144
+JOB_TEXT_FIELDS = ('role', 'company', 'industry', 'description')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#.][a-z0-9]*)*")
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@lru_cache(maxsize=200_000)
+def _feature_slot(feature: str, dim: int) -> Tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest % dim, (1.0 if digest >> 63 else -1.0)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-features embedder that needs no model or network.
+
+    Words, adjacent word pairs and character trigrams of each word are hashed into dim signed
+    buckets (the "hashing trick"), so "engineer" and "engineering" or "VP Sales" and "Sales VP"
+    land close together. Good enough for literal-ish semantic recall; swap in a model-backed
+    embedder for real synonyms.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = _TOKEN_RE.findall(text.lower())
+        features = [(f"w:{word}", 1.0) for word in words]
+        features.extend((f"b:{first} {second}", 0.5) for first, second in zip(words, words[1:]))
+        for word in words:
+            padded = f"^{word}$"
+            features.extend((f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text or ''):
+                slot, sign = _feature_slot(feature, self.dim)
+                vectors[row, slot] += sign * weight
+        return _unit_rows(vectors)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API, sent through the shared LLM engine client."""
+
+    def __init__(self, model: str = OPENAI_EMBEDDING_MODEL, dim: int = EMBEDDING_DIM, batch_size: int = 512):
+        self.model = model
+        self.dim = dim
+        self.batch_size = batch_size
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        from .llm_engine import engine
+
+        async def create(batch):
+            return await engine.client.embeddings.create(model=self.model, input=batch, dimensions=self.dim)
+
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [text or ' ' for text in texts[start:start + self.batch_size]]
+            response = engine.run(create(batch))
+            rows.extend(item.embedding for item in response.data)
+        return _unit_rows(np.asarray(rows, dtype=np.float32).reshape(len(texts), self.dim))
+
+
+def make_embedder(provider: str = EMBEDDING_PROVIDER, dim: int = EMBEDDING_DIM):
+    if provider == 'openai':
+        return OpenAIEmbedder(dim=dim)
+    if provider == 'hashing':
+        return HashingEmbedder(dim=dim)
+    raise ValueError(f"Unknown embedding provider: {provider}")
+
+
+class VectorIndex:
+    """Exact cosine top-k over a contiguous float32 matrix with an id -> row map.
+
+    Rows are unit-normalised on insert so a matrix product gives cosine similarity. Each row
+    carries a payload (kind, owner meta expert id, text). Updates replace rows in place and
+    removals move the last row into the hole, so the matrix stays dense; capacity grows by
+    doubling. Brute force is exact and fast enough up to about a million rows per index.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._payloads: List[dict] = []
+        self._row_of: Dict[str, int] = {}
+        self._ids_by_owner: Dict[Any, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._row_of
+
+    def reserve(self, capacity: int) -> None:
+        with self._lock:
+            if capacity > self._matrix.shape[0]:
+                matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+                matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+                self._matrix = matrix
+
+    def upsert_many(self, ids: Sequence[str], vectors: np.ndarray, payloads: Optional[Sequence[dict]] = None) -> None:
+        """Insert or replace rows; vectors is an (n, dim) array aligned with ids."""
+        vectors = _unit_rows(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        payloads = payloads if payloads is not None else [{} for _ in ids]
+        with self._lock:
+            new_count = sum(1 for record_id in set(ids) if record_id not in self._row_of)
+            needed = len(self._ids) + new_count
+            if needed > self._matrix.shape[0]:
+                self.reserve(max(needed, 2 * self._matrix.shape[0]))
+            rows = np.empty(len(ids), dtype=np.int64)
+            for position, (record_id, payload) in enumerate(zip(ids, payloads)):
+                row = self._row_of.get(record_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(record_id)
+                    self._payloads.append(payload)
+                    self._row_of[record_id] = row
+                else:
+                    self._forget_owner(record_id, self._payloads[row])
+                    self._payloads[row] = payload
+                rows[position] = row
+                owner = payload.get('metaExpertId')
+                if owner is not None:
+                    self._ids_by_owner.setdefault(owner, set()).add(record_id)
+            # Later duplicates of an id win, as with one-by-one assignment
+            self._matrix[rows] = vectors
+
+    def remove(self, record_id: str) -> bool:
+        with self._lock:
+            row = self._row_of.pop(record_id, None)
+            if row is None:
+                return False
+            self._forget_owner(record_id, self._payloads[row])
+            last = len(self._ids) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._payloads[row] = self._payloads[last]
+                self._row_of[self._ids[row]] = row
+            self._ids.pop()
+            self._payloads.pop()
+            return True
+
+    def has_owner(self, owner: Any) -> bool:
+        with self._lock:
+            return owner in self._ids_by_owner
+
+    def remove_owner(self, owner: Any) -> int:
+        """Drop every row belonging to one meta expert; returns how many were removed."""
+        with self._lock:
+            record_ids = list(self._ids_by_owner.get(owner, ()))
+            for record_id in record_ids:
+                self.remove(record_id)
+            return len(record_ids)
+
+    def _forget_owner(self, record_id: str, payload: dict) -> None:
+        owner = payload.get('metaExpertId')
+        owned = self._ids_by_owner.get(owner)
+        if owned is not None:
+            owned.discard(record_id)
+            if not owned:
+                del self._ids_by_owner[owner]
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        owners: Optional[Iterable[Any]] = None,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> List[List[Tuple[str, float, dict]]]:
+        """Top-k (id, cosine, payload) per query row, best first.
+
+        owners restricts scoring to rows of those meta experts (e.g. survivors of a literal
+        filter) and kinds to payload kinds such as 'tag' or 'job'.
+        """
+        queries = _unit_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            if owners is not None:
+                rows = np.fromiter(
+                    (self._row_of[record_id] for owner in set(owners) for record_id in self._ids_by_owner.get(owner, ())),
+                    dtype=np.int64,
+                )
+            else:
+                rows = None
+            if kinds is not None:
+                kinds = set(kinds)
+                candidates = rows if rows is not None else range(len(self._ids))
+                rows = np.fromiter(
+                    (row for row in candidates if self._payloads[row].get('kind') in kinds), dtype=np.int64
+                )
+            if rows is not None:
+                rows.sort()
+                scores = self._matrix[rows] @ queries.T
+                return self._top_k(scores, k, rows)
+
+            count = len(self._ids)
+            best_scores = np.empty((0, len(queries)), dtype=np.float32)
+            best_rows = np.empty((0, len(queries)), dtype=np.int64)
+            for start in range(0, count, SEARCH_CHUNK_ROWS):
+                chunk = self._matrix[start:min(count, start + SEARCH_CHUNK_ROWS)] @ queries.T
+                top = self._top_rows(chunk, k)
+                best_scores = np.vstack([best_scores, np.take_along_axis(chunk, top, axis=0)])
+                best_rows = np.vstack([best_rows, top + start])
+                if len(best_scores) > k:
+                    keep = self._top_rows(best_scores, k)
+                    best_scores = np.take_along_axis(best_scores, keep, axis=0)
+                    best_rows = np.take_along_axis(best_rows, keep, axis=0)
+            return self._results(best_scores, best_rows)
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        if len(scores) <= k:
+            return np.tile(np.arange(len(scores))[:, None], (1, scores.shape[1]))
+        return np.argpartition(-scores, k - 1, axis=0)[:k]
+
+    def _top_k(self, scores: np.ndarray, k: int, rows: np.ndarray) -> List[List[Tuple[str, float, dict]]]:
+        top = self._top_rows(scores, k)
+        return self._results(np.take_along_axis(scores, top, axis=0), rows[top])
+
+    def _results(self, scores: np.ndarray, rows: np.ndarray) -> List[List[Tuple[str, float, dict]]]:
+        results = []
+        for column in range(scores.shape[1]):
+            order = np.argsort(-scores[:, column], kind='stable')
+            results.append([
+                (self._ids[rows[i, column]], float(scores[i, column]), self._payloads[rows[i, column]])
+                for i in order
+            ])
+        return results
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+_org_vector_indexes: Dict[Any, VectorIndex] = {}
+_org_vector_indexes_lock = threading.Lock()
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = make_embedder()
+    return _embedder
+
+
+def set_embedder(embedder) -> None:
+    """Swap the embedding provider; existing indexes are dropped since their vectors no longer match."""
+    global _embedder
+    with _embedder_lock:
+        _embedder = embedder
+    clear_org_vector_indexes()
+
+
+def get_org_vector_index(organization_id: Any) -> VectorIndex:
+    with _org_vector_indexes_lock:
+        index = _org_vector_indexes.get(organization_id)
+        if index is None:
+            index = VectorIndex(dim=get_embedder().dim)
+            _org_vector_indexes[organization_id] = index
+        return index
+
+
+def clear_org_vector_indexes() -> None:
+    with _org_vector_indexes_lock:
+        _org_vector_indexes.clear()
+
+
+def job_text(job: dict) -> str:
+    return ' '.join(str(job[field]) for field in JOB_TEXT_FIELDS if job.get(field))
+
+
+def _tag_records(tags: Iterable[dict]) -> List[Tuple[str, str, dict]]:
+    return [
+        (tag['id'], tag['tag'], {'kind': 'tag', 'metaExpertId': tag.get('metaExpertId'), 'text': tag['tag']})
+        for tag in tags if tag.get('id') and tag.get('tag')
+    ]
+
+
+def _job_records(jobs: Iterable[dict]) -> List[Tuple[str, str, dict]]:
+    records = []
+    for job in jobs:
+        text = job_text(job)
+        if job.get('id') and text:
+            records.append((job['id'], text, {'kind': 'job', 'metaExpertId': job.get('metaExpertId'), 'text': text}))
+    return records
+
+
+def _index_records(organization_id: Any, records: List[Tuple[str, str, dict]], replace_owners: Iterable[Any] = ()) -> int:
+    replace_owners = list(replace_owners)
+    if not records and not replace_owners:
+        return 0
+    # Embed outside the index lock; only the row writes are serialised
+    vectors = get_embedder().embed([text for _, text, _ in records]) if records else None
+    index = get_org_vector_index(organization_id)
+    with index._lock:
+        for owner in replace_owners:
+            index.remove_owner(owner)
+        if records:
+            index.upsert_many(
+                [record_id for record_id, _, _ in records], vectors, [payload for _, _, payload in records]
+            )
+    return len(records)
+
+
+def index_expert_tags(organization_id: Any, tags: Iterable[dict]) -> int:
+    """Add or refresh tag objects ({'id', 'tag', 'metaExpertId'}) in the organization's index."""
+    return _index_records(organization_id, _tag_records(tags))
+
+
+def index_expert_jobs(organization_id: Any, jobs: Iterable[dict]) -> int:
+    return _index_records(organization_id, _job_records(jobs))
+
+
+def index_meta_experts(organization_id: Any, meta_experts: Iterable[dict], only_missing: bool = False) -> int:
+    """Bulk-load the tags and jobs of many meta experts, embedding them in one pass.
+
+    Each expert's existing rows are replaced, so tags and jobs from its earlier versions (tags
+    get fresh ids on every run) do not pile up. only_missing skips experts the index already
+    holds, for loading a roster into a warm index.
+    """
+    index = get_org_vector_index(organization_id)
+    experts = [expert for expert in meta_experts if expert.get('id') is not None]
+    if only_missing:
+        experts = [expert for expert in experts if not index.has_owner(expert['id'])]
+    records = []
+    for expert in experts:
+        records.extend(_tag_records(
+            dict(tag, metaExpertId=tag.get('metaExpertId') or expert['id']) for tag in expert.get('tags') or []
+        ))
+        records.extend(_job_records(
+            dict(job, metaExpertId=job.get('metaExpertId') or expert['id']) for job in expert.get('jobs') or []
+        ))
+    return _index_records(organization_id, records, replace_owners=[expert['id'] for expert in experts])
+
+
+def embed_query(query: str) -> np.ndarray:
+    return get_embedder().embed([query])[0]
+
+
+def search_org(
+    organization_id: Any,
+    query: str,
+    k: int = 10,
+    kinds: Optional[Iterable[str]] = None,
+    meta_expert_ids: Optional[Iterable[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Top-k tag/job records of an organization most similar to a free-text query."""
+    hits = get_org_vector_index(organization_id).search(embed_query(query), k, owners=meta_expert_ids, kinds=kinds)[0]
+    return [dict(payload, id=record_id, score=score) for record_id, score, payload in hits]
+
+
+def score_meta_experts(
+    organization_id: Any,
+    query: str,
+    meta_expert_ids: Optional[Iterable[Any]] = None,
+    kinds: Optional[Iterable[str]] = None,
+    k: int = 1000,
+) -> Dict[Any, float]:
+    """Best similarity per meta expert (max over their tags and jobs) among the top-k records."""
+    scores: Dict[Any, float] = {}
+    for hit in search_org(organization_id, query, k=k, kinds=kinds, meta_expert_ids=meta_expert_ids):
+        owner = hit.get('metaExpertId')
+        if owner is not None and hit['score'] > scores.get(owner, -1.0):
+            scores[owner] = hit['score']
+    return scores
@@ -0,0 +1,317 @@
+import functools
+import gc
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Type, TypedDict, Union, get_args, get_origin, get_type_hints
+
+try:
+    from typing import Required
+except ImportError:  # Python < 3.11
+    from typing_extensions import Required
+
+from .records import Record
+
+# Decoder for backend, ProxyCurl and LLM payloads: 'auto' picks the fastest one installed
+# (msgspec, then orjson), falling back to the standard library.
+WIRE_CODEC = os.getenv('WIRE_CODEC', 'auto').lower()
+# Payloads at least this large (e.g. full rosters) are decoded with the cyclic GC paused: decoding
+# allocates only acyclic containers, yet each allocation burst triggers full collections.
+WIRE_GC_PAUSE_BYTES = int(os.getenv('WIRE_GC_PAUSE_BYTES', str(1024 * 1024)))
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Markdown fences some models wrap JSON-mode replies in, e.g. ```json\n{...}\n```
+_FENCE = re.compile(r'^\s*```[A-Za-z]*\s*|\s*```\s*$')
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'null': type(None),
+}
+
+
+def _select_codec(name: str):
+    if name in ('auto', 'msgspec') and msgspec is not None:
+        decoder = msgspec.json.Decoder()
+        return 'msgspec', decoder.decode
+    if name in ('auto', 'orjson', 'msgspec') and orjson is not None:
+        return 'orjson', orjson.loads
+    return 'json', json.loads
+
+
+CODEC_NAME, _loads = _select_codec(WIRE_CODEC)
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+
+
+@contextmanager
+def _gc_paused():
+    """Disable the cyclic GC until every overlapping pause (from any thread) has ended."""
+    global _gc_pauses
+    with _gc_lock:
+        if _gc_pauses == 0 and not gc.isenabled():
+            paused = False
+        else:
+            paused = True
+            _gc_pauses += 1
+            gc.disable()
+    try:
+        yield
+    finally:
+        if paused:
+            with _gc_lock:
+                _gc_pauses -= 1
+                if _gc_pauses == 0:
+                    gc.enable()
+
+
+def loads(payload: Any) -> Any:
+    """Decode JSON bytes or text with the configured codec; raises ValueError on bad input.
+
+    msgspec and orjson read the raw bytes directly, without first decoding them to str.
+    """
+    if not payload:
+        raise ValueError("Empty JSON payload")
+    if CODEC_NAME == 'json' and isinstance(payload, (bytes, bytearray, memoryview)):
+        payload = bytes(payload).decode('utf-8')
+    try:
+        if len(payload) >= WIRE_GC_PAUSE_BYTES:
+            with _gc_paused():
+                return _loads(payload)
+        return _loads(payload)
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgspec.DecodeError is not a ValueError; keep one error type for callers
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+
+def _record_hook(type_: Any, value: Any) -> Any:
+    if isinstance(type_, type) and issubclass(type_, Record):
+        if not isinstance(value, dict):
+            raise ValueError(f"expected an object for {type_.__name__}, got {type(value).__name__}")
+        return type_.from_dict(value)
+    raise NotImplementedError(f"cannot decode {type_}")
+
+
+_decoders: Dict[Any, Callable[[Any], Any]] = {}
+_decoders_lock = threading.Lock()
+
+
+def _typed_decoder(type_: Any) -> Optional[Callable[[Any], Any]]:
+    """msgspec decode function for type_ (built once per type), or None without msgspec."""
+    if CODEC_NAME != 'msgspec':
+        return None
+    with _decoders_lock:
+        decode = _decoders.get(type_)
+        if decode is None:
+            decode = _decoders[type_] = msgspec.json.Decoder(type_, dec_hook=_record_hook).decode
+    return decode
+
+
+def convert(value: Any, type_: Any, path: str = '$') -> Any:
+    """Turn decoded JSON into type_ the way the typed msgspec decoder would; raises ValueError.
+
+    Supports Any, Record subclasses, List[...], Optional/Union of those and TypedDicts (whose
+    unlisted keys are dropped), which is what typed_loads is used with.
+    """
+    if type_ is Any:
+        return value
+    if isinstance(type_, type) and issubclass(type_, Record):
+        if not isinstance(value, dict):
+            raise ValueError(f"{path}: expected an object for {type_.__name__}, got {type(value).__name__}")
+        return type_.from_dict(value)
+    origin = get_origin(type_)
+    if origin is Union:
+        if value is None and type(None) in get_args(type_):
+            return None
+        errors = []
+        for option in get_args(type_):
+            if option is not type(None):
+                try:
+                    return convert(value, option, path)
+                except ValueError as e:
+                    errors.append(e)
+        raise errors[0]
+    if origin is list:
+        if not isinstance(value, list):
+            raise ValueError(f"{path}: expected array, got {type(value).__name__}")
+        (item_type,) = get_args(type_) or (Any,)
+        return [convert(item, item_type, f"{path}[{i}]") for i, item in enumerate(value)]
+    if isinstance(type_, type) and issubclass(type_, dict) and hasattr(type_, '__required_keys__'):
+        if not isinstance(value, dict):
+            raise ValueError(f"{path}: expected object, got {type(value).__name__}")
+        for name in type_.__required_keys__:
+            if name not in value:
+                raise ValueError(f"{path}: missing required key '{name}'")
+        hints = get_type_hints(type_)
+        return {name: convert(value[name], hints[name], f"{path}.{name}") for name in hints if name in value}
+    if isinstance(type_, type) and not isinstance(value, type_):
+        raise ValueError(f"{path}: expected {type_.__name__}, got {type(value).__name__}")
+    return value
+
+
+def typed_loads(payload: Any, type_: Any) -> Any:
+    """Decode JSON straight into type_ (e.g. List[MetaExpert]); raises ValueError on a mismatch.
+
+    With msgspec the records are built and the shape checked inside the one decode call, so no
+    intermediate tree of plain dicts is kept around; other codecs decode, then convert().
+    """
+    decode = _typed_decoder(type_)
+    if decode is None:
+        data = loads(payload)
+        with _gc_paused():
+            return convert(data, type_)
+    if not payload:
+        raise ValueError("Empty JSON payload")
+    try:
+        if len(payload) >= WIRE_GC_PAUSE_BYTES:
+            with _gc_paused():
+                return decode(payload)
+        return decode(payload)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+
+def decode_response(response, type_: Any = None) -> Any:
+    """Drop-in for requests' response.json() that decodes response.content with the codec.
+
+    With type_, the body is decoded straight into it (see typed_loads).
+    """
+    if type_ is None:
+        return loads(response.content)
+    return typed_loads(response.content, type_)
+
+
+def decode_records(payload: Any, record_class: Type[Record], key: Optional[str] = None) -> List[Record]:
+    """Decode a JSON list of objects (or payload[key] of an object) into records."""
+    if not isinstance(payload, (bytes, bytearray, memoryview, str)):
+        data = payload if key is None else (payload or {}).get(key) or []
+        with _gc_paused():
+            return convert(data, List[record_class])
+    if key is None:
+        return typed_loads(payload, List[record_class])
+    return typed_loads(payload, _keyed_payload(record_class, key)).get(key) or []
+
+
+@functools.lru_cache(maxsize=None)
+def _keyed_payload(record_class: Type[Record], key: str) -> Any:
+    # One type per (class, key), so its decoder is built once
+    return TypedDict('Payload', {key: List[record_class]}, total=False)
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = '$') -> None:
+    """Check value against a small JSON-schema subset; raises ValueError naming the first bad path.
+
+    Supports type (a name or list of names), required, properties and items, which is what the
+    per-prompt response schemas in prompts_for_rag_tool use.
+    """
+    expected = schema.get('type')
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        # bool is an int subclass, but JSON keeps them apart
+        if not any(
+            isinstance(value, _JSON_TYPES[name]) and not (isinstance(value, bool) and name in ('integer', 'number'))
+            for name in names
+        ):
+            raise ValueError(f"{path}: expected {'/'.join(names)}, got {type(value).__name__}")
+    if isinstance(value, dict):
+        for name in schema.get('required', ()):
+            if name not in value:
+                raise ValueError(f"{path}: missing required key '{name}'")
+        for name, subschema in schema.get('properties', {}).items():
+            if name in value:
+                validate(value[name], subschema, f"{path}.{name}")
+    elif isinstance(value, list) and 'items' in schema:
+        for i, item in enumerate(value):
+            validate(item, schema['items'], f"{path}[{i}]")
+
+
+_SCALAR_TYPES = {'string': str, 'integer': int, 'number': Union[int, float], 'boolean': bool, 'null': type(None)}
+_schema_types: Dict[str, Any] = {}
+
+
+def schema_type(schema: Dict[str, Any], name: str = 'Reply') -> Any:
+    """The typing type matching a schema of the validate() subset, for typed_loads.
+
+    Objects with properties become TypedDicts, so keys a schema does not list are dropped.
+    Raises TypeError for schemas msgspec cannot express (e.g. a union of object types).
+    """
+    names = schema.get('type')
+    names = names if isinstance(names, list) else [names] if names else []
+    options = []
+    for type_name in names:
+        if type_name == 'object':
+            properties = schema.get('properties')
+            if not properties:
+                options.append(Dict[str, Any])
+                continue
+            required = set(schema.get('required', ()))
+            fields = {
+                key: Required[schema_type(subschema, f"{name}_{key}")] if key in required else schema_type(subschema, f"{name}_{key}")
+                for key, subschema in properties.items()
+            }
+            missing = required - set(fields)
+            fields.update((key, Required[Any]) for key in missing)
+            options.append(TypedDict(name, fields, total=False))
+        elif type_name == 'array':
+            options.append(List[schema_type(schema['items'], f"{name}_item")] if 'items' in schema else List[Any])
+        elif type_name in _SCALAR_TYPES:
+            options.append(_SCALAR_TYPES[type_name])
+        else:
+            raise TypeError(f"unsupported schema type {type_name!r}")
+    if not options:
+        return Any
+    return Union[tuple(options)] if len(options) > 1 else options[0]
+
+
+def _schema_decoder(schema: Dict[str, Any]) -> Optional[Any]:
+    """schema_type() of schema, built once per distinct schema; None if msgspec cannot use it."""
+    if CODEC_NAME != 'msgspec':
+        return None
+    key = json.dumps(schema, sort_keys=True)
+    with _decoders_lock:
+        if key in _schema_types:
+            return _schema_types[key]
+    try:
+        type_ = schema_type(schema)
+        _typed_decoder(type_)
+    except TypeError:
+        type_ = None
+    with _decoders_lock:
+        _schema_types[key] = type_
+    return type_
+
+
+def parse_llm_json(content: str, schema: Optional[Dict[str, Any]] = None) -> Any:
+    """Decode a JSON-mode LLM reply, tolerating a surrounding markdown fence, and validate it.
+
+    Only a leading ``` (with an optional language tag) and a trailing ``` are removed, so
+    values that merely contain "json" or backticks come through untouched. With msgspec the
+    reply is checked against schema while it is decoded; otherwise it is validated after.
+    """
+    text = _FENCE.sub('', content or '')
+    type_ = _schema_decoder(schema) if schema is not None else None
+    if type_ is not None:
+        return typed_loads(text, type_)
+    data = loads(text)
+    if schema is not None:
+        validate(data, schema)
+    return data